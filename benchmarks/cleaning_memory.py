@@ -0,0 +1,88 @@
+"""
+Cleaning memory benchmark - Peak memory of cleaning operations on a wide frame
+
+Run from the project root:
+
+    python -m benchmarks.cleaning_memory --rows 20000 --columns 400
+
+Compares the current DataManager operations with the previous approach of
+copying the whole frame before changing one column.
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from core.data_manager import DataManager
+
+
+def make_wide_frame(rows, columns, seed=0):
+    """Float frame with about 5% missing values in every column"""
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(rows, columns))
+    values[rng.random((rows, columns)) < 0.05] = np.nan
+    return pd.DataFrame(values, columns=[f"col_{i}" for i in range(columns)])
+
+
+def copy_then_fill(manager, column):
+    """Previous clean_missing_values: copy the frame, then fill one column"""
+    df = manager.dataframe.copy()
+    manager.dataframe[column] = df[column].fillna(df[column].mean())
+
+
+def copy_then_clip(manager, column):
+    """Previous handle_outliers cap, which also started from a frame copy"""
+    df = manager.dataframe.copy()
+    series = df[column]
+    q1, q3 = series.quantile(0.25), series.quantile(0.75)
+    iqr = q3 - q1
+    manager.dataframe[column] = series.clip(q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+
+
+SCENARIOS = [
+    ("fill mean (copy)", copy_then_fill),
+    ("fill mean", lambda m, c: m.clean_missing_values(c, "mean")),
+    ("clip outliers (copy)", copy_then_clip),
+    ("clip outliers", lambda m, c: m.handle_outliers(c, "cap")),
+    ("drop missing rows", lambda m, c: m.clean_missing_values(c, "drop")),
+    ("remove duplicates", lambda m, c: m.remove_duplicates()),
+]
+
+
+def measure(frame, operation):
+    """Return (seconds, peak bytes allocated) for one operation on a fresh manager"""
+    manager = DataManager()
+    manager.set_dataset("benchmark.csv", frame.copy())
+    column = frame.columns[0]
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    operation(manager, column)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--columns", type=int, default=400)
+    args = parser.parse_args()
+
+    frame = make_wide_frame(args.rows, args.columns)
+    frame_mb = frame.memory_usage(index=True).sum() / 1e6
+    print(f"Frame: {args.rows} rows x {args.columns} columns, {frame_mb:.1f} MB")
+    print(f"{'operation':<24}{'time (s)':>10}{'peak (MB)':>12}")
+
+    for name, operation in SCENARIOS:
+        elapsed, peak = measure(frame, operation)
+        print(f"{name:<24}{elapsed:>10.3f}{peak / 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
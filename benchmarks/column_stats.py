@@ -0,0 +1,83 @@
+"""
+Column statistics benchmark - Fused numeric summary against per-statistic pandas calls
+
+Run from the project root:
+
+    python -m benchmarks.column_stats --rows 5000000
+
+Compares compute_column_stats, which summarizes a numeric column in one
+sweep with quartiles from one partial sort, with the previous version that
+called a pandas method for every statistic, and checks that both agree.
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from core.data_manager import compute_column_stats
+
+
+def make_column(rows, dtype, seed=0):
+    """Skewed numeric column with about 5% missing values"""
+    rng = np.random.default_rng(seed)
+    if dtype == "int":
+        series = pd.Series(rng.integers(0, 1000, rows))
+        return series.astype("Int64").mask(rng.random(rows) < 0.05)
+    values = rng.lognormal(size=rows)
+    values[rng.random(rows) < 0.05] = np.nan
+    return pd.Series(values)
+
+
+def pandas_column_stats(series):
+    """Previous compute_column_stats numeric part: one pandas call per statistic"""
+    return {
+        "count": len(series),
+        "missing": series.isna().sum(),
+        "unique": series.nunique(),
+        "mean": series.mean(),
+        "median": series.median(),
+        "std": series.std(),
+        "min": series.min(),
+        "max": series.max(),
+        "skew": series.skew(),
+        "kurtosis": series.kurtosis(),
+        "25%": series.quantile(0.25),
+        "50%": series.quantile(0.50),
+        "75%": series.quantile(0.75),
+    }
+
+
+def timed(function, series, repeat):
+    """Best of repeat runs, in seconds, and the last result"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(series)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'column':<10}{'pandas (s)':>12}{'fused (s)':>12}{'speedup':>10}")
+    for dtype in ("float", "int"):
+        series = make_column(args.rows, dtype)
+        old_time, old = timed(pandas_column_stats, series, args.repeat)
+        new_time, new = timed(compute_column_stats, series, args.repeat)
+
+        for key, expected in old.items():
+            if not np.isclose(new[key], expected, rtol=1e-9, equal_nan=True):
+                raise SystemExit(f"{dtype} {key}: {new[key]} != {expected}")
+
+        print(
+            f"{dtype:<10}{old_time:>12.3f}{new_time:>12.3f}"
+            f"{old_time / new_time:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
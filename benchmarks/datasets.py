@@ -0,0 +1,77 @@
+"""
+Benchmark datasets - Deterministic synthetic frames for the benchmark suite
+
+Every frame is generated from a fixed seed, so a dataset name always gives
+the same values, and benchmark results from different runs and machines
+compare the same work.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Named dataset shapes: rows, numeric columns, string columns
+DATASETS = {
+    "narrow-small": (10_000, 4, 2),
+    "narrow-medium": (200_000, 4, 2),
+    "narrow-large": (2_000_000, 4, 2),
+    "wide-small": (2_000, 200, 20),
+    "wide-medium": (20_000, 200, 20),
+    "strings-medium": (200_000, 1, 8),
+}
+DEFAULT_DATASETS = ["narrow-small", "narrow-medium", "wide-small", "strings-medium"]
+
+MISSING = 0.05
+DUPLICATES = 0.01
+OUTLIERS = 0.01
+CATEGORIES = [10, 100, 1_000, 10_000]
+
+
+def make_frame(
+    rows,
+    numeric_columns,
+    string_columns,
+    missing=MISSING,
+    duplicates=DUPLICATES,
+    outliers=OUTLIERS,
+    seed=0,
+):
+    """Synthetic frame with controllable missingness, duplicates and outliers
+
+    Numeric columns are normal with a different center and scale each, and
+    a share outliers of their values lies 20 to 50 scales away. String
+    columns take values from vocabularies of 10 to 10,000 words. A share
+    missing of the cells of every column is missing, and a share
+    duplicates of the rows are exact copies of other rows.
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(numeric_columns):
+        center, scale = rng.uniform(-100, 100), rng.uniform(1, 10)
+        values = rng.normal(center, scale, rows)
+        far = rng.random(rows) < outliers
+        distance = rng.uniform(20, 50, far.sum()) * rng.choice([-1, 1], far.sum())
+        values[far] = center + distance * scale
+        values[rng.random(rows) < missing] = np.nan
+        data[f"num_{i}"] = values
+
+    for i in range(string_columns):
+        size = CATEGORIES[i % len(CATEGORIES)]
+        words = np.array([f"value_{k}" for k in range(size)], dtype=object)
+        values = words[rng.integers(0, size, rows)]
+        values[rng.random(rows) < missing] = None
+        data[f"str_{i}"] = values
+
+    frame = pd.DataFrame(data)
+    copies = int(rows * duplicates)
+    if copies:
+        targets = rng.choice(rows, copies, replace=False)
+        sources = rng.integers(0, rows, copies)
+        frame.iloc[targets] = frame.iloc[sources].to_numpy()
+    return frame
+
+
+def make_dataset(name, **options):
+    """Frame of a named dataset in DATASETS; options as in make_frame"""
+    rows, numeric_columns, string_columns = DATASETS[name]
+    return make_frame(rows, numeric_columns, string_columns, **options)
@@ -0,0 +1,187 @@
+"""
+Rendering benchmark - Compute and draw times of the charts and statistics reports
+
+Run from the project root, no display needed:
+
+    python -m benchmarks.rendering
+    python -m benchmarks.rendering --scenarios scatter,heatmap --scale 0.1
+
+Each scenario prepares its data with the core.charts or core.statistics
+function the panel calls (compute), then draws it on a figure of the
+panel's size with the Agg backend and renders the canvas (draw). Options
+are the panels' defaults. --scale multiplies the row counts, for a quick
+run.
+"""
+
+import argparse
+import time
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from core import charts
+from core.data_manager import DataManager
+from core.statistics import correlation_report, describe_column, hypothesis_test
+
+
+FIGURE_SIZE = (7, 5)
+DPI = 100
+
+
+def scatter_frame(rows, rng):
+    """Two correlated numeric columns"""
+    x = rng.normal(size=rows)
+    return pd.DataFrame({"x": x, "y": 0.5 * x + rng.normal(size=rows)})
+
+
+def wide_frame(rows, rng, columns=500):
+    """Numeric columns; every tenth one is strongly correlated with the previous"""
+    values = rng.normal(size=(rows, columns))
+    values[:, 1::10] += 2 * values[:, ::10]
+    return pd.DataFrame(values, columns=[f"c{i}" for i in range(columns)])
+
+
+def category_frame(rows, rng, categories=10_000):
+    """A numeric column and a text column with many categories"""
+    codes = rng.integers(0, categories, rows)
+    names = np.array([f"g{i}" for i in range(categories)], dtype=object)
+    return pd.DataFrame({"group": names[codes], "value": rng.normal(codes % 7, 1.0)})
+
+
+def scatter(manager, figure):
+    """Scatter plot of 5M points, drawn as a density image"""
+    data = charts.scatter_data(manager.get_frame(["x", "y"]), "x", "y")
+    yield
+    charts.draw_scatter(figure.add_subplot(111), data)
+
+
+def scatter_points(manager, figure):
+    """Scatter plot of 1M points as markers, thinned to the view"""
+    data = charts.scatter_data(manager.get_frame(["x", "y"]), "x", "y")
+    yield
+    charts.draw_scatter(figure.add_subplot(111), data, mode="points")
+
+
+def scatter_regression(manager, figure):
+    """Scatter plot with a linear fit and its residual band"""
+    data = charts.scatter_data(manager.get_frame(["x", "y"]), "x", "y", "linear")
+    yield
+    charts.draw_scatter(figure.add_subplot(111), data)
+
+
+def box(manager, figure):
+    """Box plot of the first categories of 10,000, with the points"""
+    data = charts.box_data(manager.get_frame(["group", "value"]), "group", "value")
+    yield
+    charts.draw_box(figure.add_subplot(111), data)
+
+
+def box_sorted(manager, figure):
+    """Box plot of the 10 categories of 10,000 with the highest medians"""
+    frame = manager.get_frame(["group", "value"])
+    data = charts.box_data(frame, "group", "value", sort_by_median=True)
+    yield
+    charts.draw_box(figure.add_subplot(111), data)
+
+
+def heatmap(manager, figure):
+    """Correlation heatmap of 500 columns"""
+    data = charts.heatmap_data(manager.correlation())
+    yield
+    charts.draw_heatmap(figure, data, "Heatmap")
+
+
+def statistics_descriptive(manager, figure):
+    """Descriptive statistics of a numeric column"""
+    describe_column(manager, "x")
+    yield
+
+
+def statistics_correlation(manager, figure):
+    """Correlation matrix report of 500 columns"""
+    correlation_report(manager)
+    yield
+
+
+def statistics_anova(manager, figure):
+    """ANOVA of a column over 10,000 groups"""
+    hypothesis_test(manager, "value", "group", "anova")
+    yield
+
+
+# name: (frame(rows, rng), rows, scenario); a scenario is a generator that
+# computes until its yield and draws after it
+SCENARIOS = {
+    "scatter": (scatter_frame, 5_000_000, scatter),
+    "scatter-points": (scatter_frame, 1_000_000, scatter_points),
+    "scatter-regression": (scatter_frame, 1_000_000, scatter_regression),
+    "box": (category_frame, 1_000_000, box),
+    "box-sorted": (category_frame, 1_000_000, box_sorted),
+    "heatmap": (wide_frame, 2_000, heatmap),
+    "statistics-descriptive": (scatter_frame, 5_000_000, statistics_descriptive),
+    "statistics-correlation": (wide_frame, 2_000, statistics_correlation),
+    "statistics-anova": (category_frame, 1_000_000, statistics_anova),
+}
+
+
+def run(scenario, name, frame):
+    """(compute, draw) seconds of a scenario; draw includes rendering
+
+    The scenario gets a new DataManager, so no statistics are cached.
+    """
+    manager = DataManager()
+    manager.set_dataset(f"{name}.csv", frame)
+    figure = Figure(figsize=FIGURE_SIZE, dpi=DPI)
+    canvas = FigureCanvasAgg(figure)
+    steps = scenario(manager, figure)
+
+    start = time.perf_counter()
+    next(steps)
+    compute = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in steps:
+        pass
+    figure.tight_layout()
+    canvas.draw()
+    return compute, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help=f"comma-separated names from: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    print(
+        f"{'scenario':<24}{'rows':>10}{'columns':>9}"
+        f"{'compute (s)':>13}{'draw (s)':>10}"
+    )
+    for name in names:
+        make_frame, rows, scenario = SCENARIOS[name]
+        frame = make_frame(max(int(rows * args.scale), 2), np.random.default_rng(0))
+        times = [run(scenario, name, frame) for _ in range(args.repeat)]
+        compute = min(t[0] for t in times)
+        draw = min(t[1] for t in times)
+        print(
+            f"{name:<24}{len(frame):>10}{len(frame.columns):>9}"
+            f"{compute:>13.3f}{draw:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
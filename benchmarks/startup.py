@@ -0,0 +1,130 @@
+"""
+Startup benchmark - Import time report and startup budget of the application window
+
+Run from the project root:
+
+    python -m benchmarks.startup --budget 1.0
+
+Imports ui.app_window in fresh interpreters with -X importtime, lists the
+modules that took longest and checks that none of the modules the panels
+load on demand was imported. When a display is available it also times
+building the window, from the first import until the window is drawn.
+Exits with an error when a deferred module is imported at startup or the
+best startup time exceeds the budget.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_MODULE = "ui.app_window"
+STARTUP_BUDGET_S = 1.0
+
+# Loaded by the panels the first time their tab is shown
+DEFERRED_MODULES = [
+    "matplotlib",
+    "seaborn",
+    "scipy",
+    "ui.panels.cleaning_panel",
+    "ui.panels.visualization_panel",
+    "ui.panels.statistics_panel",
+]
+
+WINDOW_SCRIPT = """
+import time
+start = time.perf_counter()
+import tkinter as tk
+from ui.app_window import AppWindow
+root = tk.Tk()
+AppWindow(root)
+root.update()
+print(time.perf_counter() - start)
+root.destroy()
+"""
+
+
+def import_times(module):
+    """[(module, self seconds, cumulative seconds)] of importing a module
+
+    The module is imported in a new interpreter, so every import is
+    measured from scratch.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return times
+
+
+def window_time():
+    """Seconds from the first import until the window is drawn, or None
+
+    None means Tk could not open a window, as on a machine without display.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", WINDOW_SCRIPT], cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def deferred_imports(times):
+    """Deferred modules, or their submodules, found in an import report"""
+    names = {name for name, _, _ in times}
+    return [
+        module
+        for module in DEFERRED_MODULES
+        if any(name == module or name.startswith(module + ".") for name in names)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_S)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [import_times(STARTUP_MODULE) for _ in range(args.repeat)]
+    totals = [run[-1][2] for run in runs]
+    best = runs[totals.index(min(totals))]
+
+    print(f"Slowest imports of {STARTUP_MODULE} (best of {args.repeat} runs):")
+    print(f"{'module':<50}{'self (s)':>10}{'total (s)':>11}")
+    for name, self_s, cumulative_s in sorted(best, key=lambda t: -t[1])[: args.top]:
+        print(f"{name:<50}{self_s:>10.3f}{cumulative_s:>11.3f}")
+    print(f"\nImport time: first run {totals[0]:.3f} s, best {min(totals):.3f} s")
+
+    startup = min(totals)
+    windows = [window_time() for _ in range(args.repeat)]
+    if None in windows:
+        print("Window time: skipped, no display")
+    else:
+        startup = min(windows)
+        print(f"Window time: first run {windows[0]:.3f} s, best {startup:.3f} s")
+
+    imported = deferred_imports(best)
+    if imported:
+        raise SystemExit(f"Imported at startup: {', '.join(imported)}")
+    if startup > args.budget:
+        raise SystemExit(
+            f"Startup took {startup:.3f} s, over the {args.budget:.3f} s budget"
+        )
+    print(f"Within the {args.budget:.3f} s budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Benchmark suite - Time and peak memory of DataManager operations, with regression checks
+
+Run from the project root:
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --compare results.json
+
+Each operation runs on a fresh DataManager holding a synthetic dataset from
+benchmarks.datasets. Wall and CPU time are the best of --repeat runs, and
+peak memory comes from one more run with tracemalloc, which slows the code
+it traces. Results are written as JSON; with --compare, operations that got
+slower or used more memory than in a stored result file by more than
+--tolerance are reported, and the run exits with an error.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from benchmarks.datasets import DATASETS, DEFAULT_DATASETS, make_dataset
+from core.data_manager import DataManager
+
+
+TOLERANCE = 0.2
+# Differences below these are noise, whatever the ratio
+MIN_TIME_DIFF_S = 0.005
+MIN_MEMORY_DIFF_BYTES = 1024**2
+
+
+def first_column(frame, prefix):
+    """Name of the first column with a prefix, or the first column"""
+    return next((c for c in frame.columns if c.startswith(prefix)), frame.columns[0])
+
+
+def column_stats(manager):
+    """Statistics of every column, as the statistics panel computes them"""
+    for column in manager.get_columns():
+        manager.get_column_stats(column)
+
+
+# (name, operation(manager, frame)); load_dataset is measured separately
+OPERATIONS = [
+    (
+        "clean_missing_values[mean]",
+        lambda m, f: m.clean_missing_values(first_column(f, "num_"), "mean"),
+    ),
+    (
+        "clean_missing_values[drop]",
+        lambda m, f: m.clean_missing_values(first_column(f, "str_"), "drop"),
+    ),
+    (
+        "handle_outliers[cap]",
+        lambda m, f: m.handle_outliers(first_column(f, "num_"), "cap"),
+    ),
+    (
+        "handle_outliers[remove]",
+        lambda m, f: m.handle_outliers(first_column(f, "num_"), "remove"),
+    ),
+    ("remove_duplicates", lambda m, f: m.remove_duplicates()),
+    ("get_column_stats", lambda m, f: column_stats(m)),
+]
+
+
+def measure(name, setup, operation, repeat):
+    """Result of an operation: best times of repeat runs and the traced peak
+
+    setup() returns a fresh DataManager and operation(manager) runs the
+    operation on it; only operation is measured, through the manager's
+    OperationProfiler.
+    """
+    runs = [_run(name, setup, operation, False) for _ in range(repeat)]
+    traced = _run(name, setup, operation, True)
+    return {
+        "operation": name,
+        "wall_s": min(r["wall_s"] for r in runs),
+        "cpu_s": min(r["cpu_s"] for r in runs),
+        "peak_bytes": traced["peak_bytes"],
+        "rows_in": traced["rows_in"],
+        "rows_out": traced["rows_out"],
+    }
+
+
+def _run(name, setup, operation, trace_memory):
+    """Profiler record of one run of an operation on a fresh manager"""
+    manager = setup()
+    records = []
+    profiler = manager.profiler
+    profiler.sinks = [records.append]
+    profiler.trace_memory = trace_memory
+    gc.collect()
+    with profiler.operation(name):
+        operation(manager)
+    return records[-1]
+
+
+def run_dataset(name, repeat, options, directory):
+    """Results of every operation on a named dataset"""
+    frame = make_dataset(name, **options)
+    csv_path = os.path.join(directory, f"{name}.csv")
+    frame.to_csv(csv_path, index=False)
+
+    def loaded():
+        return DataManager()
+
+    def with_frame():
+        manager = DataManager()
+        manager.set_dataset(csv_path, frame.copy())
+        return manager
+
+    results = [
+        measure("load_dataset", loaded, lambda m: m.load_dataset(csv_path), repeat)
+    ]
+    for operation_name, operation in OPERATIONS:
+        results.append(
+            measure(
+                operation_name, with_frame, lambda m: operation(m, frame), repeat
+            )
+        )
+
+    rows, columns = frame.shape
+    for result in results:
+        result.update(dataset=name, rows=rows, columns=columns)
+    return results
+
+
+def environment():
+    """Versions and machine the results were measured on"""
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of results against baseline results, as printable lines
+
+    An operation regresses when its wall time or peak memory grew by more
+    than tolerance, relative to the baseline, and by more than the noise
+    floor. Operations missing from either side are skipped.
+    """
+    previous = {(r["dataset"], r["operation"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'dataset':<16}{'operation':<28}{'time':>9}{'memory':>9}")
+    for result in results:
+        old = previous.get((result["dataset"], result["operation"]))
+        if old is None:
+            continue
+        time_ratio = _ratio(result["wall_s"], old["wall_s"])
+        memory_ratio = _ratio(result["peak_bytes"], old["peak_bytes"])
+        print(
+            f"{result['dataset']:<16}{result['operation']:<28}"
+            f"{time_ratio:>8.2f}x{memory_ratio:>8.2f}x"
+        )
+
+        label = f"{result['dataset']} {result['operation']}"
+        if (
+            time_ratio > 1 + tolerance
+            and result["wall_s"] - old["wall_s"] > MIN_TIME_DIFF_S
+        ):
+            regressions.append(
+                f"{label}: {old['wall_s']:.3f} s -> {result['wall_s']:.3f} s"
+            )
+        if (
+            memory_ratio > 1 + tolerance
+            and result["peak_bytes"] - old["peak_bytes"] > MIN_MEMORY_DIFF_BYTES
+        ):
+            regressions.append(
+                f"{label}: {old['peak_bytes'] / 1e6:.1f} MB -> "
+                f"{result['peak_bytes'] / 1e6:.1f} MB"
+            )
+    return regressions
+
+
+def _ratio(new, old):
+    """new / old, treating a zero baseline as no change"""
+    return new / old if old else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--datasets",
+        default=",".join(DEFAULT_DATASETS),
+        help=f"comma-separated names from: {', '.join(DATASETS)}",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--missing", type=float)
+    parser.add_argument("--duplicates", type=float)
+    parser.add_argument("--outliers", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.datasets.split(",") if name.strip()]
+    unknown = [name for name in names if name not in DATASETS]
+    if unknown:
+        parser.error(f"unknown datasets: {', '.join(unknown)}")
+    options = {
+        key: getattr(args, key)
+        for key in ("missing", "duplicates", "outliers", "seed")
+        if getattr(args, key) is not None
+    }
+
+    directory = tempfile.mkdtemp(prefix="datox-benchmark-")
+    results = []
+    try:
+        print(
+            f"{'dataset':<16}{'operation':<28}{'wall (s)':>10}{'cpu (s)':>10}"
+            f"{'peak (MB)':>11}"
+        )
+        for name in names:
+            for result in run_dataset(name, args.repeat, options, directory):
+                results.append(result)
+                print(
+                    f"{name:<16}{result['operation']:<28}{result['wall_s']:>10.3f}"
+                    f"{result['cpu_s']:>10.3f}{result['peak_bytes'] / 1e6:>11.1f}"
+                )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    report = dict(environment(), repeat=args.repeat, options=options, results=results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            raise SystemExit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
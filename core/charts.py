@@ -0,0 +1,526 @@
+"""
+Charts - Data preparation and drawing of the visualization panel's charts
+
+Every chart is split in two: a *_data function computes what is plotted
+from the data, and a draw_* function draws it on matplotlib axes. Neither
+needs Tk, so charts can be drawn with the Agg backend and no display, and
+the two halves can be timed separately. Invalid input raises ValueError
+with a message for the user.
+"""
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.artist import setp
+from matplotlib.colors import LogNorm
+from matplotlib.image import AxesImage
+from matplotlib.ticker import FuncFormatter
+from core.lod import ScatterLOD, cell_index
+from core.sketches import box_stats
+
+
+# In the "auto" scatter mode, more points than this are drawn as a density image
+DENSITY_POINTS = 100_000
+# More points than this are drawn through a ScatterLOD, which thins them to the view
+LOD_POINTS = 20_000
+DENSITY_BINS = 300
+DENSITY_CMAP = "viridis"
+SCATTER_MODES = ["auto", "points", "density"]
+
+DEFAULT_MAX_CATEGORIES = 10
+# Categories whose n, mean and median are written on a box plot
+MAX_SUMMARY_CATEGORIES = 5
+STRONG_CORRELATION = 0.7
+# Above this, heatmap cells are too small to read and annotating them takes minutes
+MAX_ANNOTATED_COLUMNS = 30
+
+MEAN_MARKER = {
+    "marker": "o",
+    "markerfacecolor": "white",
+    "markeredgecolor": "black",
+}
+TEXT_BOX = dict(boxstyle="round", facecolor="white", alpha=0.8)
+SMALL_TEXT_BOX = dict(boxstyle="round,pad=0.5", facecolor="white", alpha=0.8)
+
+
+def _number_formatter():
+    """Tick formatter with thousands separators and two decimals"""
+    return FuncFormatter(lambda value, _: f"{value:,.2f}")
+
+
+def _complete_rows(frame, x_col, y_col):
+    """Rows of frame where both columns have a value"""
+    mask = frame[x_col].notna() & frame[y_col].notna()
+    return frame.loc[mask, list(dict.fromkeys([x_col, y_col]))]
+
+
+def scatter_data(frame, x_col, y_col, regression=None, degree=2):
+    """Points, correlation and optional regression fit of a scatter plot
+
+    regression is None, "linear" or "polynomial" (of degree). The points
+    keep the index labels of their rows.
+    """
+    valid = _complete_rows(frame, x_col, y_col)
+    if len(valid) < 2:
+        raise ValueError("Not enough valid data points to create scatter plot")
+
+    x = valid[x_col].to_numpy(dtype=np.float64)
+    y = valid[y_col].to_numpy(dtype=np.float64)
+    data = {
+        "x_column": x_col,
+        "y_column": y_col,
+        "x": x,
+        "y": y,
+        "index": valid.index,
+        "correlation": valid[x_col].corr(valid[y_col]),
+        "fit": None,
+    }
+    if regression is None:
+        return data
+
+    degree = 1 if regression == "linear" else degree
+    coefficients = np.polyfit(x, y, degree)
+    predicted = np.poly1d(coefficients)(x)
+    ss_total = np.sum((y - y.mean()) ** 2)
+    ss_residual = np.sum((y - predicted) ** 2)
+    data["fit"] = {
+        "type": regression,
+        "degree": degree,
+        "coefficients": coefficients,
+        "residual_std": np.std(y - predicted),
+        "r_squared": 1 - ss_residual / ss_total,
+    }
+    return data
+
+
+def draw_scatter(
+    ax, data, marker_size=50, color=None, show_stats=True, mode="auto"
+):
+    """Draw scatter_data on ax
+
+    mode is one of SCATTER_MODES: "points" draws every point as a marker,
+    "density" draws the number of points in each cell of a grid as an
+    image, and "auto" draws a density image above DENSITY_POINTS points.
+    Above LOD_POINTS, only the points in view are drawn as markers, thinned
+    to the screen's resolution and looked up again on zoom and pan.
+    """
+    if mode == "density" or (mode == "auto" and len(data["x"]) > DENSITY_POINTS):
+        image = ax.add_image(DensityImage(ax, data["x"], data["y"]))
+        ax.figure.colorbar(image, ax=ax, label="Points per bin")
+    else:
+        many = len(data["x"]) > LOD_POINTS
+        collection = ax.scatter(
+            data["x"][:0] if many else data["x"],
+            data["y"][:0] if many else data["y"],
+            s=marker_size,
+            alpha=0.7,
+            edgecolor="w",
+            linewidth=0.5,
+            color=color,
+        )
+        if many:
+            ScatterLOD(ax, collection, data["x"], data["y"])
+
+    fit = data["fit"]
+    if fit is not None:
+        _draw_fit(ax, data["x"], fit)
+
+    if show_stats:
+        stats_text = (
+            f"Correlation: {data['correlation']:.4f}\n"
+            f"Number of points: {len(data['x'])}\n"
+        )
+        if fit is not None:
+            stats_text += f"R²: {fit['r_squared']:.4f}\n"
+        ax.text(
+            0.05,
+            0.95,
+            stats_text,
+            transform=ax.transAxes,
+            fontsize=10,
+            verticalalignment="top",
+            bbox=TEXT_BOX,
+        )
+
+    if fit is not None:
+        ax.legend(loc="best", frameon=True, framealpha=0.8)
+
+    ax.set_xlabel(f"{data['x_column']}", fontsize=12)
+    ax.set_ylabel(f"{data['y_column']}", fontsize=12)
+    ax.grid(True, linestyle="--", alpha=0.7)
+    ax.xaxis.set_major_formatter(_number_formatter())
+    ax.yaxis.set_major_formatter(_number_formatter())
+
+
+def _draw_fit(ax, x, fit):
+    """Regression curve, with a band of one residual std for a linear fit"""
+    polynomial = np.poly1d(fit["coefficients"])
+    x_range = np.linspace(x.min(), x.max(), 100)
+    if fit["type"] == "linear":
+        slope, intercept = fit["coefficients"]
+        ax.plot(
+            x_range,
+            polynomial(x_range),
+            "r--",
+            linewidth=2,
+            label=f"y = {slope:.4f}x + {intercept:.4f}",
+        )
+        if len(x) > 2:
+            # The band is straight, so its ends are enough to draw it
+            y_ends = polynomial(x_range[[0, -1]])
+            ax.fill_between(
+                x_range[[0, -1]],
+                y_ends - fit["residual_std"],
+                y_ends + fit["residual_std"],
+                alpha=0.2,
+                color="red",
+            )
+    else:
+        ax.plot(
+            x_range,
+            polynomial(x_range),
+            "r-",
+            linewidth=2,
+            label=f"Polynomial (degree {fit['degree']})",
+        )
+
+
+class DensityImage(AxesImage):
+    """Image of the number of points in each cell of a grid over the view
+
+    The points are binned again when the axes' view limits have changed
+    since the last draw, as after a zoom or pan with the navigation
+    toolbar, so the grid always covers just the visible range. Counts are
+    colored on a log scale, and empty cells are left transparent.
+    """
+
+    def __init__(self, ax, x, y, bins=DENSITY_BINS, cmap=DENSITY_CMAP):
+        super().__init__(
+            ax, cmap=cmap, norm=LogNorm(), origin="lower", interpolation="nearest"
+        )
+        self.x = x
+        self.y = y
+        self.bins = bins
+        self._limits = None
+        self._bin(_padded_range(x) + _padded_range(y))
+
+    def draw(self, renderer, *args, **kwargs):
+        """Bin the points again if the view changed, then draw"""
+        x_limits = tuple(sorted(self.axes.get_xlim()))
+        y_limits = tuple(sorted(self.axes.get_ylim()))
+        if x_limits + y_limits != self._limits:
+            self._bin(x_limits + y_limits)
+        super().draw(renderer, *args, **kwargs)
+
+    def _bin(self, limits):
+        """Count the points over (x min, x max, y min, y max)"""
+        counts = density_grid(self.x, self.y, limits[:2], limits[2:], self.bins)
+        self.set_data(counts)
+        self.norm.vmin = 1
+        self.norm.vmax = max(counts.max(), 1)
+        self.set_extent(limits)
+        self._limits = limits
+
+
+def density_grid(x, y, x_limits, y_limits, bins=DENSITY_BINS):
+    """Number of points in each cell of a bins x bins grid over the limits
+
+    Rows of the result go along y and columns along x, as an image shows
+    them. Points outside the limits are not counted.
+    """
+    (x_min, x_max), (y_min, y_max) = x_limits, y_limits
+    inside = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+    columns = cell_index(x[inside], x_min, x_max, bins)
+    rows = cell_index(y[inside], y_min, y_max, bins)
+    counts = np.bincount(rows * bins + columns, minlength=bins * bins)
+    return counts.reshape(bins, bins)
+
+
+def _padded_range(values):
+    """(min, max) of values, widened if they are all equal"""
+    low, high = values.min(), values.max()
+    if low == high:
+        return low - 0.5, high + 0.5
+    return low, high
+
+
+def box_data(
+    frame, x_col, y_col, sort_by_median=False, max_categories=DEFAULT_MAX_CATEGORIES
+):
+    """Rows and category summaries of a box plot of y_col by x_col
+
+    At most max_categories categories are kept: the first ones, or, when
+    sorting by median, the ones with the highest medians.
+    """
+    valid = _complete_rows(frame, x_col, y_col)
+    if len(valid) == 0:
+        raise ValueError("No valid data points for box plot")
+
+    categories = valid[x_col].unique()
+    if sort_by_median:
+        medians = valid.groupby(x_col, observed=True)[y_col].median()
+        categories = medians.sort_values(kind="stable").index.to_numpy()
+
+    limit_message = None
+    if len(categories) > max_categories:
+        limit_message = (
+            f"Limiting display to {max_categories} categories "
+            f"(out of {len(categories)})"
+        )
+        if sort_by_median:
+            categories = categories[-max_categories:]
+        else:
+            categories = categories[:max_categories]
+
+    valid = valid[valid[x_col].isin(categories)]
+    if isinstance(valid[x_col].dtype, pd.CategoricalDtype):
+        valid = valid.assign(**{x_col: valid[x_col].cat.remove_unused_categories()})
+
+    displayed = valid[x_col].unique()
+    summary = None
+    if len(displayed) <= MAX_SUMMARY_CATEGORIES:
+        grouped = valid.groupby(x_col, observed=True)[y_col]
+        table = grouped.agg(["size", "mean", "median"]).reindex(list(displayed))
+        summary = list(table.itertuples(name=None))
+
+    return {
+        "x_column": x_col,
+        "y_column": y_col,
+        "data": valid,
+        "categories": len(displayed),
+        "limit_message": limit_message,
+        "summary": summary,
+    }
+
+
+def draw_box(
+    ax,
+    data,
+    horizontal=False,
+    notch=False,
+    show_means=True,
+    show_points=True,
+    palette="tab10",
+    width=0.8,
+):
+    """Draw box_data on ax, with the individual points as a strip plot"""
+    x_col, y_col = data["x_column"], data["y_column"]
+    if data["limit_message"] is not None:
+        ax.set_title(data["limit_message"], fontsize=10, color="gray")
+
+    # A horizontal plot swaps the axes the columns are drawn on
+    axes = {"y": x_col, "x": y_col} if horizontal else {"x": x_col, "y": y_col}
+    sns.boxplot(
+        **axes,
+        data=data["data"],
+        notch=notch,
+        showmeans=show_means,
+        meanprops=MEAN_MARKER,
+        palette=palette,
+        ax=ax,
+        width=width,
+        fliersize=3 if show_points else 0,
+    )
+    if show_points:
+        sns.stripplot(
+            **axes,
+            data=data["data"],
+            color="black",
+            alpha=0.3,
+            size=3,
+            ax=ax,
+            jitter=True,
+        )
+    ax.set_xlabel(f"{axes['x']}", fontsize=12)
+    ax.set_ylabel(f"{axes['y']}", fontsize=12)
+
+    if data["summary"] is not None:
+        stats_text = "\n".join(
+            f"{category}: n={n}, mean={mean:.2f}, median={median:.2f}"
+            for category, n, mean, median in data["summary"]
+        )
+        if horizontal:
+            position = dict(x=0.98, y=0.02, va="bottom", ha="right")
+        else:
+            position = dict(x=0.02, y=0.98, va="top", ha="left")
+        ax.text(
+            position["x"],
+            position["y"],
+            stats_text,
+            transform=ax.transAxes,
+            fontsize=9,
+            verticalalignment=position["va"],
+            horizontalalignment=position["ha"],
+            bbox=SMALL_TEXT_BOX,
+        )
+
+    if not horizontal and data["categories"] > 3:
+        setp(ax.get_xticklabels(), rotation=45, ha="right")
+
+    numeric_axis = ax.xaxis if horizontal else ax.yaxis
+    numeric_axis.set_major_formatter(_number_formatter())
+
+    if data["summary"] is not None and not horizontal:
+        # Make space for the statistics on the right
+        ax.figure.tight_layout(rect=[0, 0, 0.85, 1])
+    else:
+        ax.figure.tight_layout()
+
+
+def sketch_box_data(
+    sketches, sort_by_median=False, max_categories=DEFAULT_MAX_CATEGORIES
+):
+    """Categories and box statistics of an approximate box plot
+
+    sketches maps each category to a KLLSketch of its values, as
+    DataManager.group_sketches returns.
+    """
+    if not sketches:
+        raise ValueError("No valid data points for box plot")
+
+    groups = list(sketches.items())
+    if sort_by_median:
+        groups.sort(key=lambda item: item[1].quantile(0.5))
+
+    limit_message = None
+    if len(groups) > max_categories:
+        limit_message = (
+            f"Limiting display to {max_categories} categories (out of {len(groups)})"
+        )
+        if sort_by_median:
+            groups = groups[-max_categories:]
+        else:
+            groups = groups[:max_categories]
+
+    return {
+        "groups": groups,
+        "stats": [box_stats(sketch, str(category)) for category, sketch in groups],
+        "limit_message": limit_message,
+    }
+
+
+def draw_sketch_box(
+    ax,
+    data,
+    x_col,
+    y_col,
+    quantile_error,
+    horizontal=False,
+    notch=False,
+    show_means=True,
+    palette="tab10",
+    width=0.8,
+):
+    """Draw sketch_box_data on ax; individual points are not known"""
+    if data["limit_message"] is not None:
+        ax.set_title(data["limit_message"], fontsize=10, color="gray")
+
+    artists = ax.bxp(
+        data["stats"],
+        vert=not horizontal,
+        widths=width,
+        patch_artist=True,
+        shownotches=notch,
+        showmeans=show_means,
+        showfliers=False,
+        meanprops=MEAN_MARKER,
+        medianprops={"color": "black"},
+    )
+    colors = sns.color_palette(palette, len(data["stats"]))
+    for patch, color in zip(artists["boxes"], colors):
+        patch.set_facecolor(color)
+
+    if horizontal:
+        ax.set_xlabel(f"{y_col}", fontsize=12)
+        ax.set_ylabel(f"{x_col}", fontsize=12)
+    else:
+        ax.set_xlabel(f"{x_col}", fontsize=12)
+        ax.set_ylabel(f"{y_col}", fontsize=12)
+
+    stats_rows = [
+        f"{category}: n={sketch.count}, mean={sketch.mean:.2f}, "
+        f"median≈{sketch.quantile(0.5):.2f}"
+        for category, sketch in data["groups"][:MAX_SUMMARY_CATEGORIES]
+    ]
+    stats_rows.append(f"Approximate quantiles (±{quantile_error:.0%} rank)")
+    ax.text(
+        0.02,
+        0.98,
+        "\n".join(stats_rows),
+        transform=ax.transAxes,
+        fontsize=9,
+        verticalalignment="top",
+        horizontalalignment="left",
+        bbox=SMALL_TEXT_BOX,
+    )
+
+
+def heatmap_data(corr_matrix, cluster=False, upper_triangle=False):
+    """Ordered correlation matrix, mask and strong correlations of a heatmap
+
+    cluster reorders the variables by Ward hierarchical clustering, and
+    upper_triangle masks the upper triangle. Strong correlations, above
+    STRONG_CORRELATION in absolute value, are listed strongest first.
+    """
+    if len(corr_matrix.columns) < 2:
+        raise ValueError("Need at least two numeric columns for correlation analysis")
+
+    mask = None
+    if upper_triangle:
+        mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
+
+    if cluster:
+        import scipy.cluster.hierarchy as sch
+
+        linkage = sch.linkage(corr_matrix, method="ward")
+        order = sch.dendrogram(linkage, no_plot=True)["leaves"]
+        corr_matrix = corr_matrix.iloc[order, order]
+
+    values = corr_matrix.to_numpy()
+    rows, columns = np.triu_indices(len(values), k=1)
+    pairs = values[rows, columns]
+    strong = np.flatnonzero(np.abs(pairs) > STRONG_CORRELATION)
+    strong = strong[np.argsort(-np.abs(pairs[strong]), kind="stable")]
+    names = corr_matrix.columns
+    return {
+        "matrix": corr_matrix,
+        "mask": mask,
+        "strong": [
+            (names[rows[i]], names[columns[i]], pairs[i]) for i in strong
+        ],
+    }
+
+
+def draw_heatmap(figure, data, title, annotate=True, cmap="viridis"):
+    """Draw heatmap_data on a cleared figure; returns the heatmap's axes
+
+    Values are written in the cells if annotate is set and the matrix has
+    at most MAX_ANNOTATED_COLUMNS columns.
+    """
+    figure.clear()
+    ax = figure.add_subplot(111)
+    sns.heatmap(
+        data["matrix"],
+        annot=annotate and len(data["matrix"].columns) <= MAX_ANNOTATED_COLUMNS,
+        cmap=cmap,
+        mask=data["mask"],
+        linewidths=0.5,
+        ax=ax,
+        fmt=".2f",
+        square=True,
+        cbar_kws={"shrink": 0.8, "label": "Correlation Coefficient"},
+    )
+    setp(ax.get_xticklabels(), rotation=45, ha="right")
+    setp(ax.get_yticklabels(), rotation=0)
+    ax.set_title(title, fontsize=14, pad=20)
+
+    if data["strong"]:
+        text = "Strong correlations:\n\n"
+        for var1, var2, corr in data["strong"]:
+            text += f"{var1} ↔ {var2}: {corr:.2f}\n"
+        ax_text = figure.add_axes([0.7, 0.1, 0.25, 0.2])
+        ax_text.axis("off")
+        ax_text.text(0, 1, text, verticalalignment="top", fontsize=10, bbox=TEXT_BOX)
+
+    figure.tight_layout()
+    return ax
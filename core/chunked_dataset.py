@@ -0,0 +1,636 @@
+"""
+ChunkedDataset - Out-of-core dataset kept as columnar chunks on disk
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+from core.dedup import RowHashIndex
+from core.encoding import file_fingerprint
+from core.loader import DEFAULT_CHUNK_SIZE, LoadCancelled, iter_csv_chunks
+from core.project_store import MANIFEST_NAME, ProjectStore
+from core.sketches import (
+    DEFAULT_QUANTILE_ERROR,
+    HeavyHitters,
+    HyperLogLog,
+    KLLSketch,
+    category_sketches,
+)
+from core.summary import QUARTILES, NumericSummary, quantiles
+
+
+CACHE_ROOT = os.path.join(os.path.expanduser("~"), ".datox", "cache")
+# Cache entries beyond this total size are removed, least recently used first
+CACHE_LIMIT_BYTES = 20 * 1024**3
+# Cache entries not opened for this long are removed
+CACHE_MAX_AGE_S = 30 * 24 * 60 * 60
+# Exact statistics of a column holding more values and distinct counts in
+# memory than this are computed from sketches instead
+EXACT_STATS_BYTES = 512 * 1024**2
+
+logger = logging.getLogger("datox.dataset")
+
+
+class ChunkedDataset:
+    """Dataset stored on disk as row chunks of memory-mapped column files
+
+    A CSV file is converted once into a cache directory (one per file
+    version) in the ProjectStore format, with every chunk of rows stored as
+    its own frame entry. Column files are named after their content, so a
+    rewritten chunk reuses the files of the columns it did not change.
+
+    Datasets are immutable: operations return a new ChunkedDataset sharing
+    the cache, which keeps an undo step as cheap as holding on to the old
+    object. Streaming methods hold one chunk at a time; column() and
+    frame() assume the requested columns fit in memory.
+
+    The cache does not clean itself up: remove_unused_files deletes the
+    files of superseded datasets and evict_cache whole cache entries, once
+    the caller knows which datasets are still in use.
+    """
+
+    def __init__(self, store, chunks, schema=None):
+        self.store = store
+        self.chunks = list(chunks)
+
+        if self.chunks:
+            self._dtypes = _unify_dtypes(self.chunks)
+        else:
+            self._dtypes = dict(schema or {})
+        self._columns = list(self._dtypes)
+        self._offsets = np.cumsum([0] + [chunk["rows"] for chunk in self.chunks])
+        self._stats = {}
+
+    @classmethod
+    def from_csv(
+        cls,
+        file_path,
+        cache_root=None,
+        chunksize=DEFAULT_CHUNK_SIZE,
+        progress_callback=None,
+        cancel_event=None,
+    ):
+        """Open a CSV file out of core, converting it to the chunk cache if needed"""
+        fingerprint = file_fingerprint(file_path)
+        key = hashlib.blake2b(repr(fingerprint).encode("utf-8"), digest_size=16)
+        store = ProjectStore(os.path.join(cache_root or CACHE_ROOT, key.hexdigest()))
+
+        if ProjectStore.is_project(store.path):
+            try:
+                manifest = store.read_manifest()
+            except (OSError, ValueError):
+                manifest = None
+            if (
+                manifest is not None
+                and manifest["metadata"].get("chunksize") == chunksize
+            ):
+                # The manifest's time is when the entry was last used
+                os.utime(os.path.join(store.path, MANIFEST_NAME))
+                return cls(store, manifest["frames"].values())
+
+        chunks = []
+        try:
+            for chunk in iter_csv_chunks(
+                file_path,
+                chunksize=chunksize,
+                progress_callback=progress_callback,
+                cancel_event=cancel_event,
+            ):
+                chunks.append(store.save_frame(chunk))
+        except BaseException:
+            # A partial conversion is never reused
+            shutil.rmtree(store.path, ignore_errors=True)
+            raise
+
+        store.write_manifest(
+            {f"chunk_{number:05d}": chunk for number, chunk in enumerate(chunks)},
+            {"source": fingerprint[0], "chunksize": chunksize},
+        )
+        return cls(store, chunks)
+
+    @property
+    def columns(self):
+        """Column labels"""
+        return pd.Index(self._columns)
+
+    @property
+    def dtypes(self):
+        """Column dtypes, unified across chunks"""
+        return pd.Series(list(self._dtypes.values()), index=self.columns, dtype=object)
+
+    @property
+    def shape(self):
+        """(rows, columns) without reading any data"""
+        return (len(self), len(self._columns))
+
+    def __len__(self):
+        return int(self._offsets[-1])
+
+    @property
+    def index(self):
+        """Row index of the whole dataset"""
+        indexes = [self.store.load_index(chunk) for chunk in self.chunks]
+        if all(isinstance(index, pd.RangeIndex) for index in indexes):
+            if all(
+                index.start == start and index.step == 1
+                for index, start in zip(indexes, self._offsets)
+            ):
+                return pd.RangeIndex(len(self))
+        if not indexes:
+            return pd.RangeIndex(0)
+        return indexes[0].append(indexes[1:])
+
+    def dtype(self, column):
+        """Dtype of one column"""
+        return self._dtypes[column]
+
+    def is_loaded(self, column):
+        """Columns are never held in memory between calls"""
+        return False
+
+    def iter_chunks(self, columns=None, cancel_event=None):
+        """Yield each chunk as a DataFrame with the given columns (default all)"""
+        if columns is None:
+            columns = self._columns
+        for chunk in self.chunks:
+            _check_cancelled(cancel_event)
+            yield self._load(chunk, columns)
+
+    def _iter_column(self, column):
+        """Yield one column chunk by chunk"""
+        for chunk in self.chunks:
+            yield self._load(chunk, [column])[column]
+
+    def _load(self, chunk, columns, start=0, stop=None):
+        """Read columns of one chunk, cast to the dataset dtypes"""
+        index = self.store.load_index(chunk, start=start, stop=stop)
+        entries = {entry["name"]: entry for entry in chunk["columns"]}
+
+        series_list = []
+        for name in columns:
+            series = self.store.load_column(
+                entries[name], index, start=start, stop=stop
+            )
+            if series.dtype != self._dtypes[name]:
+                series = series.astype(self._dtypes[name])
+            series_list.append(series)
+
+        if not series_list:
+            return pd.DataFrame(index=index)
+        return pd.concat(series_list, axis=1, copy=False)
+
+    def column(self, column):
+        """Load a whole column as a Series"""
+        return self.frame([column])[column]
+
+    def frame(self, columns):
+        """Load whole columns as a DataFrame"""
+        parts = list(self.iter_chunks(list(columns)))
+        if not parts:
+            return pd.DataFrame(
+                {c: pd.Series(dtype=self._dtypes[c]) for c in columns},
+                index=pd.RangeIndex(0),
+            )
+        return pd.concat(parts)
+
+    def rows(self, start, stop):
+        """Rows start:stop, reading only the chunks that hold them"""
+        stop = min(stop, len(self))
+        parts = []
+        first = max(int(np.searchsorted(self._offsets, start, side="right")) - 1, 0)
+        for number in range(first, len(self.chunks)):
+            chunk_start = int(self._offsets[number])
+            if chunk_start >= stop:
+                break
+            chunk = self.chunks[number]
+            parts.append(
+                self._load(
+                    chunk,
+                    self._columns,
+                    max(start - chunk_start, 0),
+                    min(stop - chunk_start, chunk["rows"]),
+                )
+            )
+
+        if not parts:
+            return self.frame(self._columns).iloc[0:0]
+        return pd.concat(parts)
+
+    def take(self, positions):
+        """Rows at sorted positions, reading only the chunks that hold them"""
+        positions = np.asarray(positions)
+        parts = []
+        for number, chunk in enumerate(self.chunks):
+            start, stop = self._offsets[number], self._offsets[number + 1]
+            first, last = np.searchsorted(positions, [start, stop])
+            if last > first:
+                part = self._load(chunk, self._columns)
+                parts.append(part.take(positions[first:last] - start))
+
+        if not parts:
+            return self.frame(self._columns).iloc[0:0]
+        return pd.concat(parts)
+
+    def to_pandas(self):
+        """Load the whole dataset into a DataFrame"""
+        return self.frame(self._columns)
+
+    def stats(self, column, approximate=False, quantile_error=DEFAULT_QUANTILE_ERROR):
+        """Statistics of a column in the format of DataManager.get_column_stats
+
+        Computed in one streaming pass and cached, since the dataset never
+        changes. Moments are merged chunk by chunk. Exact quartiles need the
+        column's non-missing numeric values in memory, and the exact distinct
+        count a table of every distinct value. With approximate, quartiles
+        come from a KLLSketch with rank error quantile_error and the distinct
+        count and top values from HyperLogLog and HeavyHitters sketches, so
+        memory stays bounded whatever the column size. Exact statistics switch
+        to the sketches, with a warning, once they hold EXACT_STATS_BYTES.
+        """
+        key = (column, approximate, quantile_error)
+        if key not in self._stats:
+            self._stats[key] = self._compute_stats(column, approximate, quantile_error)
+        return self._stats[key]
+
+    def _compute_stats(self, column, approximate, quantile_error):
+        """Streaming version of compute_column_stats"""
+        dtype = self._dtypes[column]
+        numeric = pd.api.types.is_numeric_dtype(dtype)
+        # float64 rounds integers beyond 2**53, so their range is kept exact
+        integer = pd.api.types.is_integer_dtype(dtype)
+        low = high = None
+
+        missing = 0
+        counts = []
+        summary = NumericSummary()
+        values = []
+        held = 0
+        sketch = KLLSketch(quantile_error)
+        distinct = HyperLogLog()
+        frequent = HeavyHitters()
+        for part in self._iter_column(column):
+            missing += int(part.isna().sum())
+            part_counts = part.value_counts()
+            if approximate:
+                distinct.update(part_counts.index.to_series())
+                frequent.add_counts(part_counts)
+            else:
+                counts.append(part_counts)
+                held += part_counts.memory_usage(deep=True)
+            if integer and part.count():
+                low = part.min() if low is None else min(low, part.min())
+                high = part.max() if high is None else max(high, part.max())
+            if numeric:
+                present = summary.add(part.to_numpy(dtype=np.float64, na_value=np.nan))
+                if approximate:
+                    sketch.update(present)
+                else:
+                    values.append(present)
+                    held += present.nbytes
+
+            if not approximate and held > EXACT_STATS_BYTES:
+                logger.warning(
+                    "Column %r is too large for exact statistics in memory; "
+                    "they are estimated from sketches instead",
+                    column,
+                )
+                for part_counts in counts:
+                    distinct.update(part_counts.index.to_series())
+                    frequent.add_counts(part_counts)
+                for present in values:
+                    sketch.update(present)
+                counts, values = [], []
+                approximate = True
+
+        if approximate:
+            unique = min(distinct.estimate(), len(self) - missing)
+            top_counts, total = frequent.top(5), frequent.total
+        else:
+            value_counts = _merge_counts(counts)
+            unique = len(value_counts)
+            top_counts, total = value_counts.head(5), value_counts.sum()
+        stats = {"count": len(self), "missing": missing, "unique": unique}
+
+        if numeric:
+            if approximate:
+                stats.update(summary.stats(sketch.quantiles(QUARTILES)))
+            else:
+                present = np.concatenate(values) if values else np.empty(0)
+                stats.update(summary.stats(quantiles(present, QUARTILES)))
+            if low is not None:
+                stats["min"] = int(low)
+                stats["max"] = int(high)
+
+        stats["dtype"] = str(dtype)
+
+        if pd.api.types.is_object_dtype(dtype) or isinstance(
+            dtype, (pd.CategoricalDtype, pd.StringDtype)
+        ):
+            stats["top_values"] = (top_counts / total).to_dict()
+
+        return stats
+
+    def value_counts(self, column):
+        """Counts of each non-missing value, largest first"""
+        return _merge_counts(
+            part.value_counts() for part in self._iter_column(column)
+        )
+
+    def quantiles(self, column, q):
+        """Exact quantiles of a numeric column, as pandas computes them"""
+        values = [
+            part.dropna().to_numpy(dtype=np.float64)
+            for part in self._iter_column(column)
+        ]
+        return quantiles(np.concatenate(values) if values else np.empty(0), q)
+
+    def sketch(self, column, error):
+        """KLLSketch of a numeric column, built one chunk at a time"""
+        sketch = KLLSketch(error)
+        for part in self._iter_column(column):
+            sketch.update(part.to_numpy(dtype=np.float64, na_value=np.nan))
+        return sketch
+
+    def category_sketches(self, column):
+        """(HyperLogLog, HeavyHitters) of a column, built one chunk at a time"""
+        return category_sketches(self._iter_column(column))
+
+    def duplicated(self, columns=None, keep="first", cancel_event=None):
+        """Boolean mask of duplicate rows, over all or some columns
+
+        Rows are compared by a 64-bit hash of their values (see core.dedup),
+        so only one hash per row is kept in memory rather than the rows
+        themselves.
+        """
+        return self.row_hash_index(columns, cancel_event).duplicated(keep)
+
+    def row_hash_index(self, columns=None, cancel_event=None):
+        """RowHashIndex of the dataset, filled one chunk at a time"""
+        index = RowHashIndex(columns)
+        for part in self.iter_chunks(columns, cancel_event=cancel_event):
+            index.update(part)
+        return index
+
+    def rewrite(self, columns, transform, reset_index=False, cancel_event=None):
+        """Return a new dataset with transform applied chunk by chunk
+
+        transform(part, start) receives the given columns of one chunk and
+        the chunk's first row number, and returns (replaced, keep): a dict of
+        new Series for changed columns and a boolean row mask or None.
+        Unchanged column files are reused; only chunks that lose rows are
+        written again in full. With reset_index the row labels are
+        renumbered from 0.
+        """
+        chunks = []
+        offset = 0
+        for number, chunk in enumerate(self.chunks):
+            _check_cancelled(cancel_event)
+            part = self._load(chunk, columns)
+            replaced, keep = transform(part, int(self._offsets[number]))
+
+            if keep is not None and not keep.all():
+                if not keep.any():
+                    continue
+                full = self._load(chunk, self._columns)
+                for name, series in replaced.items():
+                    full[name] = series
+                new_chunk = self.store.save_frame(full.take(np.flatnonzero(keep)))
+            else:
+                new_chunk = dict(chunk)
+                new_chunk["columns"] = [
+                    self._save_replaced(replaced, entry) for entry in chunk["columns"]
+                ]
+
+            if reset_index:
+                new_chunk["index"] = {
+                    "kind": "range",
+                    "start": offset,
+                    "stop": offset + new_chunk["rows"],
+                    "step": 1,
+                }
+            offset += new_chunk["rows"]
+            chunks.append(new_chunk)
+
+        return ChunkedDataset(self.store, chunks, schema=self._dtypes)
+
+    def files_exist(self):
+        """Whether every file of the dataset is still in the cache"""
+        try:
+            present = set(os.listdir(self.store.columns_path))
+        except OSError:
+            return False
+        return all(
+            name in present
+            for chunk in self.chunks
+            for name in self.store.frame_files(chunk)
+        )
+
+    def remove_unused_files(self, datasets):
+        """Delete the cache files that only superseded datasets used
+
+        datasets must include every dataset of this cache that is still in
+        use. Files of the converted CSV file are always kept.
+        """
+        manifest = self.store.read_manifest()
+        chunks = list(manifest["frames"].values())
+        for dataset in datasets:
+            if (
+                isinstance(dataset, ChunkedDataset)
+                and dataset.store.path == self.store.path
+            ):
+                chunks += dataset.chunks
+        self.store.remove_files_except(chunks)
+
+    def _save_replaced(self, replaced, entry):
+        """Entry of a column of a rewritten chunk, writing it if it was replaced"""
+        if entry["name"] not in replaced:
+            return entry
+        return self.store.save_column(replaced[entry["name"]].rename(entry["name"]))
+
+    def filter(self, keep, reset_index=False, cancel_event=None):
+        """Return a new dataset with only the rows where keep is True"""
+        return self.rewrite(
+            [],
+            lambda part, start: ({}, keep[start : start + len(part)]),
+            reset_index=reset_index,
+            cancel_event=cancel_event,
+        )
+
+    def group_mean(self, x_column, y_column):
+        """Mean of y per value of x, as DataFrame.groupby(x)[y].mean() gives it"""
+        partial = [
+            part.groupby(x_column, observed=True)[y_column].agg(["sum", "count"])
+            for part in self.iter_chunks(list(dict.fromkeys([x_column, y_column])))
+        ]
+        if not partial:
+            return pd.DataFrame({x_column: [], y_column: []})
+
+        totals = pd.concat(partial).groupby(level=0, observed=True).sum()
+        means = totals["sum"].where(totals["count"] > 0) / totals["count"].where(
+            totals["count"] > 0
+        )
+        return means.rename(y_column).rename_axis(x_column).reset_index()
+
+    def histogram(self, column, bins):
+        """Bin counts and edges of a numeric column, as numpy.histogram gives them"""
+        low, high = np.inf, -np.inf
+        for part in self._iter_column(column):
+            values = part.dropna().to_numpy(dtype=np.float64)
+            if len(values):
+                low, high = min(low, values.min()), max(high, values.max())
+        if low > high:
+            return np.zeros(bins, dtype=np.int64), np.linspace(0, 1, bins + 1)
+
+        edges = np.histogram_bin_edges(np.array([low, high]), bins=bins)
+        counts = np.zeros(len(edges) - 1, dtype=np.int64)
+        for part in self._iter_column(column):
+            values = part.dropna().to_numpy(dtype=np.float64)
+            counts += np.histogram(values, bins=edges)[0]
+        return counts, edges
+
+    def correlation(self, columns):
+        """Pairwise Pearson correlation, as DataFrame.corr() gives it
+
+        Uses sums of products accumulated with one matrix product per
+        chunk, masking missing values so every pair uses the rows where
+        both are present.
+        """
+        k = len(columns)
+        pairs = np.zeros((k, k))
+        sums = np.zeros((k, k))
+        squares = np.zeros((k, k))
+        products = np.zeros((k, k))
+        shift = None
+
+        for part in self.iter_chunks(list(columns)):
+            values = part.to_numpy(dtype=np.float64, na_value=np.nan)
+            present = ~np.isnan(values)
+            if shift is None:
+                # Centering on rough means keeps the sums well conditioned
+                with np.errstate(invalid="ignore"):
+                    shift = np.nan_to_num(np.nanmean(values, axis=0))
+            centered = np.where(present, values - shift, 0.0)
+            weights = present.astype(np.float64)
+
+            pairs += weights.T @ weights
+            sums += centered.T @ weights
+            squares += (centered * centered).T @ weights
+            products += centered.T @ centered
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            covariance = pairs * products - sums * sums.T
+            variance = pairs * squares - sums**2
+            result = covariance / np.sqrt(variance * variance.T)
+        result = np.clip(result, -1.0, 1.0)
+        result[pairs < 1] = np.nan
+
+        return pd.DataFrame(result, index=list(columns), columns=list(columns))
+
+
+def evict_cache(keep, limit_bytes=CACHE_LIMIT_BYTES, max_age=CACHE_MAX_AGE_S):
+    """Delete cache entries next to the keep entry that are no longer useful
+
+    These are older versions of keep's CSV file, entries not opened for
+    max_age seconds, and then the least recently used ones until the cache
+    holds at most limit_bytes. keep is the cache directory of the dataset in
+    use and is never removed. Returns the paths removed.
+    """
+    root = os.path.dirname(keep)
+    source = _cache_source(keep)
+    now = time.time()
+
+    entries = []
+    removed = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if path == keep or not os.path.isdir(path):
+            continue
+        used = _last_used(path)
+        stale = source is not None and _cache_source(path) == source
+        if stale or now - used > max_age:
+            removed.append(path)
+        else:
+            entries.append((used, _directory_size(path), path))
+
+    total = _directory_size(keep) + sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= limit_bytes:
+            break
+        removed.append(path)
+        total -= size
+
+    for path in removed:
+        shutil.rmtree(path, ignore_errors=True)
+    return removed
+
+
+def _cache_source(path):
+    """Path of the CSV file a cache entry was converted from, or None"""
+    try:
+        return ProjectStore(path).read_manifest()["metadata"].get("source")
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _last_used(path):
+    """When a cache entry was last opened, or written if it has no manifest"""
+    manifest = os.path.join(path, MANIFEST_NAME)
+    return os.path.getmtime(manifest if os.path.exists(manifest) else path)
+
+
+def _directory_size(path):
+    """Bytes of the files under a directory"""
+    size = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.path.getsize(os.path.join(directory, name))
+            except OSError:
+                pass
+    return size
+
+
+def _merge_counts(counts):
+    """Add up value_counts results from several chunks, largest first"""
+    counts = [c for c in counts if len(c)]
+    if not counts:
+        return pd.Series(dtype=np.int64)
+    merged = pd.concat(counts).groupby(level=0, observed=True, sort=False).sum()
+    return merged.sort_values(ascending=False, kind="stable")
+
+
+def _unify_dtypes(chunks):
+    """One dtype per column that every chunk can be cast to"""
+    dtypes = {}
+    for chunk in chunks:
+        for entry in chunk["columns"]:
+            dtypes.setdefault(entry["name"], []).append(_entry_dtype(entry))
+    return {name: _common_dtype(found) for name, found in dtypes.items()}
+
+
+def _entry_dtype(entry):
+    """Dtype recorded in a column entry"""
+    try:
+        return pd.api.types.pandas_dtype(entry["dtype"])
+    except TypeError:
+        return np.dtype(object)
+
+
+def _common_dtype(dtypes):
+    """Smallest dtype that holds values of all the given dtypes"""
+    unique = list(dict.fromkeys(dtypes))
+    if len(unique) == 1:
+        return unique[0]
+    if all(isinstance(d, np.dtype) and d.kind in "iuf" for d in unique):
+        return np.result_type(*unique)
+    return np.dtype(object)
+
+
+def _check_cancelled(cancel_event):
+    """Raise LoadCancelled if the cancel event has been set"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise LoadCancelled("Operation was cancelled")
@@ -6,48 +6,227 @@ import pandas as pd
 import numpy as np
 import pickle
 import os
+from core.chunked_dataset import ChunkedDataset, evict_cache
+from core.dedup import RowHashIndex
+from core.fuzzy_dedup import DEFAULT_THRESHOLD, find_near_duplicates
+from core.loader import LoadCancelled, read_csv_chunked, read_excel_file
+from core.memory_optimizer import optimize_dtypes
+from core.operation_profiler import OperationProfiler, profiled
+from core.point_index import PointIndex
+from core.history import (
+    ColumnChange,
+    CompositeChange,
+    DtypeChange,
+    FrameSwap,
+    RowRemoval,
+    UndoStack,
+)
+from core.lazy_frame import LazyFrame
+from core.project_store import ProjectStore
+from core.sketches import DEFAULT_QUANTILE_ERROR, KLLSketch, category_sketches
+from core.stats_cache import StatsCache
+from core.summary import quantiles, summarize, summarize_integers
+
+
+UNDO_DIR = "undo"
+
+OUT_OF_CORE_THRESHOLD = 1024**3
+APPROXIMATE_STATISTICS_ROWS = 10_000_000
+SKETCH_BLOCK_ROWS = 1_000_000
+
+# Undo steps of saved projects can refer to cache files removed since
+MISSING_CACHE_MESSAGE = (
+    "The data of this step is no longer in the out-of-core cache. "
+    "Open the CSV file again to continue from its current state."
+)
 
 
 class DataManager:
-    """Handles data loading, processing, and management"""
+    """Handles data loading, processing, and management
+
+    The DataManager owns the current dataframe. Cleaning operations never
+    write into existing column arrays: a changed column is replaced by a new
+    Series, and operations that remove rows build a new frame. A Series or
+    frame handed out earlier (by get_column, get_frame or an undo record)
+    therefore keeps its values, and only the touched columns are copied.
+    Callers must not modify data they get from the DataManager in place;
+    they should copy it first.
+
+    CSV files larger than OUT_OF_CORE_THRESHOLD are opened out of core as a
+    ChunkedDataset. Cleaning operations and aggregations then stream over
+    the chunks on disk, and each undo step keeps the previous dataset.
+
+    Datasets with more than APPROXIMATE_STATISTICS_ROWS rows use sketches
+    (core.sketches) with bounded memory: quantiles from a KLLSketch with rank
+    error quantile_error for outlier bounds, box plots and the quartiles of
+    out-of-core columns, and distinct counts and most frequent values from
+    HyperLogLog and HeavyHitters for categorical and out-of-core columns.
+    Set approximate_statistics to True or False to choose regardless of size.
+    """
 
     def __init__(self):
         """Initialize DataManager"""
-        self.dataframe = None
-        self.original_dataframe = None
+        self._dataframe = None
+        self._lazy_frames = {}
         self.file_path = None
         self.file_name = None
-        self.history = []
+        self.undo_stack = UndoStack()
+        self.stats_cache = StatsCache()
+        self.approximate_statistics = None
+        self.quantile_error = DEFAULT_QUANTILE_ERROR
+        self._row_hashes = None
+        self._point_index = None
+        self.profiler = OperationProfiler(rows=self._row_count)
+
+    @property
+    def dataframe(self):
+        """Current dataframe; a lazily opened project is fully loaded on first use"""
+        return self._materialize("dataframe")
+
+    @dataframe.setter
+    def dataframe(self, value):
+        self._lazy_frames.pop("dataframe", None)
+        self._dataframe = value
+
+    @property
+    def history(self):
+        """Operations currently applied to the data, oldest first"""
+        return self.undo_stack.operations()
+
+    def _materialize(self, name):
+        """Turn a LazyFrame into a regular DataFrame the first time it is needed"""
+        lazy_frame = self._lazy_frames.pop(name, None)
+        if lazy_frame is not None:
+            setattr(self, "_" + name, lazy_frame.to_pandas())
+        return getattr(self, "_" + name)
+
+    def _current_frame(self):
+        """Current data as a DataFrame, an unloaded LazyFrame or a ChunkedDataset"""
+        return self._lazy_frames.get("dataframe", self._dataframe)
+
+    def _set_current(self, frame):
+        """Make a DataFrame, LazyFrame or ChunkedDataset the current data"""
+        if isinstance(frame, (LazyFrame, ChunkedDataset)):
+            self.dataframe = None
+            self._lazy_frames["dataframe"] = frame
+        else:
+            self.dataframe = frame
+
+    def _chunked_dataset(self):
+        """The current ChunkedDataset, or None for in-memory data"""
+        frame = self._current_frame()
+        return frame if isinstance(frame, ChunkedDataset) else None
+
+    def is_lazy(self):
+        """Whether the current data is read from disk on demand
+
+        True for a project that has not been fully loaded and for a dataset
+        opened out of core.
+        """
+        return "dataframe" in self._lazy_frames
+
+    def is_out_of_core(self):
+        """Whether the current data is a ChunkedDataset kept on disk"""
+        return self._chunked_dataset() is not None
 
-    def load_dataset(self, file_path):
+    @profiled
+    def load_dataset(
+        self,
+        file_path,
+        progress_callback=None,
+        cancel_event=None,
+        optimize=False,
+        arrow_strings=False,
+        out_of_core=None,
+    ):
         """Load dataset from file with encoding detection"""
-        self.file_path = file_path
-        self.file_name = os.path.basename(file_path)
+        dataframe = self.read_dataset(
+            file_path,
+            progress_callback,
+            cancel_event,
+            optimize,
+            arrow_strings,
+            out_of_core,
+        )
+        return self.set_dataset(file_path, dataframe)
+
+    def read_dataset(
+        self,
+        file_path,
+        progress_callback=None,
+        cancel_event=None,
+        optimize=False,
+        arrow_strings=False,
+        out_of_core=None,
+    ):
+        """Read a dataset from file without changing the manager state
+
+        Safe to call from a worker thread. CSV files are read in chunks so
+        progress_callback(bytes_read, total_bytes) is called as the parse
+        advances, and setting cancel_event raises LoadCancelled. The CSV
+        encoding is detected once per file rather than by re-parsing. With
+        optimize=True columns are converted to smaller dtypes after reading
+        (see optimize_dtypes).
 
-        encodings = ["utf-8", "latin1", "iso-8859-1", "cp1252"]
+        With out_of_core=True a CSV file is returned as a ChunkedDataset
+        instead of a DataFrame; with None that happens for files larger than
+        OUT_OF_CORE_THRESHOLD. Out-of-core datasets are not optimized.
+        """
+        with self.profiler.operation("read_dataset") as record:
+            dataset = self._read_dataset(
+                file_path,
+                progress_callback,
+                cancel_event,
+                optimize,
+                arrow_strings,
+                out_of_core,
+            )
+            record["rows_out"] = len(dataset)
+            return dataset
+
+    def _read_dataset(
+        self,
+        file_path,
+        progress_callback,
+        cancel_event,
+        optimize,
+        arrow_strings,
+        out_of_core,
+    ):
+        """read_dataset without the profiling"""
+        if file_path.endswith(".csv") and _use_out_of_core(file_path, out_of_core):
+            try:
+                return ChunkedDataset.from_csv(
+                    file_path,
+                    progress_callback=progress_callback,
+                    cancel_event=cancel_event,
+                )
+            except LoadCancelled:
+                raise
+            except Exception as e:
+                raise ValueError(f"Error reading CSV file: {str(e)}")
 
         if file_path.endswith(".csv"):
-            for encoding in encodings:
-                try:
-                    self.dataframe = pd.read_csv(
-                        file_path,
-                        encoding=encoding,
-                        on_bad_lines="skip",
-                        low_memory=True,
-                    )
-                    break  
-                except UnicodeDecodeError:
-                    continue  
-                except Exception as e:
-                    raise ValueError(f"Error reading CSV file: {str(e)}")
-            else:  
-                raise ValueError(
-                    "Could not determine the file encoding. The file might be corrupted."
+            try:
+                dataframe = read_csv_chunked(
+                    file_path,
+                    progress_callback=progress_callback,
+                    cancel_event=cancel_event,
                 )
+            except LoadCancelled:
+                raise
+            except Exception as e:
+                raise ValueError(f"Error reading CSV file: {str(e)}")
 
         elif file_path.endswith((".xls", ".xlsx")):
             try:
-                self.dataframe = pd.read_excel(file_path)
+                dataframe = read_excel_file(
+                    file_path,
+                    progress_callback=progress_callback,
+                    cancel_event=cancel_event,
+                )
+            except LoadCancelled:
+                raise
             except Exception as e:
                 raise ValueError(f"Error reading Excel file: {str(e)}")
         else:
@@ -55,173 +234,1281 @@ class DataManager:
                 f"Unsupported file format. Only CSV and Excel files are supported."
             )
 
-        if len(self.dataframe) > 100000: 
-            self.original_dataframe = self.dataframe.sample(
-                n=100000, random_state=42
-            ).copy()
-        else:
-            self.original_dataframe = self.dataframe.copy()
+        if optimize:
+            dataframe, _ = optimize_dtypes(dataframe, arrow_strings=arrow_strings)
 
-        self.history = []
+        return dataframe
 
-        return self.dataframe
+    def set_dataset(self, file_path, dataframe):
+        """Make a freshly read dataframe or ChunkedDataset the current dataset"""
+        self.file_path = file_path
+        self.file_name = os.path.basename(file_path)
+        self._set_current(dataframe)
+        self.undo_stack.close()
+        self.stats_cache.touch_all()
+        if isinstance(dataframe, ChunkedDataset):
+            # Without undo steps, no other dataset of the cache is in use
+            dataframe.remove_unused_files([dataframe])
+            evict_cache(dataframe.store.path)
+
+        return self._current_frame()
 
-    def save_project(self, file_path):
-        """Save the current project state"""
-        project_data = {
-            "dataframe": self.dataframe,
-            "original_dataframe": self.original_dataframe,
+    @profiled
+    def save_project(
+        self, file_path, compression=None, progress_callback=None, cancel_event=None
+    ):
+        """Save the current project state
+
+        Projects are directories in the columnar ProjectStore format. Saving
+        over an existing project only writes the columns that changed. The
+        undo and redo steps are saved next to the columns, so the original
+        data can still be restored after reopening.
+        """
+        undo = self.undo_stack.save(os.path.join(file_path, UNDO_DIR))
+        metadata = {
             "file_path": self.file_path,
             "file_name": self.file_name,
             "history": self.history,
+            "undo": undo,
         }
+        frames = {"dataframe": self._current_frame()}
 
-        with open(file_path, "wb") as f:
-            pickle.dump(project_data, f)
+        ProjectStore(file_path).save(
+            frames,
+            metadata,
+            compression=compression,
+            column_stats=self._stats_for_save,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+        )
 
-    def load_project(self, file_path):
-        """Load a saved project"""
-        with open(file_path, "rb") as f:
-            project_data = pickle.load(f)
+    @profiled
+    def read_project(
+        self, file_path, lazy=True, progress_callback=None, cancel_event=None
+    ):
+        """Read a saved project without changing the manager state
+
+        With lazy=True only the manifest is read: frames come back as
+        LazyFrame objects and columns are loaded when first used. Columnar
+        projects are memory-mapped; older pickled project files are still
+        accepted.
+        """
+        if not ProjectStore.is_project(file_path):
+            with open(file_path, "rb") as f:
+                return _with_original_loaded(pickle.load(f))
+
+        store = ProjectStore(file_path)
+        if lazy:
+            frames, metadata = store.open()
+        else:
+            frames, metadata = store.load(
+                progress_callback=progress_callback, cancel_event=cancel_event
+            )
+        project_data = dict(metadata)
+        project_data.update(frames)
+        if "undo" in project_data:
+            project_data["undo_path"] = os.path.join(file_path, UNDO_DIR)
+        return _with_original_loaded(project_data)
+
+    def set_project(self, project_data):
+        """Make a read project the current state"""
+        self._set_current(project_data["dataframe"])
 
-        self.dataframe = project_data["dataframe"]
-        self.original_dataframe = project_data["original_dataframe"]
         self.file_path = project_data["file_path"]
         self.file_name = project_data["file_name"]
-        self.history = project_data["history"]
 
-        return self.dataframe
+        self.undo_stack.close()
+        self.stats_cache.touch_all()
+        if "undo" in project_data:
+            self.undo_stack.load(project_data["undo_path"], project_data["undo"])
+        elif project_data.get("original_dataframe") is not None and project_data.get(
+            "history"
+        ):
+            # Older projects kept a copy of the original data instead of undo steps
+            self.undo_stack.push(
+                {"operation": "saved_changes", "steps": project_data["history"]},
+                FrameSwap(project_data["original_dataframe"]),
+            )
+
+        return self._current_frame()
 
+    @profiled
+    def load_project(
+        self, file_path, lazy=False, progress_callback=None, cancel_event=None
+    ):
+        """Load a saved project"""
+        project_data = self.read_project(
+            file_path, lazy, progress_callback, cancel_event
+        )
+        return self.set_project(project_data)
+
+    def close(self):
+        """Remove the temporary files of the undo steps; call when the app exits"""
+        self.undo_stack.close()
+
+    @profiled
     def clean_missing_values(self, column, method, value=None):
         """Clean missing values in a column"""
-        if self.dataframe is None or column not in self.dataframe.columns:
+        if not self.has_data() or column not in self.get_columns():
             return None
 
-        self.history.append(
-            {
-                "operation": "clean_missing",
-                "column": column,
-                "method": method,
-                "value": value,
-            }
-        )
+        operation = {
+            "operation": "clean_missing",
+            "column": column,
+            "method": method,
+            "value": value,
+        }
 
-        df = self.dataframe.copy()
+        dataset = self._chunked_dataset()
+        if dataset is not None:
+            if method == "drop":
+                return self._replace_dataset(
+                    operation,
+                    dataset.rewrite(
+                        [column],
+                        lambda part, start: ({}, part[column].notna().to_numpy()),
+                    ),
+                )
+            fill_value = _dataset_fill_value(dataset, column, method, value)
+            if fill_value is None:
+                return dataset
+            return self._replace_dataset(
+                operation,
+                dataset.rewrite(
+                    [column],
+                    lambda part, start: (
+                        {column: _fillna(part[column], fill_value)},
+                        None,
+                    ),
+                ),
+            )
+
+        df = self.dataframe
+        series = df[column]
 
         if method == "drop":
-            self.dataframe = df.dropna(subset=[column])
-        elif method == "mean" and pd.api.types.is_numeric_dtype(df[column]):
-            self.dataframe[column] = df[column].fillna(df[column].mean())
-        elif method == "median" and pd.api.types.is_numeric_dtype(df[column]):
-            self.dataframe[column] = df[column].fillna(df[column].median())
-        elif method == "mode":
-            mode_value = df[column].mode()[0] if not df[column].mode().empty else None
-            self.dataframe[column] = df[column].fillna(mode_value)
-        elif method == "value":
-            self.dataframe[column] = df[column].fillna(value)
+            change = RowRemoval.of(df, series.notna())
+            self.dataframe = change.apply(df)
+        else:
+            if method == "mean" and pd.api.types.is_numeric_dtype(series):
+                filled = series.fillna(series.mean())
+            elif method == "median" and pd.api.types.is_numeric_dtype(series):
+                filled = series.fillna(series.median())
+            elif method == "mode":
+                mode = series.mode()
+                filled = series.fillna(mode[0] if not mode.empty else None)
+            elif method == "value":
+                filled = _fillna(series, value)
+            else:
+                return self.dataframe
+
+            change = ColumnChange.between(column, series, filled)
+            # A shallow copy keeps frames handed out earlier unchanged, and
+            # replacing the column leaves every other column untouched
+            df = df.copy(deep=False)
+            df[column] = filled
+            self.dataframe = df
+
+        self._push(operation, change)
 
         return self.dataframe
 
-    def remove_duplicates(self):
-        """Remove duplicate rows"""
-        if self.dataframe is None:
+    @profiled
+    def remove_duplicates(self, columns=None, keep="first"):
+        """Remove duplicate rows, comparing all columns or only the key columns
+
+        keep is "first" or "last" to keep one row of each group of equal
+        rows, or False to remove every row that has a duplicate. Returns the
+        number of rows removed.
+        """
+        if not self.has_data():
+            return 0
+
+        drop = self._row_hash_index(columns).duplicated(keep)
+        if not drop.any():
             return 0
 
-        self.history.append({"operation": "remove_duplicates"})
+        operation = {"operation": "remove_duplicates", "columns": columns, "keep": keep}
+        dataset = self._chunked_dataset()
+        if dataset is not None:
+            deduplicated = dataset.filter(~drop, reset_index=True)
+            self._replace_dataset(operation, deduplicated)
+            return len(dataset) - len(deduplicated)
 
         original_rows = len(self.dataframe)
-        self.dataframe = self.dataframe.drop_duplicates().reset_index(drop=True)
+        change = RowRemoval.of(self.dataframe, ~drop, reset_index=True)
+        self.dataframe = change.apply(self.dataframe)
+        self._push(operation, change)
 
         return original_rows - len(self.dataframe)
 
+    @profiled
+    def find_duplicates(self, columns=None):
+        """Groups of duplicate rows, largest first (see RowHashIndex.clusters)
+
+        Row positions refer to the current data, as in get_rows.
+        """
+        if not self.has_data():
+            return None
+        return self._row_hash_index(columns).clusters()
+
+    def _row_hash_index(self, columns):
+        """RowHashIndex over the key columns, kept until one of them changes
+
+        find_duplicates followed by remove_duplicates hashes the rows once.
+        """
+        if columns is not None:
+            missing = [c for c in columns if c not in self.get_columns()]
+            if missing:
+                raise ValueError(f"Unknown columns: {', '.join(map(str, missing))}")
+        key_columns = self.get_columns() if columns is None else list(columns)
+        key = (
+            columns is None,
+            tuple(key_columns),
+            tuple(self.stats_cache.version(c) for c in key_columns),
+        )
+        if self._row_hashes is None or self._row_hashes[0] != key:
+            dataset = self._chunked_dataset()
+            if dataset is not None:
+                index = dataset.row_hash_index(columns)
+            else:
+                index = RowHashIndex(columns).update(self.dataframe)
+            self._row_hashes = (key, index)
+        return self._row_hashes[1]
+
+    @profiled
+    def find_near_duplicates(
+        self,
+        columns,
+        threshold=DEFAULT_THRESHOLD,
+        progress_callback=None,
+        cancel_event=None,
+    ):
+        """Groups of rows with similar text in the columns (see core.fuzzy_dedup)
+
+        Can run on a BackgroundTask. The result records the data versions it
+        was found on, so merge_near_duplicates refuses it once rows change.
+        """
+        if not self.has_data():
+            return None
+        missing = [c for c in columns if c not in self.get_columns()]
+        if missing:
+            raise ValueError(f"Unknown columns: {', '.join(map(str, missing))}")
+
+        # Versions are read before the data, as in get_profile_source
+        versions = self._data_versions()
+        data = self._chunked_dataset()
+        if data is None:
+            data = self.get_frame(columns)
+        clusters = find_near_duplicates(
+            data,
+            list(columns),
+            threshold,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+        )
+        clusters.attrs["columns"] = list(columns)
+        clusters.attrs["versions"] = versions
+        return clusters
+
+    @profiled
+    def merge_near_duplicates(self, clusters):
+        """Merge each group of near duplicates into its first row
+
+        clusters is a find_near_duplicates result, or the rows of some of
+        its groups. The first row of each group keeps its values, missing
+        ones are filled from the other rows in order, and the other rows
+        are removed, as one undoable operation. Returns the number of rows
+        removed.
+        """
+        if not self.has_data() or clusters is None or clusters.empty:
+            return 0
+        if clusters.attrs.get("versions") != self._data_versions():
+            raise ValueError(
+                "The data has changed since the near duplicates were found. "
+                "Find them again before merging."
+            )
+
+        clusters = clusters.sort_values(["cluster", "row"])
+        rows = clusters["row"].to_numpy()
+        labels = clusters["cluster"].to_numpy()
+        first = ~pd.Series(labels).duplicated().to_numpy()
+        keep = np.ones(self.get_shape()[0], dtype=bool)
+        keep[rows[~first]] = False
+
+        dataset = self._chunked_dataset()
+        if dataset is not None:
+            order = np.argsort(rows)
+            members = dataset.take(rows[order]).iloc[np.argsort(order)]
+        else:
+            members = self.dataframe.take(rows)
+        fills = _cluster_fills(members, labels, rows[first])
+
+        operation = {
+            "operation": "merge_near_duplicates",
+            "columns": clusters.attrs.get("columns"),
+            "groups": int(first.sum()),
+        }
+        if dataset is not None:
+
+            def transform(part, start):
+                replaced = {}
+                stop = start + len(part)
+                for column, fill in fills.items():
+                    local = fill[(fill.index >= start) & (fill.index < stop)]
+                    if len(local):
+                        series = part[column].copy()
+                        series.iloc[local.index - start] = local.to_numpy()
+                        replaced[column] = series
+                return replaced, keep[start:stop]
+
+            merged = dataset.rewrite(list(fills), transform, reset_index=True)
+            self._replace_dataset(operation, merged)
+            return len(dataset) - len(merged)
+
+        df = self.dataframe.copy(deep=False)
+        changes = []
+        for column, fill in fills.items():
+            series = df[column]
+            filled = series.copy()
+            filled.iloc[fill.index] = fill.to_numpy()
+            changes.append(ColumnChange.between(column, series, filled))
+            df[column] = filled
+        removal = RowRemoval.of(df, keep, reset_index=True)
+        changes.append(removal)
+        self.dataframe = removal.apply(df)
+        self._push(operation, CompositeChange(changes))
+
+        return int((~keep).sum())
+
+    def _data_versions(self):
+        """Version of every column; changes whenever any value or row does"""
+        return tuple((c, self.stats_cache.version(c)) for c in self.get_columns())
+
+    @profiled
     def handle_outliers(self, column, method):
         """Handle outliers in a numeric column"""
-        if self.dataframe is None or column not in self.dataframe.columns:
+        if not self.has_data() or column not in self.get_columns():
             return None
 
-        if not pd.api.types.is_numeric_dtype(self.dataframe[column]):
+        if not pd.api.types.is_numeric_dtype(self.get_dtype(column)):
             return None
 
-        self.history.append(
-            {
-                "operation": "handle_outliers",
-                "column": column,
-                "method": method,
-            }
+        operation = {
+            "operation": "handle_outliers",
+            "column": column,
+            "method": method,
+        }
+
+        lower_bound, upper_bound = _outlier_bounds(
+            *self.column_quantiles(column, [0.25, 0.75])
         )
 
-        q1 = self.dataframe[column].quantile(0.25)
-        q3 = self.dataframe[column].quantile(0.75)
-        iqr = q3 - q1
-        lower_bound = q1 - 1.5 * iqr
-        upper_bound = q3 + 1.5 * iqr
+        dataset = self._chunked_dataset()
+        if dataset is not None:
+            if method == "cap":
 
-        if method == "cap":
-            self.dataframe[column] = self.dataframe[column].clip(
-                lower=lower_bound, upper=upper_bound
+                def transform(part, start):
+                    clipped = part[column].clip(lower=lower_bound, upper=upper_bound)
+                    return {column: clipped}, None
+
+            elif method == "remove":
+
+                def transform(part, start):
+                    return {}, part[column].between(lower_bound, upper_bound).to_numpy()
+
+            else:
+                return dataset
+            return self._replace_dataset(
+                operation, dataset.rewrite([column], transform)
             )
+
+        df = self.dataframe
+        series = df[column]
+
+        if method == "cap":
+            clipped = series.clip(lower=lower_bound, upper=upper_bound)
+            change = ColumnChange.between(column, series, clipped)
+            df = df.copy(deep=False)
+            df[column] = clipped
+            self.dataframe = df
         elif method == "remove":
-            self.dataframe = self.dataframe[
-                (self.dataframe[column] >= lower_bound)
-                & (self.dataframe[column] <= upper_bound)
-            ]
+            change = RowRemoval.of(
+                df, (series >= lower_bound) & (series <= upper_bound)
+            )
+            self.dataframe = change.apply(df)
+        else:
+            return self.dataframe
+
+        self._push(operation, change)
+
+        return self.dataframe
+
+    @profiled
+    def apply_cleaning_plan(self, plan):
+        """Apply cleaning steps for many columns in one pass and one undo step
+
+        plan is a list of dicts with a "column" key, an optional "missing"
+        method ("drop", "mean", "median", "mode" or "value", with the fill in
+        "value") and an optional "outliers" method ("cap" or "remove").
+
+        Statistics are computed for all columns at once rather than column by
+        column: rows with missing values in "drop" columns are removed first,
+        fill statistics come from the remaining rows, and outlier bounds from
+        the filled data. Steps that do not fit a column's dtype are skipped,
+        as in the single-column methods.
+        """
+        if not self.has_data():
+            return None
+
+        dataset = self._chunked_dataset()
+        if dataset is not None:
+            return self._apply_cleaning_plan_out_of_core(dataset, plan)
+
+        df = self.dataframe
+        steps = [step for step in plan if step["column"] in df.columns]
+        changes = []
+
+        drop_columns = [s["column"] for s in steps if s.get("missing") == "drop"]
+        if drop_columns:
+            keep = df[drop_columns].notna().all(axis=1)
+            if not keep.all():
+                change = RowRemoval.of(df, keep)
+                df = change.apply(df)
+                changes.append(change)
+
+        new_columns = {
+            column: _fillna(df[column], fill_value)
+            for column, fill_value in _fill_values(df, steps).items()
+        }
+
+        outlier_methods = {
+            s["column"]: s["outliers"]
+            for s in steps
+            if s.get("outliers") in ("cap", "remove")
+            and pd.api.types.is_numeric_dtype(df[s["column"]])
+        }
+        keep = None
+        if outlier_methods:
+            # One consolidated frame lets quantile and clip run per dtype block
+            values = pd.DataFrame(
+                {c: new_columns.get(c, df[c]) for c in outlier_methods}
+            )
+            if self.use_approximate_statistics():
+                quartiles = pd.DataFrame(
+                    {
+                        c: KLLSketch.from_values(
+                            _float_values(values[c]), self.quantile_error
+                        ).quantiles([0.25, 0.75])
+                        for c in values.columns
+                    },
+                    index=[0.25, 0.75],
+                )
+            else:
+                quartiles = values.quantile([0.25, 0.75])
+            iqr = quartiles.loc[0.75] - quartiles.loc[0.25]
+            lower_bounds = quartiles.loc[0.25] - 1.5 * iqr
+            upper_bounds = quartiles.loc[0.75] + 1.5 * iqr
+
+            cap = [c for c, method in outlier_methods.items() if method == "cap"]
+            if cap:
+                clipped = values[cap].clip(
+                    lower=lower_bounds[cap], upper=upper_bounds[cap], axis=1
+                )
+                new_columns.update(clipped.items())
+
+            remove = [c for c, method in outlier_methods.items() if method == "remove"]
+            if remove:
+                within = values[remove].ge(lower_bounds[remove], axis=1) & values[
+                    remove
+                ].le(upper_bounds[remove], axis=1)
+                keep = within.all(axis=1).to_numpy()
+
+        if new_columns:
+            df = df.copy(deep=False)
+        for column, series in new_columns.items():
+            changes.append(ColumnChange.between(column, df[column], series))
+            df[column] = series
+
+        if keep is not None and not keep.all():
+            change = RowRemoval.of(df, keep)
+            df = change.apply(df)
+            changes.append(change)
+
+        self.dataframe = df
+        if changes:
+            self._push(
+                {"operation": "cleaning_plan", "plan": steps}, CompositeChange(changes)
+            )
 
         return self.dataframe
 
+    def _apply_cleaning_plan_out_of_core(self, dataset, plan):
+        """apply_cleaning_plan for a ChunkedDataset, in at most two passes
+
+        Statistics follow the same order as in memory: missing-value drops
+        first, fill values from the remaining rows, then outlier bounds from
+        the filled columns, which are loaded one at a time, or streamed into
+        quantile sketches in one pass when quantiles are approximate.
+        """
+        original = dataset
+        steps = [step for step in plan if step["column"] in dataset.columns]
+
+        drop_columns = [s["column"] for s in steps if s.get("missing") == "drop"]
+        if drop_columns:
+            dataset = dataset.rewrite(
+                drop_columns,
+                lambda part, start: ({}, part.notna().all(axis=1).to_numpy()),
+            )
+
+        fill_values = {}
+        for step in steps:
+            method = step.get("missing")
+            column = step["column"]
+            if method in (None, "drop") or not dataset.stats(column)["missing"]:
+                continue
+            fill_value = _dataset_fill_value(dataset, column, method, step.get("value"))
+            if fill_value is not None:
+                fill_values[column] = fill_value
+
+        outlier_methods = {
+            s["column"]: s["outliers"]
+            for s in steps
+            if s.get("outliers") in ("cap", "remove")
+            and pd.api.types.is_numeric_dtype(dataset.dtype(s["column"]))
+        }
+        bounds = {}
+        if outlier_methods and self.use_approximate_statistics():
+            sketches = {c: KLLSketch(self.quantile_error) for c in outlier_methods}
+            for part in dataset.iter_chunks(list(outlier_methods)):
+                for column, sketch in sketches.items():
+                    series = part[column]
+                    if column in fill_values:
+                        series = _fillna(series, fill_values[column])
+                    sketch.update(_float_values(series))
+            for column, sketch in sketches.items():
+                bounds[column] = _outlier_bounds(*sketch.quantiles([0.25, 0.75]))
+        else:
+            for column in outlier_methods:
+                series = dataset.column(column)
+                if column in fill_values:
+                    series = _fillna(series, fill_values[column])
+                bounds[column] = _outlier_bounds(
+                    series.quantile(0.25), series.quantile(0.75)
+                )
+                del series
+
+        def transform(part, start):
+            replaced = {c: _fillna(part[c], v) for c, v in fill_values.items()}
+            keep = None
+            for column, method in outlier_methods.items():
+                series = replaced.get(column, part[column])
+                lower_bound, upper_bound = bounds[column]
+                if method == "cap":
+                    replaced[column] = series.clip(lower=lower_bound, upper=upper_bound)
+                else:
+                    within = series.between(lower_bound, upper_bound).to_numpy()
+                    keep = within if keep is None else keep & within
+            return replaced, keep
+
+        columns = list(dict.fromkeys(list(fill_values) + list(outlier_methods)))
+        if columns:
+            dataset = dataset.rewrite(columns, transform)
+
+        if dataset is original:
+            return dataset
+        return self._replace_dataset(
+            {"operation": "cleaning_plan", "plan": steps}, dataset
+        )
+
+    def _push(self, operation, change):
+        """Record an applied operation for undo and expire the statistics it changed"""
+        self.undo_stack.push(operation, change)
+        self._touch(operation)
+
+    def _touch(self, operation):
+        """Bump the statistics version of the columns an operation changes"""
+        columns = _touched_columns(operation)
+        if columns is None:
+            self.stats_cache.touch_all()
+        else:
+            self.stats_cache.touch(columns)
+
+    def _replace_dataset(self, operation, dataset):
+        """Make a new ChunkedDataset current, keeping the old one as the undo step"""
+        self._push(operation, FrameSwap(self._current_frame()))
+        self._set_current(dataset)
+
+        # Steps dropped from the redo stack may have been the last users of
+        # some files; with steps on disk, their datasets are unknown
+        changes = self.undo_stack.changes()
+        if changes is not None:
+            dataset.remove_unused_files(
+                [dataset] + [c.frame for c in changes if isinstance(c, FrameSwap)]
+            )
+        return dataset
+
+    @profiled
+    def optimize_memory(self, columns=None, arrow_strings=False):
+        """Convert columns to smaller lossless dtypes as one undoable operation
+
+        Returns the per-column report from optimize_dtypes.
+        """
+        if not self.has_data():
+            return []
+        if self.is_out_of_core():
+            raise ValueError(
+                "Memory optimization is not available for datasets opened out of core"
+            )
+
+        optimized, report = optimize_dtypes(
+            self.dataframe, columns=columns, arrow_strings=arrow_strings
+        )
+        if report:
+            columns = [entry["column"] for entry in report]
+            change = CompositeChange(
+                DtypeChange(c, self.dataframe[c].dtype, optimized[c].dtype)
+                for c in columns
+            )
+            self.dataframe = optimized
+            self._push({"operation": "optimize_dtypes", "columns": columns}, change)
+
+        return report
+
+    @profiled
     def get_column_stats(self, column):
-        """Get basic statistics for a column"""
-        if self.dataframe is None or column not in self.dataframe.columns:
+        """Get basic statistics for a column
+
+        Results are cached until an operation changes the column, so the
+        returned dict must not be modified.
+        """
+        if not self.has_data() or column not in self.get_columns():
             return None
 
-        stats = {}
-        series = self.dataframe[column]
-        stats["count"] = len(series)
-        stats["missing"] = series.isna().sum()
-        stats["unique"] = series.nunique()
+        approximate = self.use_approximate_statistics()
+        return self.stats_cache.get(
+            column,
+            lambda: self._compute_column_stats(column, approximate),
+            kind=self._stats_kind(approximate),
+        )
 
-        if pd.api.types.is_numeric_dtype(series):
-            stats["mean"] = series.mean()
-            stats["median"] = series.median()
-            stats["std"] = series.std()
-            stats["min"] = series.min()
-            stats["max"] = series.max()
-            stats["skew"] = series.skew()
-            stats["kurtosis"] = series.kurtosis()
+    def _stats_kind(self, approximate):
+        """StatsCache kind of get_column_stats results"""
+        return ("stats", self.quantile_error) if approximate else "stats"
 
-            stats["25%"] = series.quantile(0.25)
-            stats["50%"] = series.quantile(0.50)
-            stats["75%"] = series.quantile(0.75)
+    def get_profile_source(self):
+        """What a profiling run needs to compute every column's statistics
 
-        stats["dtype"] = str(series.dtype)
+        Returns a dict with a snapshot of the current data, the file name,
+        row count and column versions, whether statistics are approximate,
+        the quantile error and the statistics already cached. Call it on the
+        Tk main thread. Operations replace columns rather than writing into
+        them, so a shallow copy of the frame keeps its values, and the
+        other kinds of data are never changed. Versions are read before the
+        data, so results passed back to store_column_stats are never served
+        for a newer version of a column, even if an operation runs in between.
+        """
+        approximate = self.use_approximate_statistics()
+        kind = self._stats_kind(approximate)
+        versions = {c: self.stats_cache.version(c) for c in self.get_columns()}
+        frame = self._current_frame()
+        if isinstance(frame, pd.DataFrame):
+            frame = frame.copy(deep=False)
 
-        if pd.api.types.is_object_dtype(series) or pd.api.types.is_categorical_dtype(
-            series
-        ):
-            value_counts = series.value_counts(normalize=True)
-            stats["top_values"] = value_counts.head(5).to_dict()
+        cached = {}
+        for column in versions:
+            stats = self.stats_cache.peek(column, kind)
+            if stats is None and not approximate and isinstance(frame, LazyFrame):
+                # Exact statistics stored in the project manifest
+                stats = frame.stats(column)
+            if stats is not None:
+                cached[column] = stats
+
+        return {
+            "data": frame,
+            "file": self.file_name,
+            "rows": self.get_shape()[0] if self.has_data() else 0,
+            "versions": versions,
+            "approximate": approximate,
+            "quantile_error": self.quantile_error,
+            "cached": cached,
+        }
+
+    def store_column_stats(self, column, version, stats, approximate):
+        """Cache get_column_stats results computed outside the DataManager"""
+        self.stats_cache.put(column, version, stats, kind=self._stats_kind(approximate))
+
+    def _compute_column_stats(self, column, approximate):
+        """Statistics from the project manifest or dataset if known, else computed"""
+        dataset = self._chunked_dataset()
+        if dataset is not None:
+            return dataset.stats(column, approximate, self.quantile_error)
+
+        frame = self._current_frame()
+        # The manifest only keeps exact statistics (see _stats_for_save)
+        if self.is_lazy() and not approximate and not frame.is_loaded(column):
+            stats = frame.stats(column)
+            if stats is not None:
+                return stats
+
+        series = self.get_column(column)
+        # Numeric columns are sorted anyway, which counts distinct values exactly
+        if approximate and not pd.api.types.is_numeric_dtype(series):
+            return compute_column_stats(series, self._category_sketches(column))
+        return compute_column_stats(series)
+
+    def use_approximate_statistics(self):
+        """Whether statistics come from sketches rather than the exact values"""
+        if self.approximate_statistics is not None:
+            return self.approximate_statistics
+        return self.has_data() and self.get_shape()[0] > APPROXIMATE_STATISTICS_ROWS
+
+    def column_sketch(self, column):
+        """KLLSketch of a numeric column's non-missing values (cached)"""
+        error = self.quantile_error
+
+        def compute():
+            dataset = self._chunked_dataset()
+            if dataset is not None:
+                return dataset.sketch(column, error)
+            return KLLSketch.from_values(_float_values(self.get_column(column)), error)
+
+        return self.stats_cache.get(column, compute, kind=("sketch", error))
+
+    def column_quantiles(self, column, q):
+        """Quantiles of a numeric column, approximate for large datasets (cached)
+
+        Exact quantiles match Series.quantile; approximate ones come from
+        column_sketch and are within quantile_error in rank.
+        """
+        if self.use_approximate_statistics():
+            return self.column_sketch(column).quantiles(q)
+
+        def compute():
+            dataset = self._chunked_dataset()
+            if dataset is not None:
+                return dataset.quantiles(column, q)
+            values = _float_values(self.get_column(column))
+            return quantiles(values[~np.isnan(values)], q)
+
+        return self.stats_cache.get(column, compute, kind=("quantiles", tuple(q)))
+
+    def get_value_counts(self, column):
+        """Counts of each non-missing value of a column, largest first (cached)"""
+        if not self.has_data() or column not in self.get_columns():
+            return None
+
+        def compute():
+            dataset = self._chunked_dataset()
+            if dataset is not None:
+                return dataset.value_counts(column)
+            return self.get_column(column).value_counts()
+
+        return self.stats_cache.get(column, compute, kind="value_counts")
+
+    def get_top_values(self, column, n):
+        """Counts of the n most frequent values of a column, largest first
+
+        Exact unless statistics are approximate: counts then come from a
+        HeavyHitters sketch and may be low by up to its error.
+        """
+        if not self.has_data() or column not in self.get_columns():
+            return None
+
+        if self.use_approximate_statistics():
+            return self._category_sketches(column)[1].top(n)
+        return self.get_value_counts(column).head(n)
 
-        return stats
+    def _category_sketches(self, column):
+        """(HyperLogLog, HeavyHitters) of a column, built block by block (cached)"""
 
+        def compute():
+            dataset = self._chunked_dataset()
+            if dataset is not None:
+                return dataset.category_sketches(column)
+            return block_sketches(self.get_column(column))
+
+        return self.stats_cache.get(column, compute, kind="category_sketches")
+
+    def _stats_for_save(self, series):
+        """Exact statistics already cached for a column, or None
+
+        Saving stores them in the project manifest but never computes them,
+        so a save costs no more than writing the changed columns.
+        """
+        return self.stats_cache.peek(series.name)
+
+    def can_undo(self):
+        """Whether there is an operation to undo"""
+        return self.undo_stack.can_undo()
+
+    def can_redo(self):
+        """Whether there is an undone operation to redo"""
+        return self.undo_stack.can_redo()
+
+    @profiled
+    def undo(self):
+        """Undo the latest operation; returns it, or None if there was nothing to undo"""
+        if not self.undo_stack.can_undo():
+            return None
+
+        frame, operation = self.undo_stack.undo(self._undo_target())
+        if isinstance(frame, ChunkedDataset) and not frame.files_exist():
+            self.undo_stack.redo(frame)
+            raise ValueError(MISSING_CACHE_MESSAGE)
+        self._set_current(frame)
+        self._touch(operation)
+        return operation
+
+    @profiled
+    def redo(self):
+        """Redo the latest undone operation; returns it, or None if there was none"""
+        if not self.undo_stack.can_redo():
+            return None
+
+        frame, operation = self.undo_stack.redo(self._undo_target())
+        if isinstance(frame, ChunkedDataset) and not frame.files_exist():
+            self.undo_stack.undo(frame)
+            raise ValueError(MISSING_CACHE_MESSAGE)
+        self._set_current(frame)
+        self._touch(operation)
+        return operation
+
+    def _undo_target(self):
+        """Data that undo steps apply to; out-of-core datasets stay on disk"""
+        dataset = self._chunked_dataset()
+        return dataset if dataset is not None else self.dataframe
+
+    @profiled
     def reset_to_original(self):
-        """Reset the dataframe to the original state"""
-        if self.original_dataframe is not None:
-            self.dataframe = self.original_dataframe.copy()
-            self.history = []
+        """Reset the dataframe to the original state by undoing every operation
 
-        return self.dataframe
+        The undone operations stay on the redo stack.
+        """
+        while self.undo_stack.can_undo():
+            self.undo()
+
+        return self._current_frame()
+
+    def has_data(self):
+        """Whether a dataset is loaded"""
+        return self._current_frame() is not None
+
+    def get_columns(self):
+        """Get the list of column names without loading column data"""
+        if not self.has_data():
+            return []
+
+        return list(self._current_frame().columns)
+
+    def _row_count(self):
+        """Rows of the current data, or None without data, for the profiler"""
+        return self.get_shape()[0] if self.has_data() else None
+
+    def get_shape(self):
+        """Get (rows, columns) of the current data without loading it"""
+        if not self.has_data():
+            return (0, 0)
+
+        return self._current_frame().shape
+
+    def get_dtype(self, column):
+        """Get the dtype of a column without loading it"""
+        return self._current_frame().dtypes[column]
+
+    def get_column(self, column):
+        """Get a single column, loading only that column of a lazy project"""
+        frame = self._current_frame()
+        if isinstance(frame, (LazyFrame, ChunkedDataset)):
+            return frame.column(column)
+
+        return frame[column]
+
+    def get_frame(self, columns=None):
+        """Get a DataFrame with only the requested columns"""
+        frame = self._current_frame()
+        if columns is None:
+            return self.dataframe
+        if isinstance(frame, (LazyFrame, ChunkedDataset)):
+            return frame.frame(list(columns))
+
+        return frame[list(columns)]
+
+    def get_rows(self, start, stop):
+        """Get rows start:stop, decoding only that range of a lazy project"""
+        frame = self._current_frame()
+        if isinstance(frame, (LazyFrame, ChunkedDataset)):
+            return frame.rows(start, stop)
+
+        return frame.iloc[start:stop]
+
+    def take_rows(self, positions):
+        """Get the rows at positions, in that order, reading only their chunks"""
+        positions = np.asarray(positions, dtype=np.intp)
+        dataset = self._chunked_dataset()
+        if dataset is not None:
+            order = np.argsort(positions)
+            return dataset.take(positions[order]).iloc[np.argsort(order)]
+
+        return self.dataframe.take(positions)
+
+    def cached_point_index(self, x_column, y_column):
+        """PointIndex of the two columns kept from an earlier plot, or None"""
+        key = self._point_index_key(x_column, y_column)
+        if self._point_index is None or self._point_index[0] != key:
+            return None
+        return self._point_index[1]
+
+    def get_point_source(self, x_column, y_column):
+        """What build_point_index needs for a scatter plot of two columns
+
+        Call on the Tk main thread. The columns are read here, so the worker
+        never uses the DataManager; operations replace columns rather than
+        writing into them, so the frame keeps its values. An out-of-core
+        dataset never changes and is passed as is, to be read by the worker.
+        """
+        columns = list(dict.fromkeys([x_column, y_column]))
+        data = self._chunked_dataset()
+        if data is None:
+            data = self.get_frame(columns)
+        return {
+            "data": data,
+            "x_column": x_column,
+            "y_column": y_column,
+            "key": self._point_index_key(x_column, y_column),
+        }
+
+    def store_point_index(self, index):
+        """Keep a built PointIndex for later plots of the same columns
+
+        Call on the Tk main thread. An index of columns that changed since
+        get_point_source is not kept.
+        """
+        if index.key == self._point_index_key(*index.key[:2]):
+            self._point_index = (index.key, index)
+
+    def point_rows(self, index, points):
+        """Row positions, as in get_rows, of points of a point_index result
+
+        Raises ValueError once either column has changed, since the
+        positions may then refer to other rows.
+        """
+        if index.key != self._point_index_key(*index.key[:2]):
+            raise ValueError(
+                "The data has changed since the plot was drawn. "
+                "Generate the plot again."
+            )
+        return index.rows[np.asarray(points, dtype=np.intp)]
+
+    def _point_index_key(self, x_column, y_column):
+        """The columns and their versions; any row change gives new versions"""
+        return (
+            x_column,
+            y_column,
+            self.stats_cache.version(x_column),
+            self.stats_cache.version(y_column),
+        )
+
+    def group_mean(self, x_column, y_column):
+        """Mean of y_column for each value of x_column, as a two-column DataFrame"""
+        dataset = self._chunked_dataset()
+        if dataset is not None:
+            return dataset.group_mean(x_column, y_column)
+
+        df = self.get_frame(list(dict.fromkeys([x_column, y_column])))
+        return df.groupby(x_column, observed=True)[y_column].mean().reset_index()
+
+    def group_sketches(self, x_column, y_column):
+        """KLLSketch of y_column for each value of x_column, built chunk by chunk"""
+        dataset = self._chunked_dataset()
+        columns = list(dict.fromkeys([x_column, y_column]))
+        if dataset is not None:
+            parts = dataset.iter_chunks(columns)
+        else:
+            parts = [self.get_frame(columns)]
+
+        sketches = {}
+        for part in parts:
+            for key, values in part.groupby(x_column, observed=True)[y_column]:
+                if key not in sketches:
+                    sketches[key] = KLLSketch(self.quantile_error)
+                sketches[key].update(_float_values(values))
+        return {key: sketch for key, sketch in sketches.items() if sketch.count}
+
+    def histogram(self, column, bins):
+        """(counts, bin edges) of the non-missing values of a numeric column"""
+        dataset = self._chunked_dataset()
+        if dataset is not None:
+            return dataset.histogram(column, bins)
+
+        return np.histogram(self.get_column(column).dropna(), bins=bins)
+
+    def correlation(self, columns=None):
+        """Pairwise correlation of numeric columns (default all of them)"""
+        if columns is None:
+            columns = self.get_numeric_columns()
+
+        dataset = self._chunked_dataset()
+        if dataset is not None:
+            return dataset.correlation(columns)
+
+        return self.get_frame(columns).corr()
 
     def get_numeric_columns(self):
         """Get list of numeric columns"""
-        if self.dataframe is None:
+        if not self.has_data():
             return []
 
-        return list(self.dataframe.select_dtypes(include=["number"]).columns)
+        dtypes = self._current_frame().dtypes
+        return [c for c, dtype in dtypes.items() if _is_numeric_dtype(dtype)]
 
     def get_categorical_columns(self):
         """Get list of categorical columns"""
-        if self.dataframe is None:
+        if not self.has_data():
             return []
 
-        return list(
-            self.dataframe.select_dtypes(include=["object", "category"]).columns
-        )
+        dtypes = self._current_frame().dtypes
+        return [
+            c
+            for c, dtype in dtypes.items()
+            if pd.api.types.is_object_dtype(dtype)
+            or isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype))
+        ]
+
+
+def _with_original_loaded(project_data):
+    """Load the original data kept by older projects, which have no undo steps"""
+    original = project_data.get("original_dataframe")
+    if isinstance(original, LazyFrame):
+        project_data["original_dataframe"] = original.to_pandas()
+    return project_data
+
+
+def _fillna(series, value):
+    """fillna that also accepts values missing from a categorical's categories"""
+    if (
+        isinstance(series.dtype, pd.CategoricalDtype)
+        and not pd.isna(value)
+        and value not in series.cat.categories
+    ):
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
+
+
+def _use_out_of_core(file_path, out_of_core):
+    """Whether a CSV file should be opened as a ChunkedDataset"""
+    if out_of_core is not None:
+        return out_of_core
+    return os.path.getsize(file_path) > OUT_OF_CORE_THRESHOLD
+
+
+def _outlier_bounds(q1, q3):
+    """(lower, upper) bounds of the 1.5 * IQR outlier rule"""
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def build_point_index(source, progress_callback=None, cancel_event=None):
+    """PointIndex of the rows where both columns of a get_point_source have a value
+
+    These are the points of a scatter plot of the two columns. Only source
+    is read, so this can run on a BackgroundTask; the caller then keeps the
+    index with DataManager.store_point_index.
+    """
+    x_column, y_column = source["x_column"], source["y_column"]
+    data = source["data"]
+    if isinstance(data, ChunkedDataset):
+        data = data.frame(list(dict.fromkeys([x_column, y_column])))
+    x = _float_values(data[x_column])
+    y = _float_values(data[y_column])
+    rows = np.flatnonzero(~np.isnan(x) & ~np.isnan(y))
+    return PointIndex(x[rows], y[rows], rows, source["key"])
+
+
+def _numpy_dtype(dtype):
+    """The numpy dtype of a dtype, or of the values of a nullable one"""
+    return getattr(dtype, "numpy_dtype", dtype)
+
+
+def _float_values(series):
+    """Values of a numeric Series as a float array, with NaN for missing values"""
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _dataset_fill_value(dataset, column, method, value):
+    """Fill value for a ChunkedDataset column, or None if the fill does not apply"""
+    if method in ("mean", "median"):
+        if not pd.api.types.is_numeric_dtype(dataset.dtype(column)):
+            return None
+        return dataset.stats(column)[method]
+    if method == "mode":
+        counts = dataset.value_counts(column)
+        if counts.empty:
+            return None
+        modes = counts.index[counts == counts.iloc[0]]
+        try:
+            # Series.mode returns the tied values sorted
+            return sorted(modes)[0]
+        except TypeError:
+            return modes[0]
+    if method == "value":
+        return value
+    return None
+
+
+def _fill_values(df, steps):
+    """Fill value per column for the fill steps of a cleaning plan
+
+    Means and medians of all numeric columns are computed in one call each,
+    and only for columns that actually have missing values.
+    """
+    fill_steps = [
+        s for s in steps if s.get("missing") in ("mean", "median", "mode", "value")
+    ]
+    if not fill_steps:
+        return {}
+
+    fill_columns = list(dict.fromkeys(s["column"] for s in fill_steps))
+    has_missing = df[fill_columns].isna().any()
+
+    values = {}
+    grouped = {"mean": [], "median": []}
+    for step in fill_steps:
+        column = step["column"]
+        method = step["missing"]
+        if not has_missing[column]:
+            continue
+        if method in grouped:
+            if pd.api.types.is_numeric_dtype(df[column]):
+                grouped[method].append(column)
+        elif method == "mode":
+            mode = df[column].mode()
+            if not mode.empty:
+                values[column] = mode[0]
+        elif step.get("value") is not None:
+            values[column] = step["value"]
+
+    for method, columns in grouped.items():
+        if columns:
+            values.update(getattr(df[columns], method)().items())
+
+    return values
+
+
+def _cluster_fills(members, labels, first_rows):
+    """Values filling the missing cells of the first row of each cluster
+
+    members are the clustered rows in cluster order and first_rows the
+    position of each cluster's first row. Returns {column: Series of fill
+    values indexed by row position} for the columns that get any.
+    """
+    members = members.reset_index(drop=True)
+    merged = members.groupby(labels, sort=True).first()
+    firsts = members.loc[~pd.Series(labels).duplicated().to_numpy()]
+
+    fills = {}
+    for column in members.columns:
+        fill = firsts[column].isna().to_numpy() & merged[column].notna().to_numpy()
+        if fill.any():
+            fills[column] = pd.Series(
+                merged[column].to_numpy()[fill], index=first_rows[fill]
+            )
+    return fills
+
+
+def describe_operation(operation):
+    """Short human readable description of a history operation"""
+    name = operation["operation"]
+    if name == "clean_missing" and operation["method"] == "drop":
+        return f"drop rows with missing {operation['column']}"
+    if name == "clean_missing":
+        return f"fill missing values in {operation['column']} ({operation['method']})"
+    if name == "handle_outliers":
+        return f"{operation['method']} outliers in {operation['column']}"
+    if name == "remove_duplicates" and operation.get("columns"):
+        return f"remove duplicates by {', '.join(map(str, operation['columns']))}"
+    if name == "remove_duplicates":
+        return "remove duplicates"
+    if name == "merge_near_duplicates":
+        return f"merge {operation['groups']} group(s) of near duplicates"
+    if name == "cleaning_plan":
+        columns = {step["column"] for step in operation["plan"]}
+        return f"clean {len(columns)} column(s)"
+    if name == "optimize_dtypes":
+        return f"optimize memory of {len(operation['columns'])} column(s)"
+    if name == "saved_changes":
+        return "changes saved in the project"
+    return name.replace("_", " ")
+
+
+def _touched_columns(operation):
+    """Columns whose values an operation changes, or None if it changes rows"""
+    name = operation["operation"]
+    if name == "clean_missing":
+        return None if operation["method"] == "drop" else [operation["column"]]
+    if name == "handle_outliers":
+        return None if operation["method"] == "remove" else [operation["column"]]
+    if name == "cleaning_plan":
+        steps = operation["plan"]
+        if any(
+            s.get("missing") == "drop" or s.get("outliers") == "remove" for s in steps
+        ):
+            return None
+        return [s["column"] for s in steps]
+    if name == "optimize_dtypes":
+        return operation["columns"]
+    return None
+
+
+def _is_numeric_dtype(dtype):
+    """Numeric check matching DataFrame.select_dtypes(include=["number"])"""
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(
+        dtype
+    )
+
+
+def block_sketches(series):
+    """(HyperLogLog, HeavyHitters) of a Series, counted SKETCH_BLOCK_ROWS at a time"""
+    return category_sketches(
+        series.iloc[start : start + SKETCH_BLOCK_ROWS]
+        for start in range(0, len(series), SKETCH_BLOCK_ROWS)
+    )
+
+
+def compute_column_stats(series, sketches=None):
+    """Compute the statistics reported by DataManager.get_column_stats
+
+    Numeric columns are summarized in one sweep plus one sort, which gives
+    the quartiles and the distinct count (see core.summary), instead of a
+    pandas call per statistic. For other columns, sketches can be a
+    (HyperLogLog, HeavyHitters) pair of the column; the distinct count and
+    top values are then estimated from it rather than counted exactly.
+    """
+    stats = {}
+    stats["count"] = len(series)
+    stats["missing"] = int(series.isna().sum())
+
+    if pd.api.types.is_integer_dtype(series):
+        present = series.dropna().to_numpy(dtype=_numpy_dtype(series.dtype))
+        stats.update(summarize_integers(present, stats["missing"]))
+    elif pd.api.types.is_numeric_dtype(series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        stats.update(summarize(values, count_unique=True))
+    elif sketches is not None:
+        stats["unique"] = min(sketches[0].estimate(), stats["count"] - stats["missing"])
+    else:
+        stats["unique"] = series.nunique()
+
+    stats["dtype"] = str(series.dtype)
+
+    if pd.api.types.is_object_dtype(series) or isinstance(
+        series.dtype, (pd.CategoricalDtype, pd.StringDtype)
+    ):
+        if sketches is not None:
+            frequent = sketches[1]
+            stats["top_values"] = (frequent.top(5) / frequent.total).to_dict()
+        else:
+            value_counts = series.value_counts(normalize=True)
+            stats["top_values"] = value_counts.head(5).to_dict()
+
+    return stats
@@ -0,0 +1,123 @@
+"""
+Dedup - Duplicate rows found by 64-bit row hashes
+"""
+
+import numpy as np
+import pandas as pd
+
+
+HASH_CHUNK_ROWS = 1_000_000
+KEEP_OPTIONS = ("first", "last", False)
+
+
+def row_hashes(frame, columns=None):
+    """64-bit hash of each row of a DataFrame, over all or some columns
+
+    Rows are hashed HASH_CHUNK_ROWS at a time, which bounds the temporary
+    per-column hash arrays. Equal rows, including rows with missing values
+    in the same places, get equal hashes. pandas hashes the values of
+    object columns by their text, which 1 and "1" share, so the type of
+    each value is hashed with it. Two rows whose values differ in type or
+    text then share a hash with a probability of about 2**-64. Unlike
+    DataFrame.duplicated, 1, 1.0 and True in an object column, or None and
+    NaN, never match.
+    """
+    if columns is not None:
+        frame = frame[list(columns)]
+    parts = [
+        _hash_rows(frame.iloc[start : start + HASH_CHUNK_ROWS])
+        for start in range(0, len(frame), HASH_CHUNK_ROWS)
+    ]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint64)
+
+
+def _hash_rows(frame):
+    """Row hashes of a frame, including the type of each value of object columns"""
+    types = {
+        position: frame.iloc[:, position].map(type)
+        for position, dtype in enumerate(frame.dtypes)
+        if _holds_objects(dtype)
+    }
+    if types:
+        frame = pd.concat([frame, pd.DataFrame(types, index=frame.index)], axis=1)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _holds_objects(dtype):
+    """Whether values of a column can be Python objects of different types"""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _holds_objects(dtype.categories.dtype)
+    return dtype == object
+
+
+class RowHashIndex:
+    """Row hashes of a dataset over some key columns, built incrementally
+
+    Rows are added with update(), a frame or chunk at a time, and only the
+    new rows are hashed; duplicate masks and clusters are then derived from
+    the stored hashes, 8 bytes per row, without comparing row values.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = None if columns is None else list(columns)
+        self._parts = []
+        self._hashes = None
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @property
+    def hashes(self):
+        """Hash of every row added so far"""
+        if self._hashes is None:
+            self._hashes = (
+                np.concatenate(self._parts)
+                if self._parts
+                else np.empty(0, dtype=np.uint64)
+            )
+            self._parts = [self._hashes]
+        return self._hashes
+
+    def update(self, frame):
+        """Hash the rows of a frame and add them after the rows already indexed"""
+        self._parts.append(row_hashes(frame, self.columns))
+        self._hashes = None
+        return self
+
+    def duplicated(self, keep="first"):
+        """Boolean mask of the rows to drop, as DataFrame.duplicated computes it
+
+        Rows match when their hashes do (see row_hashes). keep is "first" or "last" to keep one row of each group of equal
+        rows, or False to mark every row that has a duplicate.
+        """
+        if keep not in KEEP_OPTIONS:
+            raise ValueError(f"keep must be 'first', 'last' or False, not {keep!r}")
+        return pd.Series(self.hashes).duplicated(keep=keep).to_numpy()
+
+    def clusters(self):
+        """Groups of equal rows, largest first
+
+        A DataFrame with the position of the first and last row of each
+        group and its number of rows; rows without duplicates are left out.
+        """
+        hashes = pd.Series(self.hashes)
+        codes, uniques = pd.factorize(hashes)
+        counts = np.bincount(codes, minlength=len(uniques))
+
+        # factorize numbers the groups in order of their first row
+        first = np.flatnonzero(~hashes.duplicated(keep="first").to_numpy())
+        last_rows = np.flatnonzero(~hashes.duplicated(keep="last").to_numpy())
+        last = np.empty(len(uniques), dtype=np.intp)
+        last[codes[last_rows]] = last_rows
+
+        repeated = np.flatnonzero(counts > 1)
+        clusters = pd.DataFrame(
+            {
+                "first_row": first[repeated],
+                "last_row": last[repeated],
+                "count": counts[repeated],
+            }
+        )
+        return clusters.sort_values(
+            "count", ascending=False, kind="stable", ignore_index=True
+        )
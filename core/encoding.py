@@ -0,0 +1,213 @@
+"""
+Encoding - Text encoding detection and fault-tolerant decoding for CSV files
+"""
+
+import codecs
+import io
+import os
+
+
+CANDIDATE_ENCODINGS = ["utf-8", "cp1252", "latin1"]
+
+PREFIX_BYTES = 1024 * 1024
+SAMPLE_COUNT = 16
+SAMPLE_BYTES = 64 * 1024
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+_encoding_cache = {}
+
+
+def file_fingerprint(file_path):
+    """Identify a file by path, size and modification time"""
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+def cached_encoding(file_path):
+    """Return the cached encoding for a file, or None if it is unknown"""
+    return _encoding_cache.get(file_fingerprint(file_path))
+
+
+def remember_encoding(file_path, encoding):
+    """Cache the encoding for the current version of a file"""
+    _encoding_cache[file_fingerprint(file_path)] = encoding
+
+
+def detect_encoding(file_path):
+    """Pick an encoding from a bounded prefix plus blocks sampled across the file
+
+    At most PREFIX_BYTES + SAMPLE_COUNT * SAMPLE_BYTES bytes are read, so
+    detection cost does not grow with the file. Bytes that were not sampled
+    may still fail to decode; IncrementalDecodingReader handles that case
+    without re-reading the file. Results are cached per file fingerprint.
+    """
+    encoding = cached_encoding(file_path)
+    if encoding is not None:
+        return encoding
+
+    samples = _read_samples(file_path)
+
+    encoding = _encoding_from_bom(samples[0] if samples else b"")
+    if encoding is None:
+        for candidate in CANDIDATE_ENCODINGS:
+            if all(_decodes(sample, candidate) for sample in samples):
+                encoding = candidate
+                break
+        else:
+            encoding = CANDIDATE_ENCODINGS[-1]
+
+    remember_encoding(file_path, encoding)
+    return encoding
+
+
+def _read_samples(file_path):
+    """Read the file prefix and evenly spaced blocks after it"""
+    size = os.path.getsize(file_path)
+    samples = []
+
+    with open(file_path, "rb") as f:
+        samples.append(f.read(PREFIX_BYTES))
+
+        remaining = size - PREFIX_BYTES
+        if remaining > SAMPLE_BYTES:
+            stride = remaining // SAMPLE_COUNT
+            for i in range(SAMPLE_COUNT):
+                f.seek(PREFIX_BYTES + i * stride)
+                samples.append(f.read(SAMPLE_BYTES))
+        elif remaining > 0:
+            samples.append(f.read())
+
+    return samples
+
+
+def _encoding_from_bom(prefix):
+    """Return the encoding implied by a byte order mark, if any"""
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    return None
+
+
+def _decodes(sample, encoding):
+    """Check whether a sample decodes, tolerating characters cut at its edges"""
+    if encoding.replace("_", "-").lower() in ("utf-8", "utf8"):
+        # Skip continuation bytes left over from a character split at the start
+        start = 0
+        while start < min(3, len(sample)) and 0x80 <= sample[start] <= 0xBF:
+            start += 1
+        sample = sample[start:]
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        decoder.decode(sample, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+class IncrementalDecodingReader(io.TextIOBase):
+    """Text stream that decodes a binary file block by block
+
+    Decoding starts with the detected encoding. If a later block turns out
+    not to decode, the reader switches to the next fallback encoding from
+    the failing byte onwards instead of restarting the parse, so a bad byte
+    near the end of a large file costs nothing extra. latin1 is always the
+    last fallback because it decodes every byte.
+    """
+
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, raw, encoding, fallback_encodings=("cp1252", "latin1")):
+        super().__init__()
+        self.raw = raw
+        self.encodings = [encoding] + [
+            e for e in fallback_encodings if e != encoding
+        ]
+        if "latin1" not in self.encodings:
+            self.encodings.append("latin1")
+
+        self._index = 0
+        self._decoder = codecs.getincrementaldecoder(self.encodings[0])()
+        self._buffer = ""
+        self._eof = False
+        self._position = 0
+
+        self.switched_at = None
+        self.ascii_before_switch = True
+
+    @property
+    def encoding(self):
+        """Encoding currently used to decode the stream"""
+        return self.encodings[self._index]
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        """Read up to size characters, or everything if size is negative"""
+        if size is None or size < 0:
+            while not self._eof:
+                self._fill()
+            text, self._buffer = self._buffer, ""
+            return text
+
+        while len(self._buffer) < size and not self._eof:
+            self._fill()
+        text, self._buffer = self._buffer[:size], self._buffer[size:]
+        return text
+
+    def readline(self, size=-1):
+        """Read a single line"""
+        while "\n" not in self._buffer and not self._eof:
+            self._fill()
+        end = self._buffer.find("\n") + 1 or len(self._buffer)
+        if size is not None and 0 <= size < end:
+            end = size
+        line, self._buffer = self._buffer[:end], self._buffer[end:]
+        return line
+
+    def _fill(self):
+        """Decode the next block of the raw stream into the buffer"""
+        data = self.raw.read(self.BLOCK_SIZE)
+        final = not data
+        self._buffer += self._decode(data, final, self._position)
+        self._position += len(data)
+        if final:
+            self._eof = True
+
+    def _decode(self, data, final, position):
+        """Decode bytes starting at a raw offset, falling back on failure"""
+        try:
+            text = self._decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            # e.object holds any bytes the decoder had buffered plus data
+            start = position - (len(e.object) - len(data))
+            consumed = e.object[: e.start]
+            rest = e.object[e.start :]
+            head = codecs.decode(consumed, self.encoding) if consumed else ""
+            # The text before the failing byte counts before the switch too
+            self._check_ascii(head)
+            self._switch(start + e.start)
+            return head + self._decode(rest, final, start + e.start)
+
+        self._check_ascii(text)
+        return text
+
+    def _check_ascii(self, text):
+        """Track whether all text decoded before the first switch was ASCII"""
+        if self.switched_at is None and self.ascii_before_switch:
+            self.ascii_before_switch = text.isascii()
+
+    def _switch(self, offset):
+        """Continue decoding with the next fallback encoding"""
+        if self.switched_at is None:
+            self.switched_at = offset
+        self._index += 1
+        self._decoder = codecs.getincrementaldecoder(self.encodings[self._index])()
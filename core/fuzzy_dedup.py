@@ -0,0 +1,296 @@
+"""
+FuzzyDedup - Near-duplicate records found with MinHash signatures and LSH
+"""
+
+import numpy as np
+import pandas as pd
+from core.chunked_dataset import ChunkedDataset
+from core.loader import LoadCancelled
+
+
+DEFAULT_THRESHOLD = 0.8
+NUM_PERM = 64
+SHINGLE_SIZE = 3
+BLOCK_ROWS = 100_000
+# Rows of a bucket that each row is compared with; all of them in smaller buckets
+BUCKET_PAIRS = 50
+# Bits of one code point in a shingle code; SHINGLE_SIZE of them fit in 64
+CODE_POINT_BITS = 21
+
+
+def normalize(texts):
+    """Normalized text of a Series of strings
+
+    Accents, case and punctuation are dropped and the words are sorted, so
+    "Smith, John" and "john SMITH" normalize to the same text. Letters of
+    every script are kept, so "Иван Петров" and "иван петров" match too.
+    """
+    cleaned = (
+        texts.str.normalize("NFKD")
+        # Combining diacritical marks left by the decomposition
+        .str.replace("[\u0300-\u036f]+", "", regex=True)
+        .str.casefold()
+        .str.replace(r"[\W_]+", " ", regex=True)
+    )
+    return [" ".join(sorted(text.split())) for text in cleaned]
+
+
+def record_texts(frame, columns):
+    """Text of each row: the values of the columns joined with spaces"""
+    texts = None
+    for column in columns:
+        series = frame[column].astype(object)
+        values = series.where(series.notna(), "").astype(str)
+        texts = values if texts is None else texts + " " + values
+    return texts
+
+
+class MinHasher:
+    """MinHash signatures of character shingles, one row per text
+
+    Each of num_perm hash functions maps a shingle to 32 bits with a
+    multiply-shift hash; a text's signature holds the smallest value of
+    each function over its shingles. The share of equal signature values
+    of two texts estimates the Jaccard similarity of their shingle sets.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, seed=0):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.multipliers = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | 1
+        self.offsets = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+
+    def signatures(self, texts):
+        """(signatures, has_text) for a list of normalized texts
+
+        signatures has one row per text; rows of empty texts are left as
+        zeros and flagged False in has_text.
+        """
+        signatures = np.zeros((len(texts), self.num_perm), dtype=np.uint32)
+        has_text = np.fromiter((bool(text) for text in texts), bool, len(texts))
+        if not has_text.any():
+            return signatures, has_text
+
+        # Pad so every non-empty text has at least one whole shingle
+        padded = [f" {text} " for text, keep in zip(texts, has_text) if keep]
+        shingles, starts = _shingle_codes(padded)
+        present = np.empty((len(padded), self.num_perm), dtype=np.uint32)
+        values = np.empty_like(shingles)
+        with np.errstate(over="ignore"):
+            for i in range(self.num_perm):
+                np.multiply(shingles, self.multipliers[i], out=values)
+                np.add(values, self.offsets[i], out=values)
+                np.right_shift(values, np.uint64(32), out=values)
+                present[:, i] = np.minimum.reduceat(values, starts)
+        signatures[has_text] = present
+        return signatures, has_text
+
+
+def _shingle_codes(texts):
+    """Codes of the SHINGLE_SIZE-character shingles of texts
+
+    All texts are joined into one array of code points, so the shingles of
+    every text come from a few array operations. Returns the codes, grouped
+    by text, and the position of each text's first code.
+    """
+    lengths = np.fromiter(map(len, texts), np.intp, len(texts))
+    buffer = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32)
+    codes = np.zeros(len(buffer) - SHINGLE_SIZE + 1, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        window = buffer[offset : len(buffer) - SHINGLE_SIZE + 1 + offset]
+        codes = (codes << np.uint64(CODE_POINT_BITS)) | window.astype(np.uint64)
+
+    # Keep shingles that start and end inside the same text
+    text_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    counts = lengths - SHINGLE_SIZE + 1
+    positions = np.repeat(text_starts, counts) + (
+        np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    )
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    return codes[positions], starts
+
+
+def lsh_bands(num_perm, threshold):
+    """(bands, rows per band) whose LSH similarity threshold is nearest threshold
+
+    Two texts with similarity s share a bucket in at least one band with
+    probability 1 - (1 - s**rows)**bands, which rises steeply around
+    (1 / bands) ** (1 / rows).
+    """
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda o: abs((1 / o[0]) ** (1 / o[1]) - threshold))
+
+
+def find_near_duplicates(
+    data,
+    columns,
+    threshold=DEFAULT_THRESHOLD,
+    num_perm=NUM_PERM,
+    seed=0,
+    progress_callback=None,
+    cancel_event=None,
+):
+    """Clusters of rows whose text in the columns is similar
+
+    data is a DataFrame or a ChunkedDataset. Rows are read in blocks and
+    only their LSH band keys are kept, so memory grows by a few bytes per
+    band and row. Rows that share a bucket in any band are candidate pairs;
+    in buckets of more than BUCKET_PAIRS + 1 rows, each row is paired with
+    the next BUCKET_PAIRS rows only, which still links large groups of
+    duplicates through their neighbours. The candidates' signatures are
+    computed again in a second pass and pairs with an estimated similarity
+    of at least threshold are joined into clusters.
+
+    Returns a DataFrame with the cluster number, row position and the
+    estimated similarity of each clustered row to the first row of its
+    cluster, largest clusters first.
+    """
+    hasher = MinHasher(num_perm, seed)
+    bands, rows_per_band = lsh_bands(num_perm, threshold)
+    total = len(data)
+
+    keys = np.zeros((total, bands), dtype=np.uint64)
+    has_text = np.zeros(total, dtype=bool)
+    for start, block in _blocks(data, columns, cancel_event):
+        signatures, present = hasher.signatures(normalize(record_texts(block, columns)))
+        stop = start + len(block)
+        has_text[start:stop] = present
+        for band in range(bands):
+            band_columns = slice(band * rows_per_band, (band + 1) * rows_per_band)
+            keys[start:stop, band] = pd.util.hash_pandas_object(
+                pd.DataFrame(signatures[:, band_columns]), index=False
+            ).to_numpy()
+        if progress_callback is not None:
+            progress_callback(stop, 2 * total)
+
+    with_text = np.flatnonzero(has_text)
+    pairs = [_bucket_pairs(keys[with_text, band], with_text) for band in range(bands)]
+    del keys
+    sources, targets = _unique_pairs(pairs, total)
+
+    candidates = np.unique(np.concatenate([sources, targets]))
+    signatures = _candidate_signatures(
+        data, columns, hasher, candidates, cancel_event, progress_callback, total
+    )
+    row_of = pd.Series(np.arange(len(candidates)), index=candidates)
+    similar = np.zeros(len(sources), dtype=bool)
+    for start in range(0, len(sources), BLOCK_ROWS):
+        pairs = slice(start, start + BLOCK_ROWS)
+        similar[pairs] = (
+            _similarity(signatures, row_of, sources[pairs], targets[pairs]) >= threshold
+        )
+    return _clusters(
+        sources[similar], targets[similar], signatures, row_of, total
+    )
+
+
+def _bucket_pairs(band_keys, rows):
+    """Pairs of rows sharing a band key, each row with up to BUCKET_PAIRS next ones"""
+    order = np.argsort(band_keys, kind="stable")
+    ordered = band_keys[order]
+    rows = rows[order]
+    # Rows left in the bucket after each position
+    bucket_end = np.searchsorted(ordered, ordered, side="right")
+    remaining = bucket_end - np.arange(len(ordered)) - 1
+
+    sources, targets = [], []
+    positions = np.flatnonzero(remaining > 0)
+    for step in range(1, BUCKET_PAIRS + 1):
+        positions = positions[remaining[positions] >= step]
+        if not len(positions):
+            break
+        sources.append(rows[positions])
+        targets.append(rows[positions + step])
+    if not sources:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(sources), np.concatenate(targets)
+
+
+def _unique_pairs(pairs, total):
+    """(sources, targets) of the distinct pairs found in any band"""
+    codes = [
+        np.minimum(sources, targets).astype(np.int64) * total
+        + np.maximum(sources, targets)
+        for sources, targets in pairs
+    ]
+    codes = np.unique(np.concatenate(codes)) if codes else np.empty(0, np.int64)
+    return (codes // total).astype(np.intp), (codes % total).astype(np.intp)
+
+
+def _blocks(data, columns, cancel_event):
+    """Yield (first row position, frame) blocks of the columns"""
+    if isinstance(data, ChunkedDataset):
+        start = 0
+        for part in data.iter_chunks(columns, cancel_event=cancel_event):
+            yield start, part
+            start += len(part)
+        return
+
+    frame = data[columns]
+    for start in range(0, len(frame), BLOCK_ROWS):
+        _check_cancelled(cancel_event)
+        yield start, frame.iloc[start : start + BLOCK_ROWS]
+
+
+def _candidate_signatures(
+    data, columns, hasher, candidates, cancel_event, progress_callback, total
+):
+    """Signatures of the candidate rows (sorted positions), read block by block"""
+    signatures = np.zeros((len(candidates), hasher.num_perm), dtype=np.uint32)
+    for start, block in _blocks(data, columns, cancel_event):
+        stop = start + len(block)
+        first, last = np.searchsorted(candidates, [start, stop])
+        if last > first:
+            rows = block.iloc[candidates[first:last] - start]
+            signatures[first:last], _ = hasher.signatures(
+                normalize(record_texts(rows, columns))
+            )
+        if progress_callback is not None:
+            progress_callback(total + stop, 2 * total)
+    return signatures
+
+
+def _similarity(signatures, row_of, rows, other_rows):
+    """Estimated similarity of each row to the matching row of other_rows"""
+    own = signatures[row_of[rows].to_numpy()]
+    other = signatures[row_of[other_rows].to_numpy()]
+    return (own == other).mean(axis=1)
+
+
+def _clusters(sources, targets, signatures, row_of, total):
+    """Cluster table from the similar pairs, joined transitively"""
+    empty = pd.DataFrame(
+        {
+            "cluster": pd.Series(dtype=np.int64),
+            "row": pd.Series(dtype=np.int64),
+            "similarity": pd.Series(dtype=np.float64),
+        }
+    )
+    if not len(sources):
+        return empty
+
+    # scipy is imported here, as DataManager imports this module at startup
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    graph = coo_matrix(
+        (np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(total, total)
+    )
+    _, labels = connected_components(graph, directed=False)
+    sizes = np.bincount(labels)
+    rows = np.flatnonzero(sizes[labels] > 1)
+
+    table = pd.DataFrame({"label": labels[rows], "row": rows})
+    table["size"] = sizes[table["label"]]
+    table = table.sort_values(["size", "label", "row"], ascending=[False, True, True])
+    table["cluster"] = pd.factorize(table["label"])[0]
+
+    first_rows = table.groupby("cluster")["row"].transform("first").to_numpy()
+    table["similarity"] = _similarity(signatures, row_of, table["row"], first_rows)
+    return table[["cluster", "row", "similarity"]].reset_index(drop=True)
+
+
+def _check_cancelled(cancel_event):
+    """Raise LoadCancelled if cancellation has been requested"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise LoadCancelled()
@@ -0,0 +1,450 @@
+"""
+History - Undo/redo stack that stores only what each operation changed
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+class ColumnChange:
+    """Values changed in one column at given row positions (fills, clips)"""
+
+    def __init__(self, column, positions, old_values, new_values, old_dtype, new_dtype):
+        self.column = column
+        self.positions = positions
+        self.old_values = old_values
+        self.new_values = new_values
+        self.old_dtype = old_dtype
+        self.new_dtype = new_dtype
+
+    @classmethod
+    def between(cls, column, old_series, new_series):
+        """Record the difference between two versions of a column"""
+        old = old_series.to_numpy()
+        new = new_series.to_numpy()
+        old_na = pd.isna(old_series).to_numpy()
+        new_na = pd.isna(new_series).to_numpy()
+
+        with np.errstate(invalid="ignore"):
+            differs = old_na != new_na
+            both_present = ~old_na & ~new_na
+            differs[both_present] |= old[both_present] != new[both_present]
+        positions = np.flatnonzero(differs)
+
+        return cls(
+            column,
+            positions,
+            old[positions],
+            new[positions],
+            old_series.dtype,
+            new_series.dtype,
+        )
+
+    @property
+    def nbytes(self):
+        return _nbytes(self.positions) + _nbytes(self.old_values) + _nbytes(
+            self.new_values
+        )
+
+    def apply(self, df):
+        """Redo the change"""
+        return self._set(df, self.new_values, self.new_dtype, self.old_dtype)
+
+    def revert(self, df):
+        """Undo the change"""
+        return self._set(df, self.old_values, self.old_dtype, self.new_dtype)
+
+    def _set(self, df, values, dtype, other_dtype):
+        """Write values at the recorded positions and restore the column dtype"""
+        series = df[self.column]
+        if dtype != other_dtype:
+            series = series.astype(object)
+        else:
+            series = series.copy()
+        series.iloc[self.positions] = values
+        if series.dtype != dtype:
+            series = series.astype(dtype)
+        df = df.copy(deep=False)
+        df[self.column] = series
+        return df
+
+
+class DtypeChange:
+    """Lossless dtype conversion of one column (memory optimization)
+
+    Nothing but the two dtypes is stored; missing values come back as the
+    missing-value marker of the old dtype.
+    """
+
+    def __init__(self, column, old_dtype, new_dtype):
+        self.column = column
+        self.old_dtype = old_dtype
+        self.new_dtype = new_dtype
+
+    @property
+    def nbytes(self):
+        return 0
+
+    def apply(self, df):
+        return self._set(df, self.new_dtype)
+
+    def revert(self, df):
+        return self._set(df, self.old_dtype)
+
+    def _set(self, df, dtype):
+        """A shallow copy of df with the column converted to dtype"""
+        df = df.copy(deep=False)
+        df[self.column] = df[self.column].astype(dtype)
+        return df
+
+
+class RowRemoval:
+    """Rows dropped from a frame, kept so they can be put back (drops, dedup)"""
+
+    def __init__(self, positions, removed_rows, old_index, reset_index):
+        self.positions = positions
+        self.removed_rows = removed_rows
+        self.old_index = old_index
+        self.reset_index = reset_index
+
+    @classmethod
+    def of(cls, df, keep_mask, reset_index=False):
+        """Record dropping the rows of df where keep_mask is False"""
+        keep_mask = np.asarray(keep_mask, dtype=bool)
+        positions = np.flatnonzero(~keep_mask)
+
+        old_index = None
+        if reset_index and not _is_default_index(df.index):
+            # Kept labels are lost by reset_index; removed ones travel with the rows
+            old_index = df.index[keep_mask]
+
+        return cls(positions, df.take(positions), old_index, reset_index)
+
+    @property
+    def nbytes(self):
+        size = _nbytes(self.positions)
+        size += int(self.removed_rows.memory_usage(index=True, deep=True).sum())
+        if self.old_index is not None:
+            size += int(self.old_index.memory_usage(deep=True))
+        return size
+
+    def apply(self, df):
+        """Redo the removal"""
+        if not len(self.positions):
+            if self.reset_index and not _is_default_index(df.index):
+                df = df.copy(deep=False)
+                df.index = pd.RangeIndex(len(df))
+            return df
+
+        keep_mask = np.ones(len(df), dtype=bool)
+        keep_mask[self.positions] = False
+        result = df.take(np.flatnonzero(keep_mask))
+        if self.reset_index:
+            # take() already built a new frame, so relabel it instead of copying
+            result.index = pd.RangeIndex(len(result))
+        return result
+
+    def revert(self, df):
+        """Undo the removal by putting the rows back at their old positions"""
+        total = len(df) + len(self.positions)
+        kept_positions = np.setdiff1d(
+            np.arange(total), self.positions, assume_unique=True
+        )
+
+        kept = df
+        if self.reset_index:
+            kept = df.copy(deep=False)
+            kept.index = (
+                self.old_index
+                if self.old_index is not None
+                else pd.RangeIndex(total)[kept_positions]
+            )
+
+        combined = pd.concat([kept, self.removed_rows])
+        order = np.empty(total, dtype=np.int64)
+        order[kept_positions] = np.arange(len(kept_positions))
+        order[self.positions] = len(kept_positions) + np.arange(len(self.positions))
+        restored = combined.take(order)
+
+        if self.reset_index and self.old_index is None:
+            restored.index = pd.RangeIndex(total)
+        return restored
+
+
+class FrameSwap:
+    """Whole-frame swap, for states that cannot be described more cheaply
+
+    Only the frame that is not current is kept: each apply or revert hands
+    it back and keeps the frame it replaced.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    @property
+    def nbytes(self):
+        if not isinstance(self.frame, pd.DataFrame):
+            # Out-of-core datasets hold only references to files on disk
+            return 0
+        return int(self.frame.memory_usage(index=True, deep=True).sum())
+
+    def apply(self, df):
+        frame, self.frame = self.frame, df
+        return frame
+
+    def revert(self, df):
+        return self.apply(df)
+
+
+class CompositeChange:
+    """Several changes applied in order as one undo step"""
+
+    def __init__(self, changes):
+        self.changes = list(changes)
+
+    @property
+    def nbytes(self):
+        return sum(change.nbytes for change in self.changes)
+
+    def apply(self, df):
+        for change in self.changes:
+            df = change.apply(df)
+        return df
+
+    def revert(self, df):
+        for change in reversed(self.changes):
+            df = change.revert(df)
+        return df
+
+
+class _Slot:
+    """An undo step, held in memory or spilled to a pickle file"""
+
+    def __init__(self, operation, change=None, path=None, nbytes=0, owned=True):
+        self.operation = operation
+        self.change = change
+        self.path = path
+        self.nbytes = nbytes
+        self.owned = owned
+
+    @property
+    def in_memory(self):
+        return self.change is not None
+
+    def load(self):
+        """Return the change, reading it from disk if it was spilled"""
+        if self.change is not None:
+            return self.change
+        with open(self.path, "rb") as f:
+            return pickle.load(f)
+
+    def discard(self):
+        """Delete the spill file if this slot owns it"""
+        if self.path is not None and self.owned and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class UndoStack:
+    """Undo/redo stack of change records with a memory budget
+
+    Each step stores only what its operation changed (see ColumnChange,
+    RowRemoval), so undo and redo cost about as much as the change itself.
+    When the steps held in memory exceed memory_budget bytes, the oldest
+    ones are pickled to a temporary directory and read back on demand.
+    close() removes that directory; it is also removed when the stack is
+    garbage collected or the interpreter exits.
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self._undo = []
+        self._redo = []
+        self._spill_dir = None
+        self._remove_spill_dir = None
+
+    def push(self, operation, change):
+        """Record a new step; clears the redo stack"""
+        for slot in self._redo:
+            slot.discard()
+        self._redo = []
+
+        self._undo.append(_Slot(operation, change, nbytes=change.nbytes))
+        self._enforce_budget()
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self, df):
+        """Undo the latest step; returns (new frame, operation)"""
+        slot = self._undo.pop()
+        df = self._run(slot, "revert", df)
+        self._redo.append(slot)
+        self._enforce_budget()
+        return df, slot.operation
+
+    def redo(self, df):
+        """Redo the latest undone step; returns (new frame, operation)"""
+        slot = self._redo.pop()
+        df = self._run(slot, "apply", df)
+        self._undo.append(slot)
+        self._enforce_budget()
+        return df, slot.operation
+
+    def _run(self, slot, method, df):
+        """Apply or revert a step, keeping it in memory afterwards
+
+        Changes such as FrameSwap update themselves when run, so a spilled
+        step is brought back into memory and spilled again if needed.
+        """
+        change = slot.load()
+        df = getattr(change, method)(df)
+        if not slot.in_memory:
+            slot.discard()
+            slot.path = None
+        slot.change = change
+        slot.nbytes = change.nbytes
+        return df
+
+    def changes(self):
+        """Changes of every undo and redo step, or None if some are on disk"""
+        slots = self._undo + self._redo
+        if not all(slot.in_memory for slot in slots):
+            return None
+        return [slot.change for slot in slots]
+
+    def operations(self):
+        """Operations of the steps that are currently applied, oldest first"""
+        return [slot.operation for slot in self._undo]
+
+    def clear(self):
+        """Forget every step and remove spill files"""
+        for slot in self._undo + self._redo:
+            slot.discard()
+        self._undo = []
+        self._redo = []
+
+    @property
+    def memory_usage(self):
+        """Bytes held by steps that are in memory"""
+        return sum(s.nbytes for s in self._undo + self._redo if s.in_memory)
+
+    def _enforce_budget(self):
+        """Spill the oldest in-memory steps until the budget is met"""
+        usage = self.memory_usage
+        for slot in self._undo + self._redo:
+            if usage <= self.memory_budget:
+                break
+            if slot.in_memory:
+                self._spill(slot)
+                usage -= slot.nbytes
+
+    def _spill(self, slot):
+        """Move a step from memory to a pickle file"""
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="datox-undo-")
+            self._remove_spill_dir = weakref.finalize(
+                self, shutil.rmtree, self._spill_dir, ignore_errors=True
+            )
+        fd, path = tempfile.mkstemp(suffix=".pkl", dir=self._spill_dir)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(slot.change, f, protocol=pickle.HIGHEST_PROTOCOL)
+        slot.change = None
+        slot.path = path
+        slot.owned = True
+
+    def save(self, directory):
+        """Write every step into a directory; returns a JSON-friendly description
+
+        Files are named after their content, so steps that were loaded from
+        the same directory are not rewritten.
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        description = {}
+        referenced = set()
+        for name, slots in (("undo", self._undo), ("redo", self._redo)):
+            entries = []
+            for slot in slots:
+                if slot.in_memory:
+                    data = pickle.dumps(slot.change, protocol=pickle.HIGHEST_PROTOCOL)
+                else:
+                    with open(slot.path, "rb") as f:
+                        data = f.read()
+                file_name = hashlib.blake2b(data, digest_size=16).hexdigest() + ".pkl"
+                target = os.path.join(directory, file_name)
+                if not os.path.exists(target):
+                    with open(target + ".tmp", "wb") as f:
+                        f.write(data)
+                    os.replace(target + ".tmp", target)
+                referenced.add(file_name)
+                entries.append(
+                    {
+                        "file": file_name,
+                        "operation": slot.operation,
+                        "nbytes": slot.nbytes,
+                    }
+                )
+            description[name] = entries
+
+        for file_name in os.listdir(directory):
+            if file_name not in referenced:
+                try:
+                    os.remove(os.path.join(directory, file_name))
+                except OSError:
+                    pass
+
+        return description
+
+    def load(self, directory, description):
+        """Replace the stack with steps saved by save(), read lazily from disk"""
+        self.clear()
+        for name in ("undo", "redo"):
+            slots = [
+                _Slot(
+                    entry["operation"],
+                    path=os.path.join(directory, entry["file"]),
+                    nbytes=entry["nbytes"],
+                    owned=False,
+                )
+                for entry in description.get(name, [])
+            ]
+            if name == "undo":
+                self._undo = slots
+            else:
+                self._redo = slots
+
+    def close(self):
+        """Forget every step and remove the spill directory"""
+        self.clear()
+        if self._spill_dir is not None:
+            self._remove_spill_dir()
+            self._spill_dir = None
+            self._remove_spill_dir = None
+
+
+def _nbytes(values):
+    """Approximate memory held by an array of values"""
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return int(values.nbytes)
+    return int(pd.Series(values).memory_usage(deep=True))
+
+
+def _is_default_index(index):
+    """Whether an index is a plain 0..n-1 RangeIndex"""
+    return (
+        isinstance(index, pd.RangeIndex)
+        and index.start == 0
+        and index.step == 1
+    )
@@ -0,0 +1,229 @@
+"""
+Instrumentation - Startup phase timings and event-loop stalls, logged to a rotating file
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+
+LOGGER_NAME = "datox"
+LOG_FILE = os.path.join(os.path.expanduser("~"), ".datox", "datox.log")
+LOG_MAX_BYTES = 1024**2
+LOG_BACKUPS = 3
+
+DEFAULT_STALL_MS = 200
+HEARTBEAT_MS = 50
+MAX_STALLS = 200
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TKINTER_DIR = os.path.join(os.path.dirname(os.path.abspath(os.__file__)), "tkinter")
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def setup_logging(log_file=LOG_FILE):
+    """Send the application log to a rotating file, and warnings to the console
+
+    Returns the log file path, or None if the file cannot be opened; the
+    console handler is added either way.
+    """
+    logger.setLevel(logging.INFO)
+    console = logging.StreamHandler()
+    console.setLevel(logging.WARNING)
+    console.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+    logger.addHandler(console)
+
+    try:
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        handler = RotatingFileHandler(
+            log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+    except OSError as e:
+        logger.warning("Cannot write the log file %s: %s", log_file, e)
+        return None
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    logger.addHandler(handler)
+    return log_file
+
+
+class Instrumentation:
+    """Timings of named startup phases and a history of event-loop stalls
+
+    Phases are timed from the creation of the Instrumentation, which
+    main.py does first. Every phase and stall is logged as it ends and
+    kept for the diagnostics dialog; only the latest MAX_STALLS stalls are
+    kept in memory.
+    """
+
+    def __init__(self, log_file=None):
+        self.started = time.perf_counter()
+        self.log_file = log_file
+        self.phases = []
+        self.stalls = deque(maxlen=MAX_STALLS)
+
+    @contextmanager
+    def phase(self, name):
+        """Time the body of a with statement as a named phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(name, start)
+
+    def record_phase(self, name, start):
+        """Record a phase that began at the perf_counter time start"""
+        end = time.perf_counter()
+        phase = {
+            "name": name,
+            "start_ms": (start - self.started) * 1000,
+            "duration_ms": (end - start) * 1000,
+        }
+        self.phases.append(phase)
+        logger.info(
+            "Phase %s: %.1f ms (at %.1f ms)",
+            name,
+            phase["duration_ms"],
+            phase["start_ms"],
+        )
+
+    def record_stall(self, operation, location, duration_ms):
+        """Record that operation blocked the event loop for duration_ms"""
+        self.stalls.append(
+            {
+                "time": time.time(),
+                "operation": operation,
+                "location": location,
+                "duration_ms": duration_ms,
+            }
+        )
+        logger.warning(
+            "Event loop blocked for %.0f ms by %s (%s)",
+            duration_ms,
+            operation,
+            location,
+        )
+
+
+class StallWatchdog:
+    """Reports Tk callbacks that block the event loop for threshold_ms or more
+
+    A heartbeat rescheduled with after() every HEARTBEAT_MS notices when it
+    runs late. Meanwhile a daemon thread checks the heartbeat and, once it
+    is threshold_ms late, samples the main thread's stack to name the
+    callback that is running. The stall is recorded when the loop recovers,
+    with its full length.
+    """
+
+    def __init__(self, widget, instrumentation, threshold_ms=DEFAULT_STALL_MS):
+        self.widget = widget
+        self.instrumentation = instrumentation
+        self.threshold_ms = threshold_ms
+        self._main_thread_id = threading.main_thread().ident
+        self._beat = 0
+        self._last_beat = None
+        self._sample = None
+        self._stop = threading.Event()
+        self._after_id = None
+
+    def start(self):
+        """Start the heartbeat and the watching thread; returns self
+
+        Watching begins with the first heartbeat, so the work done before
+        the event loop starts does not count as a stall.
+        """
+        self._after_id = self.widget.after(HEARTBEAT_MS, self._heartbeat)
+        threading.Thread(target=self._watch, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop watching"""
+        self._stop.set()
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _heartbeat(self):
+        """Runs on the Tk thread; records a stall if this beat came late"""
+        now = time.perf_counter()
+        last_beat = self._last_beat
+        late_ms = 0 if last_beat is None else (now - last_beat) * 1000 - HEARTBEAT_MS
+        if late_ms >= self.threshold_ms:
+            sample = self._sample
+            if sample is not None and sample[0] == self._beat:
+                operation, location = sample[1], sample[2]
+            else:
+                operation, location = "unknown", "not sampled"
+            self.instrumentation.record_stall(operation, location, late_ms)
+
+        self._beat += 1
+        self._last_beat = now
+        if not self._stop.is_set():
+            self._after_id = self.widget.after(HEARTBEAT_MS, self._heartbeat)
+
+    def _watch(self):
+        """Runs on the watchdog thread; samples the stack of a late heartbeat"""
+        interval = self.threshold_ms / 2000
+        while not self._stop.wait(interval):
+            beat, last_beat = self._beat, self._last_beat
+            if last_beat is None:
+                continue
+            late_ms = (time.perf_counter() - last_beat) * 1000 - HEARTBEAT_MS
+            if late_ms < self.threshold_ms or (
+                self._sample is not None and self._sample[0] == beat
+            ):
+                continue
+            frame = sys._current_frames().get(self._main_thread_id)
+            if frame is not None:
+                self._sample = (beat,) + describe_stack(frame)
+
+
+def describe_stack(frame):
+    """(operation, location) of the Tk callback running in a stack
+
+    The operation is the outermost application function called by the
+    innermost Tk callback dispatch, and the location the innermost line of
+    application code, so a stall in a pandas call still points at the
+    application line that made it.
+    """
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+
+    # Frames called from the latest Tk callback dispatch
+    for i in range(len(frames) - 1, -1, -1):
+        if _is_callback_dispatch(frames[i]):
+            frames = frames[i + 1 :]
+            break
+
+    own = [f for f in frames if f.f_code.co_filename.startswith(PROJECT_DIR)]
+    if not own:
+        return "Tk", "outside application code"
+    innermost = own[-1]
+    location = (
+        f"{os.path.relpath(innermost.f_code.co_filename, PROJECT_DIR)}:"
+        f"{innermost.f_lineno} in {innermost.f_code.co_name}"
+    )
+    return _function_name(own[0]), location
+
+
+def _is_callback_dispatch(frame):
+    """Whether a frame is tkinter calling a Python callback from Tcl"""
+    code = frame.f_code
+    return code.co_name == "__call__" and code.co_filename.startswith(TKINTER_DIR)
+
+
+def _function_name(frame):
+    """Class.method or function name of a frame"""
+    owner = frame.f_locals.get("self")
+    name = frame.f_code.co_name
+    return f"{type(owner).__name__}.{name}" if owner is not None else name
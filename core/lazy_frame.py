@@ -0,0 +1,113 @@
+"""
+LazyFrame - Column-on-demand view of a frame stored in a project
+"""
+
+import pandas as pd
+
+
+class LazyFrame:
+    """Read-only frame whose columns are loaded from a ProjectStore when first used
+
+    The schema, row count and cached statistics come from the project
+    manifest, so a LazyFrame can be shown before any column data is read.
+    Loaded columns are kept; uncompressed columns are memory-mapped, so
+    loading them costs little until their pages are touched.
+    """
+
+    def __init__(self, store, frame_entry, mmap=True):
+        self.store = store
+        self.frame_entry = frame_entry
+        self.mmap = mmap
+
+        self._entries = {entry["name"]: entry for entry in frame_entry["columns"]}
+        self._columns = {}
+        self._index = None
+
+    @property
+    def columns(self):
+        """Column labels in stored order"""
+        return pd.Index([entry["name"] for entry in self.frame_entry["columns"]])
+
+    @property
+    def dtypes(self):
+        """Column dtypes taken from the manifest"""
+        return pd.Series(
+            [_manifest_dtype(entry["dtype"]) for entry in self.frame_entry["columns"]],
+            index=self.columns,
+            dtype=object,
+        )
+
+    @property
+    def shape(self):
+        """(rows, columns) without loading any data"""
+        return (self.frame_entry["rows"], len(self.frame_entry["columns"]))
+
+    def __len__(self):
+        return self.frame_entry["rows"]
+
+    @property
+    def index(self):
+        """Row index of the frame"""
+        if self._index is None:
+            self._index = self.store.load_index(self.frame_entry, mmap=self.mmap)
+        return self._index
+
+    def dtype(self, column):
+        """Dtype of one column"""
+        return _manifest_dtype(self._entries[column]["dtype"])
+
+    def stats(self, column):
+        """Exact statistics cached in the manifest for a column, or None"""
+        return self.store.column_stats(self._entries[column])
+
+    def is_loaded(self, column):
+        """Whether a column has already been read"""
+        return column in self._columns
+
+    def column(self, column):
+        """Load (once) and return a column as a Series"""
+        if column not in self._columns:
+            self._columns[column] = self.store.load_column(
+                self._entries[column], self.index, mmap=self.mmap
+            )
+        return self._columns[column]
+
+    def frame(self, columns):
+        """Return a DataFrame holding only the given columns"""
+        if not columns:
+            return pd.DataFrame(index=self.index)
+        return pd.concat([self.column(c) for c in columns], axis=1, copy=False)
+
+    def rows(self, start, stop):
+        """Return rows start:stop of every column, decoding only that range"""
+        stop = min(stop, len(self))
+        index = self.store.load_index(
+            self.frame_entry, mmap=self.mmap, start=start, stop=stop
+        )
+
+        series_list = []
+        for entry in self.frame_entry["columns"]:
+            name = entry["name"]
+            if name in self._columns or entry["compressed"]:
+                series = self.column(name).iloc[start:stop]
+            else:
+                series = self.store.load_column(
+                    entry, index, mmap=self.mmap, start=start, stop=stop
+                )
+            series_list.append(series)
+
+        if not series_list:
+            return pd.DataFrame(index=index)
+        return pd.concat(series_list, axis=1, copy=False)
+
+    def to_pandas(self):
+        """Load every column into a regular DataFrame"""
+        return self.frame(list(self.columns))
+
+
+def _manifest_dtype(dtype_name):
+    """Turn a dtype name stored in the manifest back into a dtype object"""
+    try:
+        return pd.api.types.pandas_dtype(dtype_name)
+    except TypeError:
+        return pd.api.types.pandas_dtype("object")
@@ -0,0 +1,118 @@
+"""
+Loader - Chunked dataset readers with progress reporting and cancellation
+"""
+
+import os
+import pandas as pd
+from core.encoding import (
+    IncrementalDecodingReader,
+    detect_encoding,
+    remember_encoding,
+)
+
+
+DEFAULT_CHUNK_SIZE = 100000
+
+
+class LoadCancelled(Exception):
+    """Raised when a dataset load is cancelled before it finishes"""
+
+
+def _check_cancelled(cancel_event):
+    """Raise LoadCancelled if the cancel event has been set"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise LoadCancelled("Loading was cancelled")
+
+
+def read_csv_chunked(
+    file_path,
+    encoding=None,
+    chunksize=DEFAULT_CHUNK_SIZE,
+    progress_callback=None,
+    cancel_event=None,
+):
+    """Read a CSV file chunk by chunk, reporting bytes read after each chunk
+
+    progress_callback is called as progress_callback(bytes_read, total_bytes)
+    from the calling thread. Setting cancel_event stops the read between
+    chunks and raises LoadCancelled.
+
+    The encoding is sniffed once when not given. Bytes that do not decode
+    with it are handled by IncrementalDecodingReader in the same pass.
+    """
+    chunks = list(
+        iter_csv_chunks(
+            file_path,
+            encoding=encoding,
+            chunksize=chunksize,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+        )
+    )
+
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def iter_csv_chunks(
+    file_path,
+    encoding=None,
+    chunksize=DEFAULT_CHUNK_SIZE,
+    progress_callback=None,
+    cancel_event=None,
+):
+    """Yield a CSV file as DataFrames of at most chunksize rows
+
+    Same progress, cancellation and encoding handling as read_csv_chunked,
+    but only one chunk is held at a time. Chunks are numbered with their
+    position in the file, so their indexes continue from one to the next.
+    """
+    if encoding is None:
+        encoding = detect_encoding(file_path)
+
+    total_bytes = os.path.getsize(file_path)
+
+    with open(file_path, "rb") as handle:
+        stream = IncrementalDecodingReader(handle, encoding)
+        reader = pd.read_csv(
+            stream,
+            on_bad_lines="skip",
+            low_memory=True,
+            chunksize=chunksize,
+        )
+        with reader:
+            for chunk in reader:
+                _check_cancelled(cancel_event)
+                if progress_callback is not None:
+                    progress_callback(min(handle.tell(), total_bytes), total_bytes)
+                yield chunk
+
+    _check_cancelled(cancel_event)
+
+    if stream.switched_at is not None and stream.ascii_before_switch:
+        # Everything before the switch decodes the same either way, so the
+        # fallback is the file's real encoding; skip the retry next time
+        remember_encoding(file_path, stream.encoding)
+
+
+def read_excel_file(file_path, progress_callback=None, cancel_event=None):
+    """Read an Excel file, reporting progress before and after the parse
+
+    Excel workbooks cannot be streamed by pandas, so progress only moves
+    once the whole sheet has been parsed. Cancellation is honoured before
+    the parse starts and before the result is returned.
+    """
+    total_bytes = os.path.getsize(file_path)
+
+    _check_cancelled(cancel_event)
+    if progress_callback is not None:
+        progress_callback(0, total_bytes)
+
+    dataframe = pd.read_excel(file_path)
+
+    _check_cancelled(cancel_event)
+    if progress_callback is not None:
+        progress_callback(total_bytes, total_bytes)
+
+    return dataframe
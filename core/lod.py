@@ -0,0 +1,118 @@
+"""
+LevelOfDetail - Scatter points re-queried for the visible range on zoom and pan
+"""
+
+import numpy as np
+
+
+# Cell size, in screen pixels, of the grid the drawn points are thinned to
+CELL_PIXELS = 2
+# Most points a query scans; levels are chosen to stay below it
+QUERY_POINTS = 1_000_000
+# Each level holds this many times fewer points than the next finer one
+LEVEL_RATIO = 4
+
+
+class ScatterLOD:
+    """Keeps a scatter plot's collection showing only what can be seen
+
+    The points are indexed once as levels of nested random samples, each
+    sorted by x, from all points down to at most QUERY_POINTS. When the
+    axes' limits change, as with a zoom or pan through the navigation
+    toolbar, the visible points are looked up with a binary search on x,
+    from the coarsest level to finer ones until the view's pixel grid is
+    filled or a level would need scanning more than QUERY_POINTS. At most
+    one point is drawn per grid cell of CELL_PIXELS pixels, so the cost of
+    drawing depends on the size of the plot, not of the data.
+    """
+
+    def __init__(self, ax, collection, x, y, seed=0):
+        self.ax = ax
+        self.collection = collection
+        self.levels = _build_levels(x, y, seed)
+        self.positions = np.empty(0, dtype=np.intp)
+        self._limits = None
+
+        # Drawing a subset, so the data limits are set from all the points
+        ax.update_datalim([(x.min(), y.min()), (x.max(), y.max())])
+        ax.autoscale_view()
+        self.update()
+
+        # Functions, unlike bound methods, are kept alive by the registry,
+        # so the index lives as long as the axes
+        ax.callbacks.connect("xlim_changed", lambda ax: self.update())
+        ax.callbacks.connect("ylim_changed", lambda ax: self.update())
+
+    def update(self):
+        """Draw the points visible in the current limits, if they changed"""
+        x_limits = tuple(sorted(self.ax.get_xlim()))
+        y_limits = tuple(sorted(self.ax.get_ylim()))
+        limits = x_limits + y_limits
+        if limits == self._limits:
+            return
+        self._limits = limits
+
+        width, height = self._grid_size()
+        x, y, positions = self._query(x_limits, y_limits, width * height)
+        drawn = _one_per_cell(x, y, x_limits, y_limits, width, height)
+        self.positions = positions[drawn]
+        self.collection.set_offsets(np.column_stack([x[drawn], y[drawn]]))
+
+    def _grid_size(self):
+        """(columns, rows) of the thinning grid over the axes"""
+        bbox = self.ax.bbox
+        width = max(int(bbox.width / CELL_PIXELS), 1)
+        height = max(int(bbox.height / CELL_PIXELS), 1)
+        return width, height
+
+    def _query(self, x_limits, y_limits, cells):
+        """x, y and row positions of visible points at the finest affordable level"""
+        found = None
+        for level_x, level_y, level_positions in self.levels:
+            start = np.searchsorted(level_x, x_limits[0], side="left")
+            stop = np.searchsorted(level_x, x_limits[1], side="right")
+            if found is not None and stop - start > QUERY_POINTS:
+                break
+            y = level_y[start:stop]
+            inside = np.flatnonzero((y >= y_limits[0]) & (y <= y_limits[1]))
+            inside += start
+            found = level_x[inside], level_y[inside], level_positions[inside]
+            if len(inside) >= cells:
+                break
+        return found
+
+
+def _build_levels(x, y, seed):
+    """(x, y, row positions) of each level, coarsest first, sorted by x
+
+    Every point gets a random rank; a level holds the points whose rank is
+    below its size, so each level is a uniform sample and contains the
+    coarser ones. One sort by x serves all levels.
+    """
+    order = np.argsort(x)
+    ranks = np.random.default_rng(seed).permutation(len(x))[order]
+
+    sizes = [len(x)]
+    while sizes[-1] > QUERY_POINTS:
+        sizes.append(sizes[-1] // LEVEL_RATIO)
+
+    levels = []
+    for size in reversed(sizes):
+        positions = order if size == len(x) else order[ranks < size]
+        levels.append((x[positions], y[positions], positions))
+    return levels
+
+
+def _one_per_cell(x, y, x_limits, y_limits, width, height):
+    """Indexes of one point in each occupied cell of a width x height grid"""
+    columns = cell_index(x, *x_limits, width)
+    rows = cell_index(y, *y_limits, height)
+    cell_point = np.full(width * height, -1, dtype=np.intp)
+    cell_point[rows * width + columns] = np.arange(len(x))
+    return cell_point[cell_point >= 0]
+
+
+def cell_index(values, low, high, cells):
+    """Grid cell of each value in [low, high], with high in the last cell"""
+    index = ((values - low) * (cells / (high - low))).astype(np.intp)
+    return np.minimum(index, cells - 1, out=index)
@@ -0,0 +1,117 @@
+"""
+MemoryOptimizer - Shrinks dataframe memory by choosing smaller dtypes
+"""
+
+import importlib.util
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CATEGORY_THRESHOLD = 0.5
+
+_INTEGER_TYPES = [np.int8, np.int16, np.int32]
+
+
+def arrow_strings_available():
+    """Whether pyarrow is installed, so Arrow-backed strings can be used"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def optimize_dtypes(
+    df,
+    columns=None,
+    category_threshold=DEFAULT_CATEGORY_THRESHOLD,
+    arrow_strings=False,
+):
+    """Return (optimized frame, report) with smaller dtypes where they are lossless
+
+    - integer columns are downcast to the smallest integer type that holds
+      their range
+    - float64 columns become float32 when every value survives the round trip
+    - object columns whose share of distinct values is at most
+      category_threshold become category
+    - other all-string object columns become Arrow-backed strings when
+      arrow_strings is set and pyarrow is installed
+
+    Only columns that end up smaller are replaced, and the input frame is not
+    modified. The report lists one dict per converted column with column,
+    old_dtype, new_dtype, old_bytes and new_bytes.
+    """
+    if columns is None:
+        columns = list(df.columns)
+    arrow_strings = arrow_strings and arrow_strings_available()
+
+    result = df.copy(deep=False)
+    report = []
+    for column in columns:
+        series = df[column]
+        optimized = _optimize_series(series, category_threshold, arrow_strings)
+        if optimized is None:
+            continue
+
+        old_bytes = int(series.memory_usage(index=False, deep=True))
+        new_bytes = int(optimized.memory_usage(index=False, deep=True))
+        if new_bytes >= old_bytes:
+            continue
+
+        result[column] = optimized
+        report.append(
+            {
+                "column": column,
+                "old_dtype": _dtype_name(series.dtype),
+                "new_dtype": _dtype_name(optimized.dtype),
+                "old_bytes": old_bytes,
+                "new_bytes": new_bytes,
+            }
+        )
+
+    return result, report
+
+
+def _optimize_series(series, category_threshold, arrow_strings):
+    """Smaller-dtype version of a column, or None if there is nothing to gain"""
+    dtype = series.dtype
+
+    if isinstance(dtype, np.dtype) and dtype.kind in "iu":
+        return _downcast_integers(series)
+
+    if dtype == np.float64:
+        values = series.to_numpy()
+        narrowed = values.astype(np.float32)
+        with np.errstate(invalid="ignore", over="ignore"):
+            lossless = np.array_equal(
+                narrowed.astype(np.float64), values, equal_nan=True
+            )
+        return series.astype(np.float32) if lossless else None
+
+    if pd.api.types.is_object_dtype(dtype):
+        if len(series) and series.nunique() / len(series) <= category_threshold:
+            return series.astype("category")
+        if arrow_strings and pd.api.types.infer_dtype(series) == "string":
+            return series.astype(pd.StringDtype("pyarrow"))
+
+    return None
+
+
+def _dtype_name(dtype):
+    """Dtype name for reports, including the storage of string dtypes"""
+    if isinstance(dtype, pd.StringDtype):
+        return f"string[{dtype.storage}]"
+    return str(dtype)
+
+
+def _downcast_integers(series):
+    """Smallest signed integer version of an integer column, or None"""
+    if not len(series):
+        return None
+
+    values = series.to_numpy()
+    low, high = values.min(), values.max()
+    for integer_type in _INTEGER_TYPES:
+        info = np.iinfo(integer_type)
+        if info.bits >= series.dtype.itemsize * 8:
+            return None
+        if info.min <= low and high <= info.max:
+            return series.astype(integer_type)
+    return None
+
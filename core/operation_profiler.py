@@ -0,0 +1,161 @@
+"""
+OperationProfiler - Time, memory and row counts of operations, sent to sinks
+"""
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+
+MAX_RECENT = 100
+PROFILE_LINES = 25
+
+logger = logging.getLogger("datox.operations")
+
+
+def log_record(record):
+    """Sink writing a record to the datox.operations log as one JSON line"""
+    logger.info(json.dumps(record, default=str))
+
+
+def format_record(record):
+    """One-line summary of a record, as shown in the status bar"""
+    text = (
+        f"{record['operation']}: {record['wall_s']:.3f} s "
+        f"(CPU {record['cpu_s']:.3f} s)"
+    )
+    if record["peak_bytes"] is not None:
+        text += f", peak {record['peak_bytes'] / 1024**2:.1f} MB"
+    if record["rows_in"] is not None or record["rows_out"] is not None:
+        text += f", rows {record['rows_in']} -> {record['rows_out']}"
+    if record["error"] is not None:
+        text += f", failed with {record['error']}"
+    return text
+
+
+class OperationProfiler:
+    """Measures operations and hands each record to the registered sinks
+
+    A record is a dict with the operation name, wall and CPU seconds, rows
+    before and after (from the rows callable), the error type if it raised,
+    and, when enabled, peak traced memory (trace_memory) and a cProfile
+    listing (cprofile). CPU time is that of the calling thread.
+
+    Memory tracing and cProfile apply to the outermost operation of a
+    thread only, so nested operations do not reset each other's peak.
+    tracemalloc is process wide, so operations running at the same time on
+    other threads add to the peak.
+
+    Sinks are called on the thread that ran the operation; a sink that
+    raises is logged and skipped. log_record is registered by default and
+    the latest MAX_RECENT records are kept in recent.
+    """
+
+    def __init__(self, rows=None):
+        self.rows = rows
+        self.sinks = [log_record]
+        self.cprofile = False
+        self.trace_memory = False
+        self.recent = deque(maxlen=MAX_RECENT)
+        self._local = threading.local()
+
+    def add_sink(self, sink):
+        """Call sink(record) for every operation from now on; returns sink"""
+        self.sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink):
+        """Stop calling a sink added with add_sink"""
+        self.sinks.remove(sink)
+
+    @contextmanager
+    def operation(self, name):
+        """Measure the body of a with statement as the named operation
+
+        The record is yielded before it is filled in, so the body can set
+        extra keys, such as rows_out for an operation that returns rows.
+        """
+        depth = getattr(self._local, "depth", 0)
+        outermost = depth == 0
+        record = {"operation": name, "time": time.time()}
+        record["rows_in"] = self._rows()
+
+        trace = outermost and self.trace_memory
+        started_tracing = False
+        if trace:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+        profile = cProfile.Profile() if outermost and self.cprofile else None
+
+        self._local.depth = depth + 1
+        error = None
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            if profile is not None:
+                profile.disable()
+            record["wall_s"] = time.perf_counter() - wall
+            record["cpu_s"] = time.thread_time() - cpu
+            self._local.depth = depth
+
+            record["peak_bytes"] = None
+            if trace:
+                record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            record.setdefault("rows_out", self._rows())
+            record["error"] = error
+            record["profile"] = None if profile is None else _profile_text(profile)
+            self._emit(record)
+
+    def _rows(self):
+        """Current row count from the rows callable, or None"""
+        return None if self.rows is None else self.rows()
+
+    def _emit(self, record):
+        """Keep a record and hand it to every sink"""
+        self.recent.append(record)
+        for sink in list(self.sinks):
+            try:
+                sink(record)
+            except Exception:
+                logger.exception("Profiling sink %r failed", sink)
+
+
+def profiled(method):
+    """Decorator measuring a method with its object's profiler attribute
+
+    The operation is named after the method.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.profiler.operation(method.__name__):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _profile_text(profile):
+    """The PROFILE_LINES most expensive calls of a profile, by cumulative time"""
+    output = io.StringIO()
+    stats = pstats.Stats(profile, stream=output)
+    stats.sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return output.getvalue()
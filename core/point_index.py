@@ -0,0 +1,76 @@
+"""
+PointIndex - Nearest scatter plot point lookups for hover tooltips and picking
+"""
+
+import numpy as np
+
+
+# Nearest points in the tree's units that are compared by screen distance
+# before falling back to every point within the lookup radius
+CANDIDATES = 32
+
+
+class PointIndex:
+    """KD-tree over the points of a scatter plot
+
+    rows[i] is the row position of point i in the dataset, and key
+    identifies the data the points were taken from. The tree is built over
+    x and y divided by their ranges, so both axes weigh the same. nearest()
+    compares the CANDIDATES closest points in those units by their distance
+    on screen, which differs when the view is stretched more along one axis
+    than the other. When all of them are within the lookup radius, closer
+    points on screen may be further down the list, so every point within
+    the radius is compared instead.
+    """
+
+    def __init__(self, x, y, rows, key=None):
+        self.x = x
+        self.y = y
+        self.rows = rows
+        self.key = key
+        self.x_scale = _scale(x)
+        self.y_scale = _scale(y)
+        points = np.column_stack([x / self.x_scale, y / self.y_scale])
+        # scipy is imported here, as DataManager imports this module at startup
+        from scipy.spatial import cKDTree
+
+        # An unbalanced tree builds about twice as fast and queries as fast
+        self.tree = cKDTree(points, balanced_tree=False, compact_nodes=False)
+
+    def __len__(self):
+        return len(self.x)
+
+    def nearest(self, x, y, x_radius, y_radius):
+        """Point closest to (x, y) inside an ellipse with the given radii, or None
+
+        The radii are in data units along each axis, typically the size of
+        a few screen pixels in the current view.
+        """
+        bound = max(x_radius / self.x_scale, y_radius / self.y_scale)
+        point = [x / self.x_scale, y / self.y_scale]
+        candidates = min(CANDIDATES, len(self))
+        # The upper bound excludes points at exactly that distance
+        _, found = self.tree.query(
+            point, k=candidates, distance_upper_bound=np.nextafter(bound, np.inf)
+        )
+        found = np.atleast_1d(found)
+        # Missing neighbours are reported as len(self)
+        found = found[found < len(self)]
+        if len(found) == candidates:
+            found = np.asarray(self.tree.query_ball_point(point, bound), dtype=np.intp)
+        if not len(found):
+            return None
+
+        distance = ((self.x[found] - x) / x_radius) ** 2 + (
+            (self.y[found] - y) / y_radius
+        ) ** 2
+        best = np.argmin(distance)
+        if distance[best] > 1:
+            return None
+        return int(found[best])
+
+
+def _scale(values):
+    """Range of values, or 1 if they are all equal"""
+    extent = values.max() - values.min()
+    return extent if extent > 0 else 1.0
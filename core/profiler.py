@@ -0,0 +1,300 @@
+"""
+Profiler - Statistics of every column of a dataset, computed in a process pool
+"""
+
+import html
+import json
+import math
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import numpy as np
+import pandas as pd
+from core.chunked_dataset import ChunkedDataset
+from core.data_manager import block_sketches, compute_column_stats
+from core.loader import LoadCancelled
+
+
+# Below this many cells, starting worker processes costs more than it saves
+PARALLEL_MIN_CELLS = 5_000_000
+BATCH_CELLS = 5_000_000
+BATCHES_PER_WORKER = 4
+POLL_INTERVAL_S = 0.2
+
+HTML_FIELDS = [
+    ("dtype", "Type"),
+    ("missing", "Missing"),
+    ("unique", "Unique"),
+    ("mean", "Mean"),
+    ("std", "Std Dev"),
+    ("min", "Min"),
+    ("25%", "25%"),
+    ("50%", "Median"),
+    ("75%", "75%"),
+    ("max", "Max"),
+]
+
+
+def profile_dataset(
+    source,
+    on_result=None,
+    max_workers=None,
+    progress_callback=None,
+    cancel_event=None,
+):
+    """Profile report with the get_column_stats statistics of every column
+
+    source is DataManager.get_profile_source(), taken on the Tk main thread.
+    Its cached statistics are reused; the others are computed in worker
+    processes, a batch of columns at a time. on_result(column, stats) is
+    called as each column finishes, in completion order, from the calling
+    thread. Only source is read, so this can run on a BackgroundTask; the
+    caller stores the new statistics with store_profiled_stats on the main
+    thread.
+    """
+    columns = list(source["versions"])
+    approximate = source["approximate"]
+
+    results = {}
+
+    def collect(column, stats):
+        results[column] = stats
+        if on_result is not None:
+            on_result(column, stats)
+
+    for column, stats in source["cached"].items():
+        collect(column, stats)
+
+    pending = [c for c in columns if c not in results]
+    profile_columns(
+        source["data"],
+        pending,
+        approximate=approximate,
+        quantile_error=source["quantile_error"],
+        on_result=collect,
+        max_workers=max_workers,
+        progress_callback=(
+            None
+            if progress_callback is None
+            else lambda done, total: progress_callback(
+                len(columns) - total + done, len(columns)
+            )
+        ),
+        cancel_event=cancel_event,
+    )
+
+    return {
+        "file": source["file"],
+        "rows": source["rows"],
+        "approximate": approximate,
+        "columns": [dict(results[c], name=c) for c in columns],
+    }
+
+
+def store_profiled_stats(data_manager, source, column, stats):
+    """Cache a column profiled from source in the DataManager
+
+    Call on the Tk main thread; the StatsCache is not thread-safe.
+    Statistics of columns changed since source was taken are not served.
+    """
+    if column not in source["cached"]:
+        data_manager.store_column_stats(
+            column, source["versions"][column], stats, source["approximate"]
+        )
+
+
+def profile_columns(
+    data,
+    columns,
+    approximate=False,
+    quantile_error=None,
+    on_result=None,
+    max_workers=None,
+    progress_callback=None,
+    cancel_event=None,
+):
+    """Statistics of columns of a DataFrame, LazyFrame or ChunkedDataset
+
+    Columns are split into batches of about BATCH_CELLS values, and a
+    bounded number of batches is handed to the worker processes at a time,
+    so at most a few batches are copied at once. A ChunkedDataset is sent
+    as is and each worker reads its columns from disk. Small datasets are
+    profiled in the calling process.
+    """
+    rows = len(data)
+    total = len(columns)
+    batch_size = max(BATCH_CELLS // max(rows, 1), 1)
+    workers = max_workers or max((os.cpu_count() or 2) - 1, 1)
+    if workers > 1:
+        # Keep every worker busy even when the batches are large
+        batch_size = min(batch_size, max(total // (workers * BATCHES_PER_WORKER), 1))
+    batches = [columns[i : i + batch_size] for i in range(0, total, batch_size)]
+
+    results = {}
+    done = 0
+
+    def finish(batch_results):
+        nonlocal done
+        for column, stats in batch_results:
+            results[column] = stats
+            if on_result is not None:
+                on_result(column, stats)
+        done += len(batch_results)
+        if progress_callback is not None:
+            progress_callback(done, total)
+
+    if workers == 1 or rows * total < PARALLEL_MIN_CELLS:
+        for batch in batches:
+            _check_cancelled(cancel_event)
+            finish(
+                _profile_batch(
+                    _batch_data(data, batch), batch, approximate, quantile_error
+                )
+            )
+        return results
+
+    # Forking a process that runs Tk and other threads is unsafe
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    try:
+        queued = iter(batches)
+        running = set()
+        while True:
+            while len(running) < workers * 2:
+                batch = next(queued, None)
+                if batch is None:
+                    break
+                running.add(
+                    pool.submit(
+                        _profile_batch,
+                        _batch_data(data, batch),
+                        batch,
+                        approximate,
+                        quantile_error,
+                    )
+                )
+            if not running:
+                break
+
+            finished, running = wait(
+                running, timeout=POLL_INTERVAL_S, return_when=FIRST_COMPLETED
+            )
+            for future in finished:
+                finish(future.result())
+            _check_cancelled(cancel_event)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    return results
+
+
+def _batch_data(data, columns):
+    """What a worker needs to profile a batch of columns"""
+    if isinstance(data, ChunkedDataset):
+        return data
+    if isinstance(data, pd.DataFrame):
+        return data[columns]
+    return data.frame(columns)
+
+
+def _profile_batch(data, columns, approximate, quantile_error):
+    """[(column, stats)] for a batch of columns; runs in a worker process"""
+    if isinstance(data, ChunkedDataset):
+        return [
+            (column, data.stats(column, approximate, quantile_error))
+            for column in columns
+        ]
+
+    results = []
+    for column in columns:
+        series = data[column]
+        sketches = None
+        if approximate and not pd.api.types.is_numeric_dtype(series):
+            sketches = block_sketches(series)
+        results.append((column, compute_column_stats(series, sketches)))
+    return results
+
+
+def _check_cancelled(cancel_event):
+    """Raise LoadCancelled if cancellation has been requested"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise LoadCancelled()
+
+
+def export_json(report, file_path):
+    """Write a profile report as JSON; missing numbers become null"""
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(_json_value(report), f, indent=2)
+
+
+def export_html(report, file_path):
+    """Write a profile report as a standalone HTML table"""
+    title = f"Profile of {report['file']}" if report["file"] else "Dataset profile"
+    header = "".join(f"<th>{label}</th>" for _, label in HTML_FIELDS)
+    rows = []
+    for stats in report["columns"]:
+        cells = "".join(
+            f"<td>{html.escape(_format_value(stats.get(key)))}</td>"
+            for key, _ in HTML_FIELDS
+        )
+        top_values = ", ".join(
+            f"{html.escape(str(value))} ({share:.1%})"
+            for value, share in stats.get("top_values", {}).items()
+        )
+        rows.append(
+            f"<tr><th>{html.escape(str(stats['name']))}</th>{cells}"
+            f"<td>{top_values}</td></tr>"
+        )
+
+    note = " Statistics are approximate." if report["approximate"] else ""
+    document = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; font-size: 0.9em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+tr > th:first-child, td:last-child {{ text-align: left; }}
+thead th {{ background: #eee; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+<p>{report['rows']} rows, {len(report['columns'])} columns.{note}</p>
+<table>
+<thead><tr><th>Column</th>{header}<th>Top values</th></tr></thead>
+<tbody>
+{chr(10).join(rows)}
+</tbody>
+</table>
+</body>
+</html>
+"""
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(document)
+
+
+def _json_value(value):
+    """Convert numpy and pandas values in a report to JSON types"""
+    if isinstance(value, dict):
+        return {str(key): _json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _format_value(value):
+    """Table text of one statistic"""
+    if value is None:
+        return ""
+    if isinstance(value, (float, np.floating)):
+        return "" if np.isnan(value) else f"{value:.6g}"
+    return str(value)
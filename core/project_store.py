@@ -0,0 +1,619 @@
+"""
+ProjectStore - Columnar on-disk container for saved projects
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import numpy as np
+import pandas as pd
+from core.lazy_frame import LazyFrame
+from core.loader import LoadCancelled
+
+
+FORMAT_NAME = "datox-project"
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+COLUMNS_DIR = "columns"
+
+_MASKED_ARRAYS = (
+    pd.arrays.IntegerArray,
+    pd.arrays.FloatingArray,
+    pd.arrays.BooleanArray,
+)
+
+
+class ProjectStore:
+    """Saves and loads dataframes as one file set per column plus a JSON manifest
+
+    A project is a directory holding manifest.json and a columns/ folder.
+    Column files are named after a digest of their content, so a column
+    that has not changed since the last save is not written again, and
+    columns shared by several frames are stored once. Uncompressed columns
+    are plain .npy files and can be memory-mapped on load; compressed
+    columns are .npz archives.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.columns_path = os.path.join(path, COLUMNS_DIR)
+
+    @staticmethod
+    def is_project(path):
+        """Check whether a path is a columnar project directory"""
+        return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+    def save(
+        self,
+        frames,
+        metadata,
+        compression=None,
+        column_stats=None,
+        progress_callback=None,
+        cancel_event=None,
+    ):
+        """Write frames (a name -> DataFrame or LazyFrame dict) and JSON metadata
+
+        compression is None or "zlib". column_stats, if given, is called as
+        column_stats(series) for each newly written column and its result,
+        unless None, is cached in the manifest; columns that are already
+        stored keep the statistics recorded by the previous save. LazyFrame values are
+        written by reference to their existing column files. Returns the
+        number of column files that were actually written.
+        """
+        os.makedirs(self.columns_path, exist_ok=True)
+
+        known_stats = self._stored_stats()
+        total = sum(len(df.columns) for df in frames.values() if df is not None)
+        done = 0
+        written = 0
+        manifest_frames = {}
+
+        for name, df in frames.items():
+            if df is None:
+                manifest_frames[name] = None
+                continue
+
+            if isinstance(df, LazyFrame):
+                manifest_frames[name] = self._save_lazy(df)
+                done += len(df.columns)
+                if progress_callback is not None:
+                    progress_callback(done, total)
+                continue
+
+            index_entry, did_write = self._save_index(df.index, compression)
+            written += did_write
+
+            columns = []
+            for position in range(df.shape[1]):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise LoadCancelled("Saving was cancelled")
+
+                series = _frame_column(df, position)
+                entry, did_write = self._save_series(series, compression)
+                entry["name"] = _json_name(df.columns[position])
+                if entry["key"] in known_stats:
+                    entry["stats"] = known_stats[entry["key"]]
+                elif column_stats is not None:
+                    stats = column_stats(series)
+                    if stats is not None:
+                        entry["stats"] = _json_stats(stats)
+                        known_stats[entry["key"]] = entry["stats"]
+                columns.append(entry)
+                written += did_write
+
+                done += 1
+                if progress_callback is not None:
+                    progress_callback(done, total)
+
+            manifest_frames[name] = {
+                "rows": len(df),
+                "index": index_entry,
+                "columns": columns,
+            }
+
+        manifest = self.write_manifest(manifest_frames, metadata)
+        self._remove_unreferenced(manifest)
+
+        return written
+
+    def save_frame(self, df, compression=None):
+        """Write a frame's index and columns and return its frame entry
+
+        The manifest is not touched; callers that build their own set of
+        frames (such as ChunkedDataset) record the entries with
+        write_manifest.
+        """
+        os.makedirs(self.columns_path, exist_ok=True)
+        index_entry, _ = self._save_index(df.index, compression)
+        return {
+            "rows": len(df),
+            "index": index_entry,
+            "columns": [
+                self.save_column(df.iloc[:, position], compression)
+                for position in range(df.shape[1])
+            ],
+        }
+
+    def save_column(self, series, compression=None):
+        """Write a single column and return its manifest entry"""
+        os.makedirs(self.columns_path, exist_ok=True)
+        entry, _ = self._save_series(series, compression)
+        entry["name"] = _json_name(series.name)
+        return entry
+
+    def write_manifest(self, frame_entries, metadata):
+        """Record frame entries and metadata as the project manifest"""
+        manifest = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "metadata": metadata,
+            "frames": frame_entries,
+        }
+        self._write_manifest(manifest)
+        return manifest
+
+    def _save_lazy(self, lazy_frame):
+        """Reference the stored columns of a LazyFrame, copying files if needed"""
+        frame_entry = lazy_frame.frame_entry
+        source = lazy_frame.store
+
+        if os.path.realpath(source.path) != os.path.realpath(self.path):
+            entries = list(frame_entry["columns"])
+            if frame_entry["index"]["kind"] != "range":
+                entries.append(frame_entry["index"])
+            for entry in entries:
+                for file_name in self._entry_files(entry):
+                    target = os.path.join(self.columns_path, file_name)
+                    if not os.path.exists(target):
+                        shutil.copyfile(
+                            os.path.join(source.columns_path, file_name), target
+                        )
+
+        return frame_entry
+
+    def _stored_stats(self):
+        """Map column keys to statistics cached by the previous save"""
+        if not self.is_project(self.path):
+            return {}
+        try:
+            manifest = self.read_manifest()
+        except (OSError, ValueError):
+            return {}
+
+        stats = {}
+        for frame_entry in manifest["frames"].values():
+            if frame_entry is None:
+                continue
+            for entry in frame_entry["columns"]:
+                if "stats" in entry:
+                    stats[entry["key"]] = entry["stats"]
+        return stats
+
+    def column_stats(self, entry):
+        """Statistics cached in the manifest for a column entry, or None"""
+        stats = entry.get("stats")
+        if stats is None or not isinstance(stats.get("top_values"), list):
+            return stats
+        top_values = {}
+        for value, share, *kind in stats["top_values"]:
+            top_values[_typed_value(value, *kind)] = share
+        return {**stats, "top_values": top_values}
+
+    def read_manifest(self):
+        """Read and validate the project manifest"""
+        with open(os.path.join(self.path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("format") != FORMAT_NAME:
+            raise ValueError("Not a Datox project")
+        if manifest.get("version", 0) > FORMAT_VERSION:
+            raise ValueError(
+                "This project was saved by a newer version of Datox and cannot be opened."
+            )
+        return manifest
+
+    def open(self, mmap=True):
+        """Open every frame lazily; returns (frames, metadata) without reading columns"""
+        manifest = self.read_manifest()
+        frames = {
+            name: None if entry is None else LazyFrame(self, entry, mmap=mmap)
+            for name, entry in manifest["frames"].items()
+        }
+        return frames, manifest["metadata"]
+
+    def load(self, mmap=True, progress_callback=None, cancel_event=None):
+        """Load every frame; returns (frames, metadata)"""
+        manifest = self.read_manifest()
+
+        entries = manifest["frames"]
+        total = sum(len(e["columns"]) for e in entries.values() if e is not None)
+        done = 0
+        frames = {}
+
+        for name, frame_entry in entries.items():
+            if frame_entry is None:
+                frames[name] = None
+                continue
+
+            index = self.load_index(frame_entry, mmap=mmap)
+            series_list = []
+            for entry in frame_entry["columns"]:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise LoadCancelled("Loading was cancelled")
+
+                series_list.append(self.load_column(entry, index, mmap=mmap))
+
+                done += 1
+                if progress_callback is not None:
+                    progress_callback(done, total)
+
+            frames[name] = _assemble_frame(series_list, index)
+
+        return frames, manifest["metadata"]
+
+    def load_index(self, frame_entry, mmap=True, start=0, stop=None):
+        """Rebuild the row index of a frame, or of rows start:stop"""
+        entry = frame_entry["index"]
+        if entry["kind"] == "range":
+            index = pd.RangeIndex(entry["start"], entry["stop"], entry["step"])
+            return index[start:stop]
+        return pd.Index(
+            self._decode(entry, mmap, start, stop), name=entry.get("index_name")
+        )
+
+    def load_column(self, entry, index, mmap=True, start=0, stop=None):
+        """Rebuild a single column, or rows start:stop of it, as a Series"""
+        values = self._decode(entry, mmap, start, stop)
+        return pd.Series(values, index=index, name=entry["name"], copy=False)
+
+    def _save_index(self, index, compression):
+        """Store a row index, using a compact form for RangeIndex"""
+        if isinstance(index, pd.RangeIndex):
+            return {
+                "kind": "range",
+                "start": int(index.start),
+                "stop": int(index.stop),
+                "step": int(index.step),
+            }, 0
+
+        entry, did_write = self._save_series(pd.Series(index), compression)
+        entry["index_name"] = _json_name(index.name)
+        return entry, did_write
+
+    def _save_series(self, series, compression):
+        """Encode and write a column if its content is not already stored"""
+        kind, dtype, meta, parts = _encode_series(series)
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps([kind, dtype, meta, compression]).encode("utf-8"))
+        for part_name in sorted(parts):
+            digest.update(part_name.encode("utf-8"))
+            digest.update(_array_bytes(parts[part_name]))
+        key = digest.hexdigest()
+
+        entry = {
+            "kind": kind,
+            "dtype": dtype,
+            "meta": meta,
+            "key": key,
+            "parts": sorted(parts),
+            "compressed": compression is not None,
+        }
+
+        if self._exists(entry):
+            return entry, 0
+
+        if compression is None:
+            for part_name, array in parts.items():
+                self._write_atomic(
+                    self._part_path(key, part_name),
+                    lambda f, a=array: np.save(f, a, allow_pickle=kind == "pickle"),
+                )
+        elif compression == "zlib":
+            self._write_atomic(
+                os.path.join(self.columns_path, f"{key}.npz"),
+                lambda f: np.savez_compressed(f, **parts),
+            )
+        else:
+            raise ValueError(f"Unsupported compression: {compression}")
+
+        return entry, 1
+
+    def _decode(self, entry, mmap, start=0, stop=None):
+        """Read the parts of a stored column and decode rows start:stop"""
+        parts = self._read_parts(entry, mmap)
+        return _decode_parts(
+            entry["kind"], entry["dtype"], entry["meta"], parts, start, stop
+        )
+
+    def _read_parts(self, entry, mmap):
+        """Load the raw arrays of a stored column"""
+        key = entry["key"]
+        allow_pickle = entry["kind"] == "pickle"
+
+        if entry["compressed"]:
+            with np.load(
+                os.path.join(self.columns_path, f"{key}.npz"), allow_pickle=allow_pickle
+            ) as archive:
+                return {name: archive[name] for name in entry["parts"]}
+
+        mmap_mode = "c" if mmap and not allow_pickle else None
+        parts = {}
+        for name in entry["parts"]:
+            array = np.load(
+                self._part_path(key, name),
+                mmap_mode=mmap_mode,
+                allow_pickle=allow_pickle,
+            )
+            # Plain ndarray view over the mapping, so pandas never sees np.memmap
+            parts[name] = array.view(np.ndarray)
+        return parts
+
+    def _part_path(self, key, part_name):
+        """Path of one uncompressed column part"""
+        return os.path.join(self.columns_path, f"{key}.{part_name}.npy")
+
+    def _entry_files(self, entry):
+        """File names used by a manifest entry"""
+        if entry["compressed"]:
+            return [f"{entry['key']}.npz"]
+        return [f"{entry['key']}.{name}.npy" for name in entry["parts"]]
+
+    def _exists(self, entry):
+        """Check whether all files of an entry are already on disk"""
+        return all(
+            os.path.exists(os.path.join(self.columns_path, name))
+            for name in self._entry_files(entry)
+        )
+
+    def _write_atomic(self, path, writer):
+        """Write a file through a temporary name so readers never see partial data"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            writer(f)
+        os.replace(tmp_path, path)
+
+    def _write_manifest(self, manifest):
+        """Write the manifest last so an interrupted save keeps the old project"""
+        path = os.path.join(self.path, MANIFEST_NAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, default=_json_default)
+        os.replace(tmp_path, path)
+
+    def frame_files(self, frame_entry):
+        """File names used by a frame entry's index and columns"""
+        entries = list(frame_entry["columns"])
+        if frame_entry["index"]["kind"] != "range":
+            entries.append(frame_entry["index"])
+        return [name for entry in entries for name in self._entry_files(entry)]
+
+    def remove_files_except(self, frame_entries):
+        """Delete column files that none of the frame entries uses"""
+        referenced = set()
+        for frame_entry in frame_entries:
+            if frame_entry is not None:
+                referenced.update(self.frame_files(frame_entry))
+
+        for name in os.listdir(self.columns_path):
+            if name not in referenced:
+                try:
+                    os.remove(os.path.join(self.columns_path, name))
+                except OSError:
+                    # Still memory-mapped on Windows; removed on a later save
+                    pass
+
+    def _remove_unreferenced(self, manifest):
+        """Delete column files no longer referenced by the manifest"""
+        self.remove_files_except(manifest["frames"].values())
+
+
+def _frame_column(df, position):
+    """Column at a position of a DataFrame or of an out-of-core dataset"""
+    if isinstance(df, pd.DataFrame):
+        return df.iloc[:, position]
+    # ChunkedDataset and similar frames are written one column at a time
+    return df.column(df.columns[position])
+
+
+def _encode_series(series):
+    """Split a Series into (kind, dtype, meta, parts) with numpy array parts"""
+    dtype = series.dtype
+    dtype_name = str(dtype)
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = dtype.categories
+        meta = {
+            "ordered": bool(dtype.ordered),
+            "categories": _to_json_list(categories.to_numpy()),
+            "categories_dtype": str(categories.dtype),
+        }
+        return "category", dtype_name, meta, {"codes": series.cat.codes.to_numpy()}
+
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        values = series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+        return "datetimetz", dtype_name, {"tz": str(dtype.tz)}, {"values": values}
+
+    if isinstance(dtype, pd.StringDtype):
+        return "string", dtype_name, {"storage": dtype.storage}, _encode_strings(series)
+
+    if dtype == object and pd.api.types.infer_dtype(series, skipna=True) in (
+        "string",
+        "empty",
+    ):
+        return "string", dtype_name, {}, _encode_strings(series)
+
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        return "numpy", dtype_name, {}, {"values": series.to_numpy()}
+
+    if isinstance(series.array, _MASKED_ARRAYS):
+        mask = series.isna().to_numpy()
+        values = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+        return "masked", dtype_name, {}, {"values": values, "mask": mask}
+
+    values = np.empty(len(series), dtype=object)
+    values[:] = series.to_numpy(dtype=object)
+    return "pickle", dtype_name, {}, {"values": values}
+
+
+def _encode_strings(series):
+    """Encode a string column as UTF-8 bytes, byte offsets and a missing mask"""
+    mask = series.isna().to_numpy()
+    filled = series.astype(object).where(~mask, "")
+    encoded = filled.str.encode("utf-8")
+
+    offsets = np.zeros(len(series) + 1, dtype=np.int64)
+    np.cumsum(encoded.str.len().to_numpy(dtype=np.int64), out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded.to_numpy()), dtype=np.uint8)
+
+    return {"data": data, "offsets": offsets, "mask": mask}
+
+
+def decode_strings(data, offsets, mask, start=0, stop=None):
+    """Decode rows start:stop of an encoded string column to an object array"""
+    if stop is None:
+        stop = len(offsets) - 1
+
+    base = int(offsets[start])
+    end = int(offsets[stop])
+    raw = data[base:end].tobytes()
+    text = raw.decode("utf-8")
+
+    bounds = offsets[start : stop + 1] - base
+    values = np.empty(stop - start, dtype=object)
+    if len(text) == len(raw):
+        # Pure ASCII: byte offsets are character offsets
+        values[:] = [text[a:b] for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+    else:
+        values[:] = [
+            raw[a:b].decode("utf-8")
+            for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+        ]
+
+    missing = np.asarray(mask[start:stop])
+    if missing.any():
+        values[missing] = np.nan
+    return values
+
+
+def _decode_parts(kind, dtype, meta, parts, start=0, stop=None):
+    """Turn stored parts for rows start:stop back into array-like column values"""
+    rows = slice(start, stop)
+
+    if kind == "string":
+        values = decode_strings(
+            parts["data"], parts["offsets"], parts["mask"], start, stop
+        )
+        if "storage" in meta:
+            return pd.array(values, dtype=pd.StringDtype(meta["storage"]))
+        return values
+
+    if kind == "category":
+        categories = pd.Index(meta["categories"])
+        if str(categories.dtype) != meta["categories_dtype"]:
+            categories = categories.astype(meta["categories_dtype"])
+        return pd.Categorical.from_codes(
+            np.asarray(parts["codes"][rows]),
+            categories=categories,
+            ordered=meta["ordered"],
+        )
+
+    if kind == "datetimetz":
+        return (
+            pd.DatetimeIndex(np.asarray(parts["values"][rows]))
+            .tz_localize("UTC")
+            .tz_convert(meta["tz"])
+        )
+
+    if kind == "masked":
+        array_type = pd.api.types.pandas_dtype(dtype).construct_array_type()
+        return array_type(
+            np.array(parts["values"][rows]), np.array(parts["mask"][rows])
+        )
+
+    return parts["values"][rows]
+
+
+def _assemble_frame(series_list, index):
+    """Combine columns into a DataFrame without copying their buffers"""
+    if not series_list:
+        return pd.DataFrame(index=index)
+    return pd.concat(series_list, axis=1, copy=False)
+
+
+def _to_json_list(array):
+    """Convert a small array to a JSON-friendly list"""
+    if array.dtype == object:
+        return [None if pd.isna(v) else v for v in array.tolist()]
+    if array.dtype.kind in "mM":
+        return [str(v) for v in array]
+    return array.tolist()
+
+
+def _array_bytes(array):
+    """Contiguous bytes of an array for hashing"""
+    if array.dtype == object:
+        return pickle.dumps(array, protocol=pickle.HIGHEST_PROTOCOL)
+    return np.ascontiguousarray(array).view(np.uint8)
+
+
+def _json_name(name):
+    """Make a column or index name storable in JSON"""
+    if name is None or isinstance(name, (str, int, float, bool)):
+        return name
+    if isinstance(name, np.generic):
+        return name.item()
+    return str(name)
+
+
+def _json_stats(stats):
+    """Column statistics with the top values as [value, share] pairs
+
+    JSON keys are always text, so the values are stored in a list instead,
+    followed by their type when JSON has none for it (see _json_value).
+    """
+    top_values = stats.get("top_values")
+    if top_values is None:
+        return stats
+    pairs = []
+    for value, share in top_values.items():
+        value, kind = _json_value(value)
+        pairs.append([value, share] if kind is None else [value, share, kind])
+    return {**stats, "top_values": pairs}
+
+
+def _json_value(value):
+    """(JSON value, type name or None) of a value, as read back by _typed_value"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value, None
+    if isinstance(value, datetime.datetime):
+        return pd.Timestamp(value).isoformat(), "datetime"
+    if isinstance(value, datetime.date):
+        return value.isoformat(), "date"
+    if isinstance(value, datetime.timedelta):
+        return str(pd.Timedelta(value)), "timedelta"
+    return str(value), "text"
+
+
+def _typed_value(value, kind=None):
+    """Restore a value stored by _json_value"""
+    if kind == "datetime":
+        return pd.Timestamp(value)
+    if kind == "date":
+        return datetime.date.fromisoformat(value)
+    if kind == "timedelta":
+        return pd.Timedelta(value)
+    return value
+
+
+def _json_default(value):
+    """JSON fallback for numpy scalars and other values in metadata"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
@@ -0,0 +1,293 @@
+"""
+Sketches - Mergeable summaries of large columns with bounded memory
+"""
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_QUANTILE_ERROR = 0.01
+DEFAULT_HLL_PRECISION = 14
+DEFAULT_HEAVY_HITTERS = 1000
+
+# Compactor size per unit of rank error; measured to keep the normalized
+# rank error below the requested bound
+_K_PER_ERROR = 2.5
+_BLOCK_SIZE = 1 << 16
+
+
+class KLLSketch:
+    """Quantile sketch of Karnin, Lang and Liberty
+
+    Values are kept in levels of sorted compactors; an item at level h
+    stands for 2**h input values. When a level grows past its capacity it
+    is sorted and every other item (from a random offset) moves up a level,
+    so memory stays around 3k items for any input size. The rank of a
+    returned quantile is within about `error` times the count of the exact
+    one. Sketches built on separate chunks or in separate processes can be
+    merged.
+    """
+
+    def __init__(self, error=DEFAULT_QUANTILE_ERROR, seed=0):
+        self.error = error
+        self.k = max(int(np.ceil(_K_PER_ERROR / error)), 8)
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.total = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_values(cls, values, error=DEFAULT_QUANTILE_ERROR, seed=0):
+        """Sketch of an array of values (NaN is ignored)"""
+        sketch = cls(error, seed)
+        sketch.update(values)
+        return sketch
+
+    def update(self, values):
+        """Add a block of values, ignoring NaN"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+
+        low, high = values.min(), values.max()
+        self.min = low if not self.count else min(self.min, low)
+        self.max = high if not self.count else max(self.max, high)
+        self.count += len(values)
+        self.total += float(values.sum())
+
+        # Small blocks keep each compaction sort short
+        for start in range(0, len(values), _BLOCK_SIZE):
+            block = values[start : start + _BLOCK_SIZE]
+            self.levels[0] = np.concatenate([self.levels[0], block])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Add the contents of another sketch with the same error bound"""
+        if other.k != self.k:
+            raise ValueError("Only sketches with the same error bound can be merged")
+        if not other.count:
+            return self
+
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = other.max if not self.count else max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+
+    @property
+    def mean(self):
+        """Exact mean of the values added"""
+        return self.total / self.count if self.count else np.nan
+
+    def quantile(self, q):
+        """Approximate q-quantile"""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        """Approximate quantiles for a list of fractions"""
+        if not self.count:
+            return [np.nan] * len(qs)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(items), 2**level) for level, items in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+
+        result = []
+        for q in qs:
+            if q <= 0:
+                result.append(float(self.min))
+            elif q >= 1:
+                result.append(float(self.max))
+            else:
+                position = np.searchsorted(cumulative, q * self.count, side="right")
+                result.append(float(items[min(position, len(items) - 1)]))
+        return result
+
+    def _capacity(self, level):
+        """Items a level may hold; lower levels get geometrically less room"""
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        """Compact levels until every level is within its capacity"""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item out stays behind so the total weight is unchanged
+            keep = items[len(items) - len(items) % 2 :]
+            pairs = items[: len(items) - len(items) % 2]
+            promoted = pairs[self._rng.integers(2) :: 2]
+
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Capacities shrink when a level is added, so start over
+            level = 0
+
+
+def box_stats(sketch, label):
+    """Box plot statistics for matplotlib's Axes.bxp from a quantile sketch
+
+    Whiskers are clipped to 1.5 IQR as in a regular box plot; individual
+    outliers are not kept by the sketch and are not drawn.
+    """
+    q1, median, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    notch = 1.57 * iqr / np.sqrt(sketch.count) if sketch.count else 0.0
+    return {
+        "label": label,
+        "mean": sketch.mean,
+        "med": median,
+        "q1": q1,
+        "q3": q3,
+        "whislo": max(sketch.min, q1 - 1.5 * iqr),
+        "whishi": min(sketch.max, q3 + 1.5 * iqr),
+        "cilo": median - notch,
+        "cihi": median + notch,
+        "fliers": [],
+    }
+
+
+class HyperLogLog:
+    """Distinct count estimate of Flajolet et al. with 2**precision registers
+
+    Each value is hashed to 64 bits; the first `precision` bits choose a
+    register, which keeps the longest run of leading zeros seen in the
+    remaining bits. The standard error is about 1.04 / sqrt(2**precision),
+    0.8% at the default precision, for 16 KB of registers. Sketches with the
+    same precision merge by taking the larger register.
+    """
+
+    def __init__(self, precision=DEFAULT_HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        """Add the non-missing values of a Series"""
+        hashes = pd.util.hash_pandas_object(values.dropna(), index=False).to_numpy()
+        if not len(hashes):
+            return self
+
+        tail_bits = 64 - self.precision
+        registers = (hashes >> np.uint64(tail_bits)).astype(np.intp)
+        tails = hashes & np.uint64((1 << tail_bits) - 1)
+        # frexp gives the bit length exactly, as tails have at most 53 bits
+        _, bit_lengths = np.frexp(tails.astype(np.float64))
+        ranks = (tail_bits - bit_lengths + 1).astype(np.uint8)
+        np.maximum.at(self.registers, registers, ranks)
+        return self
+
+    def merge(self, other):
+        """Add the values counted by another sketch with the same precision"""
+        if other.precision != self.precision:
+            raise ValueError("Only sketches with the same precision can be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """Approximate number of distinct values added"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and empty:
+            # Linear counting is more accurate while many registers are empty
+            return int(round(m * np.log(m / empty)))
+        return int(round(raw))
+
+
+class HeavyHitters:
+    """Most frequent values, from the mergeable Misra-Gries summary
+
+    At most `capacity` counters are kept. When a block of value counts
+    pushes the number of counters over capacity, the (capacity + 1)-th
+    largest count is subtracted from every counter and those that drop to
+    zero are removed. A reported count is at most `error` below the true
+    count, and error never exceeds total / (capacity + 1), so every value
+    with a larger share than that is kept.
+    """
+
+    def __init__(self, capacity=DEFAULT_HEAVY_HITTERS):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.total = 0
+        self.error = 0
+
+    def update(self, values):
+        """Add the non-missing values of a Series"""
+        return self.add_counts(values.value_counts())
+
+    def add_counts(self, counts):
+        """Add a Series of counts indexed by value, such as Series.value_counts"""
+        if isinstance(counts.index, pd.CategoricalIndex):
+            counts = counts[counts > 0]
+            counts.index = counts.index.astype(object)
+        self.total += int(counts.sum())
+        self._add(counts)
+        return self
+
+    def merge(self, other):
+        """Add the values counted by another summary"""
+        self.total += other.total
+        self.error += other.error
+        self._add(other.counts)
+        return self
+
+    def top(self, n):
+        """Estimated counts of the n most frequent values, largest first"""
+        return self.counts.head(n)
+
+    def _add(self, counts):
+        """Merge a Series of counts into the counters"""
+        # Summarizing the block on its own first keeps the merge small
+        counts = self._reduce(counts)
+        if len(self.counts):
+            counts = self._reduce(self.counts.add(counts, fill_value=0))
+        self.counts = counts.astype(np.int64)
+
+    def _reduce(self, counts):
+        """Counts sorted largest first and cut down to capacity"""
+        if not counts.is_monotonic_decreasing:
+            counts = counts.sort_values(ascending=False, kind="stable")
+        if len(counts) > self.capacity:
+            cut = counts.iloc[self.capacity]
+            counts = counts.iloc[: self.capacity] - cut
+            counts = counts[counts > 0]
+            self.error += int(cut)
+        return counts
+
+
+def category_sketches(
+    parts, precision=DEFAULT_HLL_PRECISION, capacity=DEFAULT_HEAVY_HITTERS
+):
+    """(HyperLogLog, HeavyHitters) of a column given as an iterable of Series
+
+    Each part is counted once; only its distinct values are hashed.
+    """
+    distinct = HyperLogLog(precision)
+    frequent = HeavyHitters(capacity)
+    for part in parts:
+        counts = part.value_counts()
+        distinct.update(counts.index.to_series())
+        frequent.add_counts(counts)
+    return distinct, frequent
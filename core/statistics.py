@@ -0,0 +1,139 @@
+"""
+Statistics - Text reports of the statistics panel
+
+The reports are computed from a DataManager without Tk, so they can be run
+and timed headless. Input the tests cannot use, such as a text column for
+a t-test, is explained in the report rather than raised.
+"""
+
+import pandas as pd
+from scipy import stats
+
+
+MAX_VALUE_COUNTS = 20
+ALPHA = 0.05
+
+
+def describe_column(data_manager, column):
+    """Descriptive statistics of a column; value counts for non-numeric ones"""
+    lines = [f"Descriptive Statistics for '{column}':\n"]
+
+    # Shared with the other panels and kept until the column changes
+    column_stats = data_manager.get_column_stats(column)
+    if pd.api.types.is_numeric_dtype(data_manager.get_dtype(column)):
+        lines += [
+            f"Count: {column_stats['count'] - column_stats['missing']}",
+            f"Mean: {column_stats['mean']:.4f}",
+            f"Std Dev: {column_stats['std']:.4f}",
+            f"Min: {column_stats['min']:.4f}",
+            f"25%: {column_stats['25%']:.4f}",
+            f"Median: {column_stats['50%']:.4f}",
+            f"75%: {column_stats['75%']:.4f}",
+            f"Max: {column_stats['max']:.4f}",
+            "",
+            f"Skewness: {column_stats['skew']:.4f}",
+            f"Kurtosis: {column_stats['kurtosis']:.4f}",
+            f"Missing values: {column_stats['missing']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    approximate = data_manager.use_approximate_statistics()
+    value_counts = data_manager.get_top_values(column, MAX_VALUE_COUNTS)
+    unique = f"~{column_stats['unique']}" if approximate else column_stats["unique"]
+    if approximate:
+        heading = f"Most frequent {len(value_counts)} (estimated)"
+    elif len(value_counts) < column_stats["unique"]:
+        heading = f"Most frequent {len(value_counts)} values"
+    else:
+        heading = "Value Counts"
+    lines += [
+        f"Total count: {column_stats['count']}",
+        f"Unique values: {unique}",
+        f"Missing values: {column_stats['missing']}",
+        "",
+        f"{heading}:",
+    ]
+
+    total = column_stats["count"] - column_stats["missing"]
+    for value, count in value_counts.items():
+        lines.append(f"{value}: {count} ({100 * count / total:.2f}%)")
+    return "\n".join(lines) + "\n"
+
+
+def correlation_report(data_manager):
+    """Correlation matrix of the numeric columns, as a fixed-width table"""
+    if not data_manager.get_numeric_columns():
+        return "No numeric columns found for correlation analysis."
+
+    corr_matrix = data_manager.correlation()
+    header = "".join(f"{col[:10]:>10} " for col in corr_matrix.columns)
+    lines = ["Correlation Matrix:", "", "           " + header]
+    for name, row in zip(corr_matrix.index, corr_matrix.to_numpy()):
+        values = "".join(f"{value:>10.4f} " for value in row)
+        lines.append(f"{name[:10]:<10} {values}")
+    return "\n".join(lines) + "\n"
+
+
+def hypothesis_test(data_manager, col1, col2, test_type):
+    """Result of a t-test, ANOVA or chi-square test between two columns
+
+    The t-test compares the means of the two numeric columns, ANOVA the
+    means of col1 in each group of col2, and chi-square the independence
+    of the two columns.
+    """
+    text = f"Hypothesis Test: {test_type}\nBetween '{col1}' and '{col2}'\n\n"
+    df = data_manager.get_frame(list(dict.fromkeys([col1, col2])))
+
+    if test_type == "ttest":
+        if not pd.api.types.is_numeric_dtype(
+            df[col1]
+        ) or not pd.api.types.is_numeric_dtype(df[col2]):
+            return text + "T-test requires numeric data for both columns."
+
+        result = stats.ttest_ind(
+            df[col1].dropna(), df[col2].dropna(), nan_policy="omit"
+        )
+        text += f"t-statistic: {result.statistic:.4f}\n"
+        text += f"p-value: {result.pvalue:.4f}\n\n"
+        return text + _conclusion(
+            result.pvalue,
+            "There is a significant difference between the means.",
+            "There is not a significant difference between the means.",
+        )
+
+    if test_type == "chi2":
+        contingency = pd.crosstab(df[col1], df[col2])
+        chi2, p, dof, expected = stats.chi2_contingency(contingency)
+        text += f"Chi-square statistic: {chi2:.4f}\n"
+        text += f"p-value: {p:.4f}\n"
+        text += f"Degrees of freedom: {dof}\n\n"
+        return text + _conclusion(
+            p,
+            "There is a significant relationship between the variables.",
+            "There is not a significant relationship between the variables.",
+        )
+
+    if test_type == "anova":
+        if not pd.api.types.is_numeric_dtype(df[col1]):
+            return text + "ANOVA requires a numeric column for the first selection."
+
+        present = df.dropna(subset=[col1])
+        groups = [values.to_numpy() for _, values in present.groupby(col2)[col1]]
+        result = stats.f_oneway(*groups)
+        text += f"F-statistic: {result.statistic:.4f}\n"
+        text += f"p-value: {result.pvalue:.4f}\n\n"
+        return text + _conclusion(
+            result.pvalue,
+            "There are significant differences between group means.",
+            "There are not significant differences between group means.",
+        )
+
+    return text
+
+
+def _conclusion(p_value, significant, not_significant):
+    """Whether the null hypothesis is rejected at ALPHA, with the finding"""
+    text = f"At significance level {ALPHA}:\n"
+    if p_value < ALPHA:
+        return text + f"Reject null hypothesis. {significant}\n"
+    return text + f"Fail to reject null hypothesis. {not_significant}\n"
@@ -0,0 +1,64 @@
+"""
+StatsCache - Column statistics cached by column and data version
+"""
+
+
+class StatsCache:
+    """Per-column results cached under (column, version, kind)
+
+    Every column has a version number. DataManager bumps it for the
+    columns an operation changes (touch) and for every column when rows
+    are added or removed (touch_all), so results for unchanged columns
+    survive other operations. Results for old versions are dropped when
+    the version is bumped.
+    """
+
+    def __init__(self):
+        self._counter = 0
+        self._generation = 0
+        self._versions = {}
+        self._entries = {}
+
+    def version(self, column):
+        """Current version of a column"""
+        return self._versions.get(column, self._generation)
+
+    def get(self, column, compute, kind="stats"):
+        """Cached result for a column, calling compute() if there is none"""
+        key = (column, self.version(column), kind)
+        if key not in self._entries:
+            self._entries[key] = compute()
+        return self._entries[key]
+
+    def peek(self, column, kind="stats"):
+        """Cached result for the current version of a column, or None"""
+        return self._entries.get((column, self.version(column), kind))
+
+    def put(self, column, version, value, kind="stats"):
+        """Store a result computed elsewhere for a version of a column
+
+        A result for a version that is no longer current is never returned,
+        so results computed while the column changed are harmless.
+        """
+        if version == self.version(column):
+            self._entries[(column, version, kind)] = value
+
+    def touch(self, columns):
+        """Give the columns a new version, discarding their cached results"""
+        touched = set(columns)
+        if not touched:
+            return
+
+        self._counter += 1
+        for column in touched:
+            self._versions[column] = self._counter
+        self._entries = {
+            key: value for key, value in self._entries.items() if key[0] not in touched
+        }
+
+    def touch_all(self):
+        """Give every column a new version and discard all cached results"""
+        self._counter += 1
+        self._generation = self._counter
+        self._versions.clear()
+        self._entries.clear()
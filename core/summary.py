@@ -0,0 +1,207 @@
+"""
+Summary - One-pass numeric summaries that can be merged across chunks
+"""
+
+import numpy as np
+
+
+QUARTILES = (0.25, 0.5, 0.75)
+
+
+class NumericSummary:
+    """Count, missing count, min, max and the first four moments of numeric values
+
+    Values are added block by block and merged with the pairwise update
+    formulas of Chan et al. and Pébay, so a column read in chunks gives the
+    same results as the whole column at once. std, skew and kurtosis use
+    the same bias corrections as pandas.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def add(self, values):
+        """Add a block of values, counting NaN as missing"""
+        values = np.asarray(values, dtype=np.float64)
+        present = values[~np.isnan(values)]
+        self.add_present(present, missing=len(values) - len(present))
+        return present
+
+    def add_present(self, present, missing=0):
+        """Add a block of non-missing float values"""
+        self.missing += missing
+        n_b = len(present)
+        if not n_b:
+            return
+
+        mean_b = present.mean()
+        deviations = present - mean_b
+        squared = deviations * deviations
+        m2_b = squared.sum()
+        m3_b = (squared * deviations).sum()
+        m4_b = (squared * squared).sum()
+
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        m2_a, m3_a = self.m2, self.m3
+
+        self.m4 += (
+            m4_b
+            + delta**4 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b) / n**3
+            + 6 * delta**2 * (n_a * n_a * m2_b + n_b * n_b * m2_a) / n**2
+            + 4 * delta * (n_a * m3_b - n_b * m3_a) / n
+        )
+        self.m3 += (
+            m3_b
+            + delta**3 * n_a * n_b * (n_a - n_b) / n**2
+            + 3 * delta * (n_a * m2_b - n_b * m2_a) / n
+        )
+        self.m2 += m2_b + delta**2 * n_a * n_b / n
+        self.mean += delta * n_b / n
+        self.count = n
+
+        low, high = present.min(), present.max()
+        self.min = low if n_a == 0 else min(self.min, low)
+        self.max = high if n_a == 0 else max(self.max, high)
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1)"""
+        if self.count < 2:
+            return np.nan
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+    @property
+    def skew(self):
+        """Bias-corrected skewness, matching Series.skew"""
+        n = self.count
+        if n < 3:
+            return np.nan
+        m2 = _zero_out_rounding(self.m2)
+        m3 = _zero_out_rounding(self.m3)
+        if m2 == 0:
+            return 0.0
+        return float(n * (n - 1) ** 0.5 / (n - 2) * (m3 / m2**1.5))
+
+    @property
+    def kurtosis(self):
+        """Bias-corrected excess kurtosis, matching Series.kurtosis"""
+        n = self.count
+        if n < 4:
+            return np.nan
+        m2 = _zero_out_rounding(self.m2)
+        m4 = _zero_out_rounding(self.m4)
+        denominator = (n - 2) * (n - 3) * m2**2
+        if denominator == 0:
+            return 0.0
+        adjustment = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        return float(n * (n + 1) * (n - 1) * m4 / denominator - adjustment)
+
+    def stats(self, quartiles):
+        """Statistics in the format of DataManager.get_column_stats
+
+        quartiles are the (25%, 50%, 75%) quantiles of the values added,
+        exact or from a sketch.
+        """
+        q1, median, q3 = quartiles
+        return {
+            "count": self.count + self.missing,
+            "missing": self.missing,
+            "mean": self.mean if self.count else np.nan,
+            "median": median,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+            "skew": self.skew,
+            "kurtosis": self.kurtosis,
+            "25%": q1,
+            "50%": median,
+            "75%": q3,
+        }
+
+
+def summarize(values, count_unique=False):
+    """get_column_stats numeric statistics of an array of floats (NaN = missing)
+
+    Moments come from one sweep and quartiles from one partial sort. With
+    count_unique the values are fully sorted once instead, which also gives
+    the number of distinct values and is much cheaper than hashing them.
+    """
+    summary = NumericSummary()
+    present = summary.add(values)
+    if not count_unique:
+        return summary.stats(quantiles(present, QUARTILES))
+
+    ordered = np.sort(present)
+    stats = summary.stats(quantiles(ordered, QUARTILES, is_sorted=True))
+    stats["unique"] = _distinct_sorted(ordered)
+    return stats
+
+
+def summarize_integers(present, missing=0):
+    """summarize(values, count_unique=True) of an array of non-missing integers
+
+    float64 rounds integers beyond 2**53, so the values are sorted as
+    integers and min, max and the distinct count come from them. Only the
+    moments and quartiles use floats.
+    """
+    ordered = np.sort(present)
+    as_float = ordered.astype(np.float64)
+    summary = NumericSummary()
+    summary.add_present(as_float, missing)
+    stats = summary.stats(quantiles(as_float, QUARTILES, is_sorted=True))
+    if len(ordered):
+        stats["min"] = int(ordered[0])
+        stats["max"] = int(ordered[-1])
+    stats["unique"] = _distinct_sorted(ordered)
+    return stats
+
+
+def _distinct_sorted(ordered):
+    """Number of distinct values in a sorted array"""
+    if not len(ordered):
+        return 0
+    return int(np.count_nonzero(ordered[1:] != ordered[:-1])) + 1
+
+
+def quantiles(values, q, is_sorted=False):
+    """Linearly interpolated quantiles of non-missing values, as numpy.quantile gives
+
+    Only the order statistics around each quantile are needed, so one
+    np.partition call replaces a full sort.
+    """
+    n = len(values)
+    if not n:
+        return [np.nan] * len(q)
+
+    positions = np.asarray(q, dtype=np.float64) * (n - 1)
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, n - 1)
+    if is_sorted:
+        ordered = values
+    else:
+        ordered = np.partition(values, np.unique(np.concatenate([lower, upper])))
+
+    below, above = ordered[lower], ordered[upper]
+    fraction = positions - lower
+    difference = above - below
+    # Same two-sided interpolation as numpy, for identical results
+    result = np.where(
+        fraction >= 0.5,
+        above - difference * (1 - fraction),
+        below + difference * fraction,
+    )
+    return [float(value) for value in result]
+
+
+def _zero_out_rounding(value):
+    """Treat moment sums at rounding-error level as zero, as pandas does"""
+    return 0.0 if abs(value) < 1e-14 else value
@@ -0,0 +1,78 @@
+"""
+BackgroundTask - Runs long operations on a worker thread
+"""
+
+import threading
+
+
+class BackgroundTask:
+    """Runs a callable on a worker thread and exposes its state for polling
+
+    The target is called with progress_callback and cancel_event keyword
+    arguments. The UI polls progress, done, result and error from the Tk
+    main thread (for example with root.after) instead of touching widgets
+    from the worker.
+    """
+
+    def __init__(self, target, *args, **kwargs):
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+
+        self.cancel_event = threading.Event()
+        self.result = None
+        self.error = None
+
+        self._lock = threading.Lock()
+        self._progress = (0, 0)
+        self._done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        """Worker thread body"""
+        try:
+            self.result = self.target(
+                *self.args,
+                progress_callback=self.report_progress,
+                cancel_event=self.cancel_event,
+                **self.kwargs,
+            )
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+    def report_progress(self, completed, total):
+        """Record progress from the worker thread"""
+        with self._lock:
+            self._progress = (completed, total)
+
+    @property
+    def progress(self):
+        """Latest (completed, total) pair reported by the worker"""
+        with self._lock:
+            return self._progress
+
+    @property
+    def done(self):
+        """Whether the worker has finished, successfully or not"""
+        return self._done.is_set()
+
+    @property
+    def cancelled(self):
+        """Whether cancellation has been requested"""
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """Ask the worker to stop at its next cancellation point"""
+        self.cancel_event.set()
+
+    def wait(self, timeout=None):
+        """Block until the worker finishes"""
+        return self._done.wait(timeout)
@@ -7,18 +7,21 @@ import tkinter as tk
 from tkinter import ttk
 import os
 import sys
-import traceback
-import pandas as pd
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-try:
-    print("Attempting to import AppWindow...")
-    from ui.app_window import AppWindow
+from core.instrumentation import Instrumentation, logger, setup_logging
+
+# Created first, so startup phases are timed from here
+instrumentation = Instrumentation(setup_logging())
 
-    print("Successfully imported AppWindow")
-except ImportError as e:
-    print(f"Error importing AppWindow: {e}")
+try:
+    with instrumentation.phase("import pandas"):
+        import pandas as pd
+    with instrumentation.phase("import AppWindow"):
+        from ui.app_window import AppWindow
+except ImportError:
+    logger.exception("Error importing AppWindow")
     input("Press Enter to exit...")
     sys.exit(1)
 
@@ -26,30 +29,31 @@ except ImportError as e:
 def main():
     """Main function to start the application"""
     try:
-        print("Starting application...")
-        root = tk.Tk()
-        root.title("Datox - No-Code Data Science Platform")
-        root.geometry("1200x800")
+        logger.info("Starting application")
+        with instrumentation.phase("set up Tk"):
+            root = tk.Tk()
+            root.title("Datox - No-Code Data Science Platform")
+            root.geometry("1200x800")
+
+            style = ttk.Style()
+            style.theme_use("clam")
 
-        style = ttk.Style()
-        style.theme_use("clam")  
+            default_font = tk.font.nametofont("TkDefaultFont")
+            default_font.configure(size=10)
 
-        default_font = tk.font.nametofont("TkDefaultFont")
-        default_font.configure(size=10)
-        
         pd.set_option("display.max_rows", 500)
         pd.set_option("display.max_columns", 50)
         pd.set_option("display.width", 1000)
 
-        print("Creating AppWindow instance...")
-        app = AppWindow(root)
-        print("AppWindow created successfully")
+        with instrumentation.phase("build AppWindow"):
+            AppWindow(root, instrumentation)
+        with instrumentation.phase("draw window"):
+            root.update_idletasks()
 
-        print("Entering main loop...")
+        logger.info("Entering main loop")
         root.mainloop()
-    except Exception as e:
-        print(f"Error in main: {e}")
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error in main")
         input("Press Enter to exit...")
 
 
@@ -0,0 +1,146 @@
+import logging
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from core import chunked_dataset
+from core.chunked_dataset import ChunkedDataset, evict_cache
+from core.data_manager import DataManager
+
+
+def write_csv(path, rows=100):
+    frame = pd.DataFrame(
+        {"a": np.where(np.arange(rows) % 7 == 0, np.nan, np.arange(rows) * 1.0)}
+    )
+    frame["b"] = np.arange(rows) % 5
+    frame.to_csv(path, index=False)
+    return frame
+
+
+def open_dataset(tmp_path, name="data.csv"):
+    path = str(tmp_path / name)
+    frame = write_csv(path)
+    cache = tmp_path / "cache"
+    dataset = ChunkedDataset.from_csv(path, cache_root=str(cache), chunksize=30)
+    return path, frame, dataset
+
+
+def column_files(dataset):
+    return set(os.listdir(dataset.store.columns_path))
+
+
+def test_reads_like_the_csv(tmp_path):
+    _, frame, dataset = open_dataset(tmp_path)
+
+    assert dataset.shape == frame.shape
+    pd.testing.assert_frame_equal(dataset.to_pandas(), frame)
+    pd.testing.assert_frame_equal(dataset.rows(25, 35), frame.iloc[25:35])
+
+
+def test_superseded_files_are_removed_once_no_step_uses_them(tmp_path):
+    path, frame, dataset = open_dataset(tmp_path)
+    manager = DataManager()
+    manager.set_dataset(path, dataset)
+    original = column_files(dataset)
+
+    manager.clean_missing_values("a", "value", 0)
+    filled = manager._current_frame()
+    manager.undo()
+    assert filled.files_exist()
+
+    # A new step drops the redo step, and with it the filled column files
+    manager.clean_missing_values("a", "value", 1)
+    assert not filled.files_exist()
+    assert original <= column_files(dataset)
+    assert manager.get_column("a").isna().sum() == 0
+
+    manager.undo()
+    pd.testing.assert_frame_equal(manager.get_frame(["a", "b"]), frame)
+
+
+def test_undo_of_a_removed_dataset_fails_without_changing_state(tmp_path):
+    path, _, dataset = open_dataset(tmp_path)
+    manager = DataManager()
+    manager.set_dataset(path, dataset)
+    manager.clean_missing_values("a", "drop")
+    removed = manager._current_frame()
+
+    manager.undo()
+    # As when a saved project's redo step refers to files removed since
+    removed.store.remove_files_except(dataset.chunks)
+    assert not removed.files_exist()
+
+    with pytest.raises(ValueError):
+        manager.redo()
+    assert manager._current_frame() is dataset
+    assert manager.can_redo()
+
+
+def test_evict_cache_removes_old_versions_and_least_recently_used(tmp_path):
+    path, _, old = open_dataset(tmp_path)
+    other_path, _, other = open_dataset(tmp_path, "other.csv")
+    unused_path, _, unused = open_dataset(tmp_path, "unused.csv")
+    os.utime(unused.store.path, (0, 0))
+    os.utime(os.path.join(unused.store.path, "manifest.json"), (0, 0))
+
+    write_csv(path, rows=120)
+    new = ChunkedDataset.from_csv(
+        path, cache_root=str(tmp_path / "cache"), chunksize=30
+    )
+    assert new.store.path != old.store.path
+
+    removed = evict_cache(new.store.path)
+    assert sorted(removed) == sorted([old.store.path, unused.store.path])
+    assert os.path.isdir(other.store.path)
+
+    assert evict_cache(new.store.path, limit_bytes=0) == [other.store.path]
+    assert os.path.isdir(new.store.path)
+
+
+def test_cancelled_conversion_leaves_no_cache_entry(tmp_path):
+    path = str(tmp_path / "data.csv")
+    write_csv(path)
+    cache = tmp_path / "cache"
+
+    calls = []
+
+    def cancel(done, total):
+        # Stop after the first chunk has been written
+        calls.append(done)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        ChunkedDataset.from_csv(
+            path, cache_root=str(cache), chunksize=30, progress_callback=cancel
+        )
+    assert os.listdir(cache) == []
+
+
+def test_integer_range_is_exact_beyond_float_precision(tmp_path):
+    path = str(tmp_path / "big.csv")
+    big = 2**53
+    pd.DataFrame({"id": [big + 3, big + 1, big + 5, big + 1]}).to_csv(path, index=False)
+    dataset = ChunkedDataset.from_csv(
+        path, cache_root=str(tmp_path / "cache"), chunksize=2
+    )
+
+    stats = dataset.stats("id")
+    # numpy compares floats with ints after rounding the int, so compare ints
+    assert (int(stats["min"]), int(stats["max"])) == (big + 1, big + 5)
+    assert stats["unique"] == 3
+
+
+def test_exact_stats_of_a_large_column_fall_back_to_sketches(
+    tmp_path, monkeypatch, caplog
+):
+    _, frame, dataset = open_dataset(tmp_path)
+    exact = dataset.stats("a")
+    assert exact["unique"] == frame["a"].nunique()
+
+    monkeypatch.setattr(chunked_dataset, "EXACT_STATS_BYTES", 400)
+    with caplog.at_level(logging.WARNING, logger="datox.dataset"):
+        capped = dataset.stats("b")
+    assert "too large for exact statistics" in caplog.text
+    assert capped == dataset.stats("b", approximate=True)
+    assert (capped["count"], capped["unique"]) == (100, 5)
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.chunked_dataset import ChunkedDataset
+from core.data_manager import DataManager
+
+
+PLAN = [
+    {"column": "label", "missing": "drop"},
+    {"column": "price", "missing": "mean", "outliers": "cap"},
+    {"column": "weight", "missing": "value", "value": 0, "outliers": "remove"},
+    {"column": "label", "outliers": "cap"},
+    {"column": "unknown", "missing": "mean"},
+]
+
+
+def sample_frame():
+    return pd.DataFrame(
+        {
+            "label": ["a", None, "b", "c", "d", "e", None, "f", "g", "h"],
+            "price": [1.0, 500.0, np.nan, 3.0, 4.0, 2.0, 5.0, np.nan, 90.0, 3.0],
+            "weight": [5.0, 6.0, 5.5, np.nan, 6.5, 400.0, 5.0, 6.0, 5.0, 5.5],
+        }
+    )
+
+
+def make_manager(data):
+    manager = DataManager()
+    manager.approximate_statistics = False
+    manager.set_dataset("data.csv", data)
+    return manager
+
+
+def expected_result(frame):
+    """The plan applied one step after another with pandas"""
+    frame = frame[frame["label"].notna()].copy()
+    frame["price"] = frame["price"].fillna(frame["price"].mean())
+    frame["weight"] = frame["weight"].fillna(0)
+
+    for column in ("price", "weight"):
+        low, high = frame[column].quantile([0.25, 0.75])
+        lower, upper = low - 1.5 * (high - low), high + 1.5 * (high - low)
+        if column == "price":
+            frame[column] = frame[column].clip(lower, upper)
+        else:
+            frame = frame[frame[column].between(lower, upper)]
+    return frame
+
+
+def test_steps_are_applied_in_order():
+    frame = sample_frame()
+    manager = make_manager(frame)
+    manager.apply_cleaning_plan(PLAN)
+
+    result = manager.get_frame()
+    pd.testing.assert_frame_equal(result, expected_result(frame))
+    # The mean fill comes from the rows left after the drop
+    assert result.loc[7, "price"] == pytest.approx(103 / 6)
+    # Outlier bounds come from the filled values
+    assert result["price"].max() < 90.0
+    assert 400.0 not in result["weight"].tolist()
+    pd.testing.assert_frame_equal(frame, sample_frame())
+
+
+def test_one_undo_reverts_the_whole_plan():
+    frame = sample_frame()
+    manager = make_manager(frame)
+    manager.apply_cleaning_plan(PLAN)
+    cleaned = manager.get_frame()
+
+    assert manager.undo()["operation"] == "cleaning_plan"
+    pd.testing.assert_frame_equal(manager.get_frame(), frame)
+    assert not manager.can_undo()
+
+    manager.redo()
+    pd.testing.assert_frame_equal(manager.get_frame(), cleaned)
+
+
+def test_out_of_core_result_equals_in_memory(tmp_path):
+    path = str(tmp_path / "data.csv")
+    sample_frame().to_csv(path, index=False)
+    frame = pd.read_csv(path)
+
+    in_memory = make_manager(frame)
+    in_memory.apply_cleaning_plan(PLAN)
+
+    dataset = ChunkedDataset.from_csv(
+        path, cache_root=str(tmp_path / "cache"), chunksize=3
+    )
+    out_of_core = make_manager(dataset)
+    out_of_core.apply_cleaning_plan(PLAN)
+
+    pd.testing.assert_frame_equal(
+        out_of_core.get_frame().reset_index(drop=True),
+        in_memory.get_frame().reset_index(drop=True),
+    )
+    out_of_core.undo()
+    pd.testing.assert_frame_equal(out_of_core.get_frame(), frame)
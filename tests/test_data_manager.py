@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from core.data_manager import DataManager
+
+
+def make_manager(frame):
+    manager = DataManager()
+    manager.set_dataset("data.csv", frame)
+    return manager
+
+
+def test_cleaning_keeps_earlier_frames_unchanged():
+    manager = make_manager(
+        pd.DataFrame({"a": [1.0, np.nan, 3.0], "b": [1.0, 2.0, 100.0]})
+    )
+    source = manager.get_profile_source()["data"]
+    whole = manager.get_frame()
+
+    manager.clean_missing_values("a", "mean")
+    manager.apply_cleaning_plan([{"column": "b", "missing": "value", "value": 0}])
+
+    assert source["a"].isna().tolist() == [False, True, False]
+    assert whole["a"].isna().tolist() == [False, True, False]
+    assert manager.get_column("a").tolist() == [1.0, 2.0, 3.0]
+    assert source is not manager.dataframe
+
+
+def test_undo_and_redo_keep_earlier_frames_unchanged():
+    manager = make_manager(pd.DataFrame({"a": [1.0, np.nan, 3.0]}))
+    manager.clean_missing_values("a", "value", 0)
+    filled = manager.get_frame()
+
+    manager.undo()
+    assert filled["a"].tolist() == [1.0, 0.0, 3.0]
+    restored = manager.get_frame()
+
+    manager.redo()
+    assert restored["a"].isna().tolist() == [False, True, False]
+    assert manager.get_column("a").tolist() == [1.0, 0.0, 3.0]
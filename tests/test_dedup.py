@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.data_manager import DataManager
+from core.dedup import RowHashIndex, row_hashes
+
+
+def sample_frame(rows=2000):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(
+        {
+            "id": rng.integers(0, 300, rows),
+            "value": rng.choice([0.5, 1.5, np.nan], rows),
+            "name": rng.choice(["a", "b", None], rows),
+        }
+    )
+    frame["name"] = frame["name"].astype(object)
+    return frame
+
+
+@pytest.mark.parametrize("keep", ["first", "last", False])
+def test_duplicated_matches_pandas(keep):
+    frame = sample_frame()
+    index = RowHashIndex().update(frame)
+    np.testing.assert_array_equal(
+        index.duplicated(keep), frame.duplicated(keep=keep).to_numpy()
+    )
+    by_key = RowHashIndex(["id"]).update(frame)
+    np.testing.assert_array_equal(
+        by_key.duplicated(keep), frame.duplicated(["id"], keep=keep).to_numpy()
+    )
+
+
+def test_incremental_updates_match_one_pass():
+    frame = sample_frame()
+    index = RowHashIndex()
+    for start in range(0, len(frame), 700):
+        index.update(frame.iloc[start : start + 700])
+    np.testing.assert_array_equal(index.hashes, row_hashes(frame))
+    assert len(index) == len(frame)
+
+
+def test_values_of_different_types_are_not_duplicates():
+    values = pd.Series([1, "1", None, np.nan, 1, "1", pd.NA], dtype=object)
+    frame = pd.DataFrame({"key": values, "other": 0})
+    drop = RowHashIndex().update(frame).duplicated()
+    assert drop.tolist() == [False, False, False, False, True, True, False]
+
+    categories = pd.DataFrame({"key": pd.Categorical([1, "1", 1])})
+    assert RowHashIndex().update(categories).duplicated().tolist() == [
+        False,
+        False,
+        True,
+    ]
+
+
+def test_clusters_list_groups_largest_first():
+    frame = pd.DataFrame({"a": [1, 2, 1, 3, 2, 1, 4]})
+    clusters = RowHashIndex().update(frame).clusters()
+    assert clusters.to_dict("list") == {
+        "first_row": [0, 1],
+        "last_row": [5, 4],
+        "count": [3, 2],
+    }
+
+
+def test_invalid_keep_is_rejected():
+    with pytest.raises(ValueError):
+        RowHashIndex().update(sample_frame(10)).duplicated("middle")
+
+
+def test_remove_duplicates_keeps_mixed_type_rows():
+    manager = DataManager()
+    manager.set_dataset(
+        "data.csv", pd.DataFrame({"key": pd.Series([1, "1", 1], dtype=object)})
+    )
+    assert manager.remove_duplicates() == 1
+    assert manager.get_column("key").tolist() == [1, "1"]
+
+
+def test_hash_chunks_do_not_change_hashes(monkeypatch):
+    frame = sample_frame(50)
+    whole = row_hashes(frame)
+    monkeypatch.setattr("core.dedup.HASH_CHUNK_ROWS", 7)
+    np.testing.assert_array_equal(row_hashes(frame), whole)
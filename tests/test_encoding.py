@@ -0,0 +1,55 @@
+import io
+import pytest
+from core.encoding import IncrementalDecodingReader, cached_encoding, detect_encoding
+from core.loader import read_csv_chunked
+
+
+def write(tmp_path, data, name="data.csv"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        ("a,b\n1,é\n".encode("utf-8"), "utf-8"),
+        ("a,b\n1,é\n".encode("cp1252"), "cp1252"),
+        ("a,b\n1,é\n".encode("utf-8-sig"), "utf-8-sig"),
+    ],
+)
+def test_detect_encoding(tmp_path, data, expected):
+    assert detect_encoding(write(tmp_path, data)) == expected
+
+
+def test_reader_falls_back_from_the_failing_byte():
+    data = b"name\nplain\n" + "café\n".encode("cp1252")
+    reader = IncrementalDecodingReader(io.BytesIO(data), "utf-8")
+
+    assert reader.read() == "name\nplain\ncafé\n"
+    assert reader.encoding == "cp1252"
+    assert reader.switched_at == data.index(b"\xe9")
+    assert reader.ascii_before_switch
+
+
+def test_reader_notices_non_ascii_text_before_the_switch_in_one_block():
+    data = "name\ncafé\n".encode("utf-8") + "naïve\n".encode("cp1252")
+    reader = IncrementalDecodingReader(io.BytesIO(data), "utf-8")
+
+    assert reader.read() == "name\ncafé\nnaïve\n"
+    assert not reader.ascii_before_switch
+
+
+def test_fallback_is_cached_only_after_ascii_text(tmp_path):
+    ascii_first = write(tmp_path, b"name\nplain\n" + "café\n".encode("cp1252"))
+    read_csv_chunked(ascii_first, encoding="utf-8")
+    assert cached_encoding(ascii_first) == "cp1252"
+
+    mixed = write(
+        tmp_path,
+        "name\ncafé\n".encode("utf-8") + "naïve\n".encode("cp1252"),
+        "mixed.csv",
+    )
+    frame = read_csv_chunked(mixed, encoding="utf-8")
+    assert frame["name"].tolist() == ["café", "naïve"]
+    assert cached_encoding(mixed) is None
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core import fuzzy_dedup
+from core.chunked_dataset import ChunkedDataset
+from core.data_manager import DataManager
+from core.fuzzy_dedup import find_near_duplicates, normalize
+
+
+def clustered_pairs(clusters):
+    """Set of (row, row) pairs that are in the same cluster"""
+    pairs = set()
+    for _, group in clusters.groupby("cluster"):
+        rows = sorted(group["row"])
+        pairs.update((a, b) for a in rows for b in rows if a < b)
+    return pairs
+
+
+def typo(text, rng):
+    """text with two neighbouring letters swapped"""
+    i = int(rng.integers(1, len(text) - 2))
+    return text[:i] + text[i + 1] + text[i] + text[i + 2 :]
+
+
+def test_normalize_keeps_letters_of_every_script():
+    texts = pd.Series(["Smith, John", "José_ÁLVAREZ", "Иван Петров", "東京都 渋谷区"])
+    assert normalize(texts) == ["john smith", "alvarez jose", "иван петров", "東京都 渋谷区"]
+
+
+def test_typo_variants_are_found():
+    rng = np.random.default_rng(0)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    names = [
+        " ".join("".join(rng.choice(letters, 8)) for _ in range(3)) for _ in range(300)
+    ]
+    variants = [typo(name, rng) for name in names]
+    frame = pd.DataFrame({"name": names + variants})
+
+    pairs = clustered_pairs(find_near_duplicates(frame, ["name"], threshold=0.6))
+    found = sum((i, i + len(names)) in pairs for i in range(len(names)))
+    assert found >= 0.95 * len(names)
+    # Different records are not merged
+    assert all(b - a == len(names) for a, b in pairs)
+
+
+def test_threshold_decides_which_similar_rows_match():
+    frame = pd.DataFrame(
+        {"name": ["acme trading company limited", "acme trading company ltd", "zzz"]}
+    )
+    assert clustered_pairs(find_near_duplicates(frame, ["name"], threshold=0.5)) == {
+        (0, 1)
+    }
+    assert find_near_duplicates(frame, ["name"], threshold=0.95).empty
+
+
+@pytest.mark.parametrize(
+    "text", ["Иван Петров", "東京都渋谷区神南一丁目", "Ελληνική Δημοκρατία"]
+)
+def test_non_ascii_duplicates_are_found(text):
+    frame = pd.DataFrame({"name": [text, "something else entirely", text.upper()]})
+    assert clustered_pairs(find_near_duplicates(frame, ["name"])) == {(0, 2)}
+
+
+def test_every_pair_in_a_bucket_is_a_candidate(monkeypatch):
+    keys = np.array([5, 9, 5, 5, 7], dtype=np.uint64)
+    rows = np.array([10, 11, 12, 13, 14])
+    sources, targets = fuzzy_dedup._bucket_pairs(keys, rows)
+    assert set(zip(sources, targets)) == {(10, 12), (10, 13), (12, 13)}
+
+    # Large buckets pair each row with the next BUCKET_PAIRS rows only
+    monkeypatch.setattr(fuzzy_dedup, "BUCKET_PAIRS", 1)
+    sources, targets = fuzzy_dedup._bucket_pairs(keys, rows)
+    assert set(zip(sources, targets)) == {(10, 12), (12, 13)}
+
+
+def near_duplicate_frame():
+    return pd.DataFrame(
+        {
+            "name": ["John Smith", "Mary Jones", "smith, john", "John Smith.", "Bob"],
+            "email": [np.nan, "mary@x.org", "john@x.org", np.nan, "bob@x.org"],
+            "age": [40.0, 31.0, np.nan, 41.0, 25.0],
+        }
+    )
+
+
+def test_merge_fills_the_first_row_and_undo_restores_the_frame():
+    frame = near_duplicate_frame()
+    manager = DataManager()
+    manager.set_dataset("people.csv", frame)
+
+    clusters = manager.find_near_duplicates(["name"], threshold=0.5)
+    assert clustered_pairs(clusters) == {(0, 2), (0, 3), (2, 3)}
+    assert manager.merge_near_duplicates(clusters) == 2
+
+    merged = manager.get_frame()
+    assert merged["name"].tolist() == ["John Smith", "Mary Jones", "Bob"]
+    assert merged["email"].tolist() == ["john@x.org", "mary@x.org", "bob@x.org"]
+    assert merged["age"].tolist() == [40.0, 31.0, 25.0]
+
+    manager.undo()
+    pd.testing.assert_frame_equal(manager.get_frame(), frame)
+    # The undo changed the rows, so the old groups are refused
+    with pytest.raises(ValueError):
+        manager.merge_near_duplicates(clusters)
+
+
+def test_out_of_core_merge_matches_in_memory(tmp_path):
+    frame = near_duplicate_frame()
+    path = str(tmp_path / "people.csv")
+    frame.to_csv(path, index=False)
+
+    in_memory = DataManager()
+    in_memory.set_dataset("people.csv", frame)
+    in_memory.merge_near_duplicates(in_memory.find_near_duplicates(["name"], 0.5))
+
+    out_of_core = DataManager()
+    out_of_core.set_dataset(
+        "people.csv",
+        ChunkedDataset.from_csv(path, cache_root=str(tmp_path / "cache"), chunksize=2),
+    )
+    out_of_core.merge_near_duplicates(out_of_core.find_near_duplicates(["name"], 0.5))
+
+    pd.testing.assert_frame_equal(
+        out_of_core.get_frame().reset_index(drop=True),
+        in_memory.get_frame().reset_index(drop=True),
+    )
@@ -0,0 +1,163 @@
+import gc
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from core.data_manager import DataManager
+from core.history import (
+    ColumnChange,
+    CompositeChange,
+    DtypeChange,
+    FrameSwap,
+    RowRemoval,
+    UndoStack,
+)
+
+
+def sample_frame():
+    return pd.DataFrame(
+        {
+            "a": [1.0, np.nan, 3.0, np.nan, 5.0],
+            "b": ["x", None, "y", "x", "z"],
+            "c": [1, 2, 3, 4, 5],
+        },
+        index=[10, 11, 12, 13, 14],
+    )
+
+
+def run_operations(stack, df):
+    """Push a fill, a dtype change, a row removal and a frame swap; return states"""
+    states = [df]
+
+    filled = df.copy(deep=False)
+    filled["a"] = df["a"].fillna(0.0)
+    stack.push({"operation": "fill"}, ColumnChange.between("a", df["a"], filled["a"]))
+    states.append(filled)
+
+    change = DtypeChange("c", filled["c"].dtype, np.dtype("int8"))
+    stack.push({"operation": "dtype"}, change)
+    states.append(change.apply(filled))
+
+    removal = RowRemoval.of(states[-1], states[-1]["b"].notna(), reset_index=True)
+    text = ColumnChange.between(
+        "b", states[-1]["b"], states[-1]["b"].str.upper().astype(object)
+    )
+    composite = CompositeChange([text, removal])
+    stack.push({"operation": "remove"}, composite)
+    states.append(composite.apply(states[-1]))
+
+    swapped = pd.DataFrame({"d": [1, 2]})
+    stack.push({"operation": "swap"}, FrameSwap(states[-1]))
+    states.append(swapped)
+    return states
+
+
+@pytest.mark.parametrize("memory_budget", [0, 10**9])
+def test_undo_and_redo_restore_every_state(memory_budget):
+    stack = UndoStack(memory_budget=memory_budget)
+    states = run_operations(stack, sample_frame())
+
+    df = states[-1]
+    for expected in reversed(states[:-1]):
+        df, _ = stack.undo(df)
+        pd.testing.assert_frame_equal(df, expected)
+    assert not stack.can_undo()
+
+    for expected in states[1:]:
+        df, _ = stack.redo(df)
+        pd.testing.assert_frame_equal(df, expected)
+    assert stack.operations() == [
+        {"operation": name} for name in ("fill", "dtype", "remove", "swap")
+    ]
+    stack.close()
+
+
+def test_steps_over_the_budget_are_spilled_to_disk():
+    stack = UndoStack(memory_budget=0)
+    df = run_operations(stack, sample_frame())[-1]
+
+    assert stack.memory_usage == 0
+    assert stack.changes() is None
+    spill_dir = stack._spill_dir
+    assert len(os.listdir(spill_dir)) == 4
+
+    df, _ = stack.undo(df)
+    assert stack.memory_usage == 0
+    assert len(os.listdir(spill_dir)) == 4
+
+    stack.close()
+    assert not os.path.exists(spill_dir)
+
+
+def test_oldest_steps_are_spilled_first():
+    stack = UndoStack(memory_budget=10**9)
+    run_operations(stack, sample_frame())
+    assert len(stack.changes()) == 4
+
+    stack.memory_budget = stack._undo[-1].nbytes
+    stack._enforce_budget()
+    assert [slot.in_memory for slot in stack._undo] == [False, False, False, True]
+    stack.close()
+
+
+def test_push_clears_redo_steps():
+    stack = UndoStack(memory_budget=0)
+    states = run_operations(stack, sample_frame())
+    stack.undo(states[-1])
+    redo_slot = stack._redo[-1]
+
+    stack.push({"operation": "other"}, DtypeChange("c", np.dtype("int8"), np.int16))
+    assert not stack.can_redo()
+    assert not os.path.exists(redo_slot.path)
+    stack.close()
+
+
+def test_saved_steps_load_and_undo(tmp_path):
+    stack = UndoStack(memory_budget=200)
+    states = run_operations(stack, sample_frame())
+    description = stack.save(str(tmp_path))
+    stack.close()
+
+    loaded = UndoStack()
+    loaded.load(str(tmp_path), description)
+    df = states[-1]
+    for expected in reversed(states[:-1]):
+        df, _ = loaded.undo(df)
+        pd.testing.assert_frame_equal(df, expected)
+
+    # Saving again writes the swapped frame and removes files no step uses
+    saved = loaded.save(str(tmp_path))
+    assert [entry["operation"] for entry in saved["redo"]] == [
+        entry["operation"] for entry in description["undo"][::-1]
+    ]
+    assert sorted(os.listdir(tmp_path)) == sorted(e["file"] for e in saved["redo"])
+    loaded.close()
+
+
+def test_spill_directory_is_removed_with_the_stack():
+    stack = UndoStack(memory_budget=0)
+    run_operations(stack, sample_frame())
+    spill_dir = stack._spill_dir
+    assert os.listdir(spill_dir)
+
+    del stack
+    gc.collect()
+    assert not os.path.exists(spill_dir)
+
+
+def test_replacing_the_dataset_removes_spilled_steps():
+    manager = DataManager()
+    manager.undo_stack.memory_budget = 0
+    manager.set_dataset("data.csv", sample_frame())
+    manager.clean_missing_values("a", "value", 0)
+    spill_dir = manager.undo_stack._spill_dir
+    assert os.listdir(spill_dir)
+
+    manager.set_dataset("other.csv", sample_frame())
+    assert not os.path.exists(spill_dir)
+    assert not manager.can_undo()
+
+    manager.clean_missing_values("a", "value", 0)
+    spill_dir = manager.undo_stack._spill_dir
+    manager.close()
+    assert not os.path.exists(spill_dir)
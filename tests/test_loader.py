@@ -0,0 +1,116 @@
+import os
+import numpy as np
+import pandas as pd
+from core.data_manager import DataManager
+from core.loader import LoadCancelled, read_csv_chunked
+from core.tasks import BackgroundTask
+
+
+def write_csv(tmp_path, rows=1000):
+    frame = pd.DataFrame({"a": np.arange(rows), "b": np.arange(rows) * 0.5})
+    path = str(tmp_path / "data.csv")
+    frame.to_csv(path, index=False)
+    return path, frame
+
+
+def finished(task):
+    assert task.wait(10)
+    assert task.done
+    return task
+
+
+def test_progress_and_result_come_back_from_the_worker(tmp_path):
+    path, frame = write_csv(tmp_path)
+    seen = []
+
+    def read(progress_callback, cancel_event):
+        def report(completed, total):
+            seen.append((completed, total))
+            progress_callback(completed, total)
+
+        return read_csv_chunked(
+            path,
+            "utf-8",
+            chunksize=100,
+            progress_callback=report,
+            cancel_event=cancel_event,
+        )
+
+    task = finished(BackgroundTask(read).start())
+
+    assert task.error is None
+    pd.testing.assert_frame_equal(task.result, frame)
+    size = os.path.getsize(path)
+    assert len(seen) == 10
+    assert [done for done, _ in seen] == sorted(done for done, _ in seen)
+    assert all(total == size for _, total in seen)
+    assert task.progress == (size, size)
+
+
+def test_cancel_stops_the_read_between_chunks(tmp_path):
+    # Large enough that the first chunk does not read the whole file
+    path, _ = write_csv(tmp_path, rows=200_000)
+
+    def read(progress_callback, cancel_event):
+        def cancel_after_first_chunk(completed, total):
+            progress_callback(completed, total)
+            cancel_event.set()
+
+        return read_csv_chunked(
+            path,
+            "utf-8",
+            chunksize=100,
+            progress_callback=cancel_after_first_chunk,
+            cancel_event=cancel_event,
+        )
+
+    task = finished(BackgroundTask(read).start())
+
+    assert isinstance(task.error, LoadCancelled)
+    assert task.result is None
+    assert task.cancelled
+    completed, total = task.progress
+    assert 0 < completed < total
+
+
+def test_cancel_before_the_read_starts(tmp_path):
+    path, _ = write_csv(tmp_path)
+    task = BackgroundTask(DataManager().read_dataset, path)
+    task.cancel()
+
+    assert isinstance(finished(task.start()).error, LoadCancelled)
+
+
+def test_dataset_read_on_a_worker_leaves_the_manager_unchanged(tmp_path):
+    path, frame = write_csv(tmp_path)
+    manager = DataManager()
+    task = finished(BackgroundTask(manager.read_dataset, path).start())
+
+    assert task.error is None
+    pd.testing.assert_frame_equal(task.result, frame)
+    assert manager.dataframe is None
+
+
+def test_errors_are_passed_to_the_polling_thread(tmp_path):
+    path = str(tmp_path / "data.txt")
+    open(path, "w").close()
+    task = finished(BackgroundTask(DataManager().read_dataset, path).start())
+
+    assert isinstance(task.error, ValueError)
+    assert "Unsupported file format" in str(task.error)
+    assert task.result is None
+
+    def interrupted(progress_callback, cancel_event):
+        raise KeyboardInterrupt
+
+    task = finished(BackgroundTask(interrupted).start())
+    assert isinstance(task.error, KeyboardInterrupt)
+
+
+def test_keyword_arguments_are_passed_to_the_target():
+    def target(value, scale=1, progress_callback=None, cancel_event=None):
+        progress_callback(1, 1)
+        return value * scale
+
+    task = finished(BackgroundTask(target, 2, scale=3).start())
+    assert (task.result, task.progress) == (6, (1, 1))
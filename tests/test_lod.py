@@ -0,0 +1,79 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from core import lod
+from core.lod import ScatterLOD, cell_index
+
+
+def sample_points(n=50_000):
+    rng = np.random.default_rng(0)
+    return rng.normal(size=n), rng.normal(size=n) * 10
+
+
+def make_lod(x, y):
+    figure = Figure(figsize=(4, 3), dpi=100)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    collection = ax.scatter(x[:0], y[:0])
+    return ax, ScatterLOD(ax, collection, x, y)
+
+
+def test_cell_index_puts_the_upper_limit_in_the_last_cell():
+    values = np.array([0.0, 0.49, 0.5, 0.99, 1.0])
+    assert cell_index(values, 0.0, 1.0, 2).tolist() == [0, 0, 1, 1, 1]
+
+
+def test_levels_are_nested_samples_sorted_by_x(monkeypatch):
+    monkeypatch.setattr(lod, "QUERY_POINTS", 1000)
+    x, y = sample_points(20_000)
+    levels = lod._build_levels(x, y, seed=0)
+
+    sizes = [len(positions) for _, _, positions in levels]
+    assert sizes == [312, 1250, 5000, 20_000]
+    for level_x, level_y, positions in levels:
+        assert np.all(np.diff(level_x) >= 0)
+        np.testing.assert_array_equal(level_x, x[positions])
+        np.testing.assert_array_equal(level_y, y[positions])
+    for coarse, fine in zip(levels, levels[1:]):
+        assert set(coarse[2]) <= set(fine[2])
+
+
+def test_drawn_points_are_visible_and_one_per_cell():
+    x, y = sample_points()
+    ax, scatter = make_lod(x, y)
+
+    ax.set_xlim(-0.5, 0.5)
+    ax.set_ylim(-5, 5)
+    offsets = scatter.collection.get_offsets()
+    np.testing.assert_array_equal(offsets[:, 0], x[scatter.positions])
+    np.testing.assert_array_equal(offsets[:, 1], y[scatter.positions])
+    assert np.all((np.abs(offsets[:, 0]) <= 0.5) & (np.abs(offsets[:, 1]) <= 5))
+
+    width, height = scatter._grid_size()
+    cells = cell_index(offsets[:, 0], -0.5, 0.5, width) + width * cell_index(
+        offsets[:, 1], -5, 5, height
+    )
+    assert len(np.unique(cells)) == len(cells)
+    assert len(cells) <= width * height
+
+
+def test_zooming_in_reads_finer_levels(monkeypatch):
+    monkeypatch.setattr(lod, "QUERY_POINTS", 1000)
+    x, y = sample_points()
+    ax, scatter = make_lod(x, y)
+    assert len(scatter.levels) > 1
+    assert len(scatter.positions) <= len(scatter.levels[0][2])
+    ax.set_xlim(1.0, 1.01)
+    ax.set_ylim(-1, 1)
+
+    inside = np.flatnonzero((x >= 1.0) & (x <= 1.01) & (y >= -1) & (y <= 1))
+    assert sorted(scatter.positions) == sorted(inside)
+
+
+def test_data_limits_cover_every_point():
+    x, y = sample_points(1000)
+    ax, _ = make_lod(x, y)
+    low_x, high_x = ax.get_xlim()
+    low_y, high_y = ax.get_ylim()
+    assert low_x <= x.min() and high_x >= x.max()
+    assert low_y <= y.min() and high_y >= y.max()
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.memory_optimizer import optimize_dtypes
+
+
+def sample_frame():
+    return pd.DataFrame(
+        {
+            "small": np.array([0, -128, 127, 5], dtype=np.int64),
+            "medium": np.array([0, -129, 40_000, 5], dtype=np.int64),
+            "large": np.array([0, 2**40, -(2**40), 5], dtype=np.int64),
+            "halves": [0.5, np.nan, -1.25, 2.0**100],
+            "tenths": [0.1, 0.2, np.nan, 0.3],
+            "repeated": ["a", "b", "a", "a"],
+            "distinct": ["a", "b", "c", "a"],
+        }
+    )
+
+
+def test_integers_are_downcast_without_loss():
+    frame = sample_frame()
+    optimized, _ = optimize_dtypes(frame, ["small", "medium", "large"])
+
+    assert optimized["small"].dtype == np.int8
+    assert optimized["medium"].dtype == np.int32
+    assert optimized["large"].dtype == np.int64
+    for column in ("small", "medium", "large"):
+        assert optimized[column].astype(np.int64).tolist() == frame[column].tolist()
+
+
+def test_float32_only_when_every_value_round_trips():
+    frame = sample_frame()
+    optimized, _ = optimize_dtypes(frame, ["halves", "tenths"])
+
+    assert optimized["halves"].dtype == np.float32
+    np.testing.assert_array_equal(
+        optimized["halves"].astype(np.float64), frame["halves"]
+    )
+    assert optimized["tenths"].dtype == np.float64
+
+
+@pytest.mark.parametrize(
+    "threshold, categories", [(0.2, {"repeated"}), (0.3, {"repeated", "distinct"})]
+)
+def test_category_threshold(threshold, categories):
+    frame = pd.DataFrame(
+        {
+            "repeated": [f"value {i % 10}" for i in range(100)],
+            "distinct": [f"value {i % 30}" for i in range(100)],
+        }
+    )
+    optimized, _ = optimize_dtypes(frame, category_threshold=threshold)
+
+    found = {c for c in frame if optimized[c].dtype == "category"}
+    assert found == categories
+    for column in categories:
+        assert optimized[column].astype(object).tolist() == frame[column].tolist()
+
+
+def test_input_frame_is_unchanged():
+    frame = sample_frame()
+    optimized, report = optimize_dtypes(frame)
+
+    pd.testing.assert_frame_equal(frame, sample_frame())
+    assert report
+    assert optimized is not frame
+
+
+def test_report_lists_converted_columns_and_their_sizes():
+    frame = sample_frame()
+    _, report = optimize_dtypes(frame, ["small", "large", "halves"])
+
+    assert [entry["column"] for entry in report] == ["small", "halves"]
+    small = report[0]
+    assert (small["old_dtype"], small["new_dtype"]) == ("int64", "int8")
+    assert small["old_bytes"] == frame["small"].memory_usage(index=False, deep=True)
+    assert small["new_bytes"] == 4
+    assert report[1]["new_dtype"] == "float32"
+    assert report[1]["new_bytes"] * 2 == report[1]["old_bytes"]
@@ -0,0 +1,90 @@
+import time
+import numpy as np
+import pytest
+from core.operation_profiler import OperationProfiler, format_record, profiled
+
+
+class Worker:
+    def __init__(self):
+        self.rows = 10
+        self.profiler = OperationProfiler(rows=lambda: self.rows)
+        self.records = []
+        self.profiler.add_sink(self.records.append)
+
+    @profiled
+    def shrink(self, rows):
+        time.sleep(0.01)
+        self.rows = rows
+        return rows
+
+    @profiled
+    def allocate(self):
+        self.shrink(5)
+        return np.ones(1_000_000).sum()
+
+    @profiled
+    def fail(self):
+        self.rows = 0
+        raise ValueError("bad input")
+
+
+def test_record_fields():
+    worker = Worker()
+    assert worker.shrink(3) == 3
+
+    (record,) = worker.records
+    assert record["operation"] == "shrink"
+    assert record["wall_s"] >= 0.01
+    assert 0 <= record["cpu_s"] < record["wall_s"]
+    assert (record["rows_in"], record["rows_out"]) == (10, 3)
+    assert record["error"] is None
+    assert record["peak_bytes"] is None and record["profile"] is None
+    assert list(worker.profiler.recent) == [record]
+    assert format_record(record).startswith("shrink: ")
+
+
+def test_nested_operations_are_recorded_innermost_first():
+    worker = Worker()
+    worker.profiler.trace_memory = True
+    worker.profiler.cprofile = True
+    worker.allocate()
+
+    inner, outer = worker.records
+    assert [inner["operation"], outer["operation"]] == ["shrink", "allocate"]
+    assert outer["wall_s"] >= inner["wall_s"]
+    assert (outer["rows_in"], outer["rows_out"]) == (10, 5)
+    # Memory and cProfile cover the outermost operation only
+    assert inner["peak_bytes"] is None and inner["profile"] is None
+    assert outer["peak_bytes"] >= 8_000_000
+    assert "shrink" in outer["profile"]
+
+
+def test_errors_are_recorded_and_raised():
+    worker = Worker()
+    with pytest.raises(ValueError):
+        worker.fail()
+
+    (record,) = worker.records
+    assert record["error"] == "ValueError"
+    assert record["rows_out"] == 0
+    assert "failed with ValueError" in format_record(record)
+
+    # The nesting depth is restored, so the next operation is outermost again
+    worker.profiler.trace_memory = True
+    worker.shrink(1)
+    assert worker.records[-1]["peak_bytes"] is not None
+
+
+def test_failing_sink_does_not_stop_the_others():
+    worker = Worker()
+
+    def broken(record):
+        raise RuntimeError("sink failed")
+
+    worker.profiler.sinks.insert(0, broken)
+    worker.shrink(2)
+    assert len(worker.records) == 1
+
+    worker.profiler.remove_sink(broken)
+    worker.shrink(1)
+    assert len(worker.records) == 2
@@ -0,0 +1,79 @@
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from core.data_manager import DataManager, build_point_index
+from core.point_index import PointIndex
+
+
+def brute_force_nearest(x, y, px, py, x_radius, y_radius):
+    distance = ((x - px) / x_radius) ** 2 + ((y - py) / y_radius) ** 2
+    best = int(np.argmin(distance))
+    return best if distance[best] <= 1 else None
+
+
+def test_nearest_matches_brute_force_on_stretched_axes():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=5000) * 1000
+    y = rng.normal(size=5000)
+    index = PointIndex(x, y, np.arange(len(x)))
+
+    for px, py in rng.normal(size=(200, 2)) * [1000, 1]:
+        for x_radius, y_radius in [(50, 0.05), (5, 0.5), (200, 0.01)]:
+            assert index.nearest(px, py, x_radius, y_radius) == brute_force_nearest(
+                x, y, px, py, x_radius, y_radius
+            )
+
+
+def test_nearest_with_equal_values():
+    index = PointIndex(np.full(3, 2.0), np.array([1.0, 2.0, 3.0]), np.arange(3))
+    assert index.nearest(2.0, 2.1, 1.0, 0.5) == 1
+    assert index.nearest(5.0, 2.0, 1.0, 0.5) is None
+
+
+def make_manager():
+    manager = DataManager()
+    manager.set_dataset(
+        "data.csv",
+        pd.DataFrame({"x": [1.0, np.nan, 3.0, 4.0], "y": [1.0, 2.0, np.nan, 4.0]}),
+    )
+    return manager
+
+
+def test_index_skips_missing_points_and_maps_them_to_rows():
+    manager = make_manager()
+    index = build_point_index(manager.get_point_source("x", "y"))
+
+    assert len(index) == 2
+    point = index.nearest(4.0, 4.0, 0.1, 0.1)
+    assert manager.point_rows(index, [point]).tolist() == [3]
+
+
+def test_stored_index_is_reused_until_a_column_changes():
+    manager = make_manager()
+    assert manager.cached_point_index("x", "y") is None
+    source = manager.get_point_source("x", "y")
+    index = build_point_index(source)
+    manager.store_point_index(index)
+    assert manager.cached_point_index("x", "y") is index
+    assert manager.cached_point_index("y", "x") is None
+
+    manager.clean_missing_values("x", "value", 0)
+    assert manager.cached_point_index("x", "y") is None
+    with pytest.raises(ValueError):
+        manager.point_rows(index, [0])
+
+    # An index built from data that changed meanwhile is not kept
+    manager.store_point_index(index)
+    assert manager.cached_point_index("x", "y") is None
+    assert source["data"]["x"].isna().sum() == 1
+
+
+def test_data_manager_does_not_import_scipy():
+    # Startup must not pay for scipy (see benchmarks.startup)
+    code = "import sys, core.data_manager; print('scipy' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
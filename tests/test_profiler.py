@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+from core.data_manager import DataManager
+from core.profiler import profile_dataset, store_profiled_stats
+
+
+def test_profile_reads_the_snapshot_and_stores_only_unchanged_columns():
+    manager = DataManager()
+    manager.set_dataset(
+        "data.csv",
+        pd.DataFrame({"a": [1.0, np.nan, 3.0], "b": [1, 2, 3], "c": ["x", "y", "x"]}),
+    )
+    manager.get_column_stats("c")
+    source = manager.get_profile_source()
+    manager.clean_missing_values("a", "value", 0)
+
+    finished = {}
+    report = profile_dataset(source, on_result=finished.__setitem__, max_workers=1)
+    assert sorted(finished) == ["a", "b", "c"]
+    assert (report["file"], report["rows"]) == ("data.csv", 3)
+    columns = {stats["name"]: stats for stats in report["columns"]}
+    assert columns["a"]["missing"] == 1
+    assert columns["c"]["unique"] == 2
+
+    for column, stats in finished.items():
+        store_profiled_stats(manager, source, column, stats)
+    assert manager.stats_cache.peek("a") is None
+    assert manager.stats_cache.peek("b")["max"] == 3
+    assert manager.get_column_stats("a")["missing"] == 0
@@ -0,0 +1,108 @@
+import datetime
+import json
+import os
+import numpy as np
+import pandas as pd
+from core.data_manager import DataManager, compute_column_stats
+from core.project_store import MANIFEST_NAME, ProjectStore
+
+
+def sample_frame():
+    return pd.DataFrame(
+        {
+            "ints": np.arange(5, dtype=np.int64),
+            "floats": [1.5, np.nan, 3.0, 4.0, 5.0],
+            "text": ["a", np.nan, "b", "a", "c"],
+            "flags": [True, False, True, True, False],
+            "category": pd.Categorical(["x", "y", "x", "x", "y"]),
+            "dates": pd.date_range("2024-01-01", periods=5),
+        },
+        index=pd.Index([10, 11, 12, 13, 14], name="id"),
+    )
+
+
+def manifest_columns(path):
+    with open(os.path.join(path, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    return manifest["frames"]["dataframe"]["columns"]
+
+
+def test_round_trip(tmp_path):
+    frame = sample_frame()
+    store = ProjectStore(str(tmp_path / "project"))
+    store.save({"dataframe": frame, "original": None}, {"name": "test"})
+
+    frames, metadata = store.load()
+    pd.testing.assert_frame_equal(frames["dataframe"], frame)
+    assert frames["original"] is None
+    assert metadata == {"name": "test"}
+
+    lazy_frames, _ = store.open()
+    pd.testing.assert_frame_equal(lazy_frames["dataframe"].to_pandas(), frame)
+
+
+def test_unchanged_columns_are_not_written_again(tmp_path):
+    frame = sample_frame()
+    store = ProjectStore(str(tmp_path / "project"))
+    store.save({"dataframe": frame}, {}, compression="zlib")
+
+    frame = frame.assign(floats=frame["floats"] * 2)
+    assert store.save({"dataframe": frame}, {}, compression="zlib") == 1
+    pd.testing.assert_frame_equal(store.load()[0]["dataframe"], frame)
+
+
+def test_stats_with_non_text_top_values_are_saved(tmp_path):
+    day = datetime.date(2024, 1, 1)
+    frame = pd.DataFrame(
+        {
+            "day": [day, day, datetime.date(2024, 1, 2)],
+            "mixed": [1, "1", 1],
+            "when": pd.Categorical(pd.to_datetime(["2024-01-01 12:00"] * 3)),
+            "wait": pd.Series([pd.Timedelta(hours=1), None, "soon"], dtype=object),
+        }
+    )
+    store = ProjectStore(str(tmp_path / "project"))
+
+    store.save({"dataframe": frame}, {}, column_stats=compute_column_stats)
+
+    lazy = store.open()[0]["dataframe"]
+    for column in frame:
+        expected = compute_column_stats(frame[column])["top_values"]
+        top_values = lazy.stats(column)["top_values"]
+        assert top_values == expected
+        assert [type(v) for v in top_values] == [type(v) for v in expected]
+
+
+def test_manifest_stats_are_used_only_for_exact_statistics(tmp_path):
+    frame = pd.DataFrame({"text": ["a", "b", "a", None]})
+    manager = DataManager()
+    manager.set_dataset("data.csv", frame)
+    manager.get_column_stats("text")
+    path = str(tmp_path / "project")
+    manager.save_project(path)
+
+    for approximate in (False, True):
+        manager = DataManager()
+        manager.approximate_statistics = approximate
+        manager.load_project(path, lazy=True)
+        manager.get_column_stats("text")
+        assert manager.get_profile_source()["cached"].keys() == {"text"}
+        assert manager._current_frame().is_loaded("text") == approximate
+
+    manager = DataManager()
+    manager.approximate_statistics = True
+    manager.load_project(path, lazy=True)
+    assert manager.get_profile_source()["cached"] == {}
+
+
+def test_save_stores_only_statistics_already_computed(tmp_path):
+    manager = DataManager()
+    manager.set_dataset("data.csv", sample_frame())
+    manager.get_column_stats("floats")
+    path = str(tmp_path / "project")
+
+    manager.save_project(path)
+
+    stats = {entry["name"]: entry.get("stats") for entry in manifest_columns(path)}
+    assert stats["floats"]["count"] == 5
+    assert all(stats[c] is None for c in stats if c != "floats")
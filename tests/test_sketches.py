@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.sketches import HeavyHitters, HyperLogLog, KLLSketch, category_sketches
+
+
+def rank_errors(sketch, values, qs):
+    ordered = np.sort(values)
+    found = sketch.quantiles(qs)
+    ranks = np.searchsorted(ordered, found, side="right") / len(ordered)
+    return np.abs(ranks - np.asarray(qs))
+
+
+def test_kll_quantiles_are_within_the_rank_error():
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(size=200_000)
+    qs = np.linspace(0.01, 0.99, 99)
+
+    whole = KLLSketch.from_values(values, error=0.01)
+    assert rank_errors(whole, values, qs).max() <= 0.01
+    assert whole.count == len(values)
+    assert (whole.min, whole.max) == (values.min(), values.max())
+    assert whole.mean == pytest.approx(values.mean())
+    assert whole.quantiles([0, 1]) == [values.min(), values.max()]
+
+
+def test_merged_kll_sketches_keep_the_rank_error():
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=150_000)
+    values[::10] = np.nan
+    merged = KLLSketch(error=0.01)
+    for seed, chunk in enumerate(np.array_split(values, 7)):
+        merged.merge(KLLSketch.from_values(chunk, error=0.01, seed=seed))
+
+    present = values[~np.isnan(values)]
+    assert merged.count == len(present)
+    assert rank_errors(merged, present, np.linspace(0.01, 0.99, 99)).max() <= 0.01
+    with pytest.raises(ValueError):
+        merged.merge(KLLSketch(error=0.05))
+
+
+def test_empty_kll_sketch():
+    sketch = KLLSketch.from_values([np.nan])
+    assert sketch.count == 0
+    assert np.isnan(sketch.quantile(0.5))
+    assert np.isnan(sketch.mean)
+
+
+@pytest.mark.parametrize("distinct", [50, 5000, 300_000])
+def test_hyperloglog_estimate(distinct):
+    values = pd.Series(np.arange(distinct).repeat(2).astype(str))
+    estimate = HyperLogLog().update(values).estimate()
+    # Three standard errors at the default precision
+    assert estimate == pytest.approx(distinct, rel=0.025, abs=1)
+
+
+def test_hyperloglog_merge_equals_one_pass():
+    values = pd.Series(np.arange(20_000))
+    halves = HyperLogLog().update(values[:12_000])
+    halves.merge(HyperLogLog().update(values[8_000:]))
+    whole = HyperLogLog().update(values)
+    np.testing.assert_array_equal(halves.registers, whole.registers)
+    with pytest.raises(ValueError):
+        whole.merge(HyperLogLog(precision=10))
+
+
+def test_heavy_hitters_keep_frequent_values_with_bounded_error():
+    rng = np.random.default_rng(3)
+    values = pd.Series(rng.zipf(1.5, 100_000) % 5000)
+    exact = values.value_counts()
+
+    summary = HeavyHitters(capacity=50)
+    for start in range(0, len(values), 12_000):
+        chunk = values.iloc[start : start + 12_000]
+        summary.merge(HeavyHitters(capacity=50).update(chunk))
+
+    assert summary.total == len(values)
+    assert summary.error <= summary.total / 51
+    for value, count in exact[exact > summary.total / 51].items():
+        assert value in summary.counts.index
+        assert exact[value] - summary.error <= summary.counts[value] <= exact[value]
+    assert summary.top(3).index.tolist() == exact.index[:3].tolist()
+
+
+def test_category_sketches_of_parts():
+    parts = [pd.Series(["a", "b", "a", None]), pd.Series(["a", "c"], dtype="category")]
+    distinct, frequent = category_sketches(parts)
+    assert distinct.estimate() == 3
+    assert frequent.top(1).to_dict() == {"a": 3}
+    assert frequent.total == 5
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.data_manager import compute_column_stats
+from core.summary import NumericSummary, quantiles, summarize
+
+
+def test_merged_chunks_match_one_pass_and_pandas():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(size=10_000)
+    values[rng.choice(len(values), 500, replace=False)] = np.nan
+
+    whole = summarize(values)
+    merged = NumericSummary()
+    for chunk in np.array_split(values, [1, 7, 3000, 3001, 8000]):
+        merged.add(chunk)
+    chunked = merged.stats(quantiles(values[~np.isnan(values)], (0.25, 0.5, 0.75)))
+
+    series = pd.Series(values)
+    for key in ("count", "missing", "min", "max", "25%", "50%", "75%"):
+        assert chunked[key] == whole[key]
+    for key in ("mean", "std", "skew", "kurtosis"):
+        assert chunked[key] == pytest.approx(whole[key], rel=1e-9)
+    assert whole["mean"] == pytest.approx(series.mean(), rel=1e-12)
+    assert whole["std"] == pytest.approx(series.std(), rel=1e-12)
+    assert whole["skew"] == pytest.approx(series.skew(), rel=1e-9)
+    assert whole["kurtosis"] == pytest.approx(series.kurtosis(), rel=1e-9)
+    assert whole["count"] == 10_000
+    assert whole["missing"] == 500
+
+
+def test_constant_and_short_columns():
+    assert summarize(np.full(10, 3.0))["skew"] == 0.0
+    stats = summarize(np.array([1.0, np.nan]))
+    assert stats["count"] == 2
+    assert np.isnan(stats["std"])
+    assert np.isnan(summarize(np.array([np.nan]))["mean"])
+
+
+def test_large_integers_keep_exact_range_and_distinct_count():
+    big = 2**53
+    stats = compute_column_stats(pd.Series([big + 1, big + 3, big + 1], dtype="int64"))
+    # numpy compares floats with ints after rounding the int, so compare ints
+    assert int(stats["min"]) == big + 1
+    assert int(stats["max"]) == big + 3
+    assert stats["unique"] == 2
+
+    nullable = pd.Series([big + 1, None, big + 3], dtype="Int64")
+    stats = compute_column_stats(nullable)
+    assert (int(stats["min"]), int(stats["max"])) == (big + 1, big + 3)
+    assert stats["unique"] == 2
+    assert stats["missing"] == 1
+    assert stats["count"] == 3
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from ui.components.virtual_grid import (
+    MAX_COLUMN_WIDTH,
+    MIN_COLUMN_WIDTH,
+    VirtualGrid,
+    format_cell,
+)
+
+
+def make_grid():
+    """A VirtualGrid without its Tk widgets, enough to lay out columns"""
+    grid = VirtualGrid.__new__(VirtualGrid)
+    grid.char_width = 7
+    grid.first_row = 0
+    grid.first_column = 0
+    grid._pages = OrderedDict()
+    grid.redraw = lambda: None
+    return grid
+
+
+def test_only_columns_in_view_are_measured():
+    frame = pd.DataFrame(np.arange(300 * 500).reshape(300, 500))
+    frame[3] = "a much longer text value"
+    formatted = []
+    grid = make_grid()
+    grid.set_source(len(frame), frame.columns, lambda start, stop: frame[start:stop])
+    grid._texts = lambda page, position: formatted.append(position)
+
+    assert grid.column_widths == [None] * 500
+    visible = grid._column_positions(400)
+    assert len(visible) < 10
+    assert all(width is not None for width in grid.column_widths[: len(visible)])
+    assert all(width is None for width in grid.column_widths[len(visible) :])
+    assert visible[3][2] > visible[2][2] == MIN_COLUMN_WIDTH
+    # Measuring does not format whole pages
+    assert formatted == []
+
+
+def test_widths_are_limited_and_empty_grids_measure_headers():
+    frame = pd.DataFrame({"short": [1], "long": ["x" * 500]})
+    grid = make_grid()
+    grid.set_source(1, frame.columns, lambda start, stop: frame[start:stop])
+    assert [w for _, _, w in grid._column_positions(2000)] == [
+        MIN_COLUMN_WIDTH,
+        MAX_COLUMN_WIDTH,
+    ]
+
+    grid.set_source(0, ["a" * 30], None)
+    assert grid._column_positions(2000)[0][2] == 32 * 7 + 6
+    assert grid.index_width == MIN_COLUMN_WIDTH
+
+
+def test_format_cell():
+    assert format_cell(np.nan) == "NaN"
+    assert format_cell(None) == "NaN"
+    assert format_cell(0.1 + 0.2) == "0.3"
+    assert format_cell([1, 2]) == "[1, 2]"
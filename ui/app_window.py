@@ -2,21 +2,41 @@
 AppWindow - Main application window for Datox
 """
 
+import queue
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from ui.components.sidebar import Sidebar
 from ui.components.data_view import DataView
 from ui.components.toolbar import Toolbar
-from core.data_manager import DataManager
+from ui.components.progress_dialog import ProgressDialog
+from ui.components.diagnostics_dialog import DiagnosticsDialog
+from core.data_manager import DataManager, describe_operation
+from core.instrumentation import Instrumentation, StallWatchdog
+from core.loader import LoadCancelled
+from core.memory_optimizer import arrow_strings_available
+from core.operation_profiler import format_record
+from core.tasks import BackgroundTask
+
+
+# Operations shorter than this are logged but not shown in the status bar
+STATUS_MIN_MS = 100
+STATUS_POLL_MS = 200
 
 
 class AppWindow:
     """Main application window class that organizes the UI components"""
 
-    def __init__(self, root):
+    def __init__(self, root, instrumentation=None):
         self.root = root
+        self.instrumentation = instrumentation or Instrumentation()
         self.data_manager = DataManager()
 
+        # Load options
+        self.optimize_on_load = tk.BooleanVar(value=False)
+        self.arrow_strings = tk.BooleanVar(value=False)
+        self.out_of_core = tk.BooleanVar(value=False)
+        self.approximate_statistics = tk.BooleanVar(value=False)
+
         # Configure root window grid
         self.root.columnconfigure(1, weight=1)
         self.root.rowconfigure(1, weight=1)
@@ -28,8 +48,9 @@ class AppWindow:
         self.sidebar = Sidebar(self.root, self)
         self.sidebar.grid(row=1, column=0, sticky="ns")
 
-        self.data_view = DataView(self.root, self)
-        self.data_view.grid(row=1, column=1, sticky="nsew")
+        with self.instrumentation.phase("build data view"):
+            self.data_view = DataView(self.root, self)
+            self.data_view.grid(row=1, column=1, sticky="nsew")
 
         # Status bar
         self.status_var = tk.StringVar()
@@ -44,6 +65,18 @@ class AppWindow:
 
         self._create_menu()
 
+        # Operations also run on worker threads, so their records reach the
+        # status bar through a queue
+        self._operation_records = queue.Queue()
+        self.data_manager.profiler.add_sink(self._operation_records.put)
+        self.root.after(STATUS_POLL_MS, self._show_operation_records)
+
+        # Report callbacks that block the event loop; Ctrl+Shift+D shows them
+        self.watchdog = StallWatchdog(self.root, self.instrumentation).start()
+        self.root.bind_all("<Control-Shift-D>", lambda event: self.show_diagnostics())
+
+        self.root.protocol("WM_DELETE_WINDOW", self.exit)
+
     def _create_menu(self):
         """Create the application menu"""
         menu_bar = tk.Menu(self.root)
@@ -51,15 +84,43 @@ class AppWindow:
         # File menu
         file_menu = tk.Menu(menu_bar, tearoff=0)
         file_menu.add_command(label="Open Dataset", command=self.open_dataset)
+        file_menu.add_checkbutton(
+            label="Optimize Memory on Load", variable=self.optimize_on_load
+        )
+        file_menu.add_checkbutton(
+            label="Use Arrow Strings",
+            variable=self.arrow_strings,
+            state=tk.NORMAL if arrow_strings_available() else tk.DISABLED,
+        )
+        file_menu.add_checkbutton(
+            label="Always Open CSV Out of Core", variable=self.out_of_core
+        )
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Open Project...", command=self.open_project)
+        file_menu.add_command(label="Save Project...", command=self.save_project)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self.exit)
         menu_bar.add_cascade(label="File", menu=file_menu)
 
+        # Edit menu
+        edit_menu = tk.Menu(menu_bar, tearoff=0)
+        edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        menu_bar.add_cascade(label="Edit", menu=edit_menu)
+        self.root.bind_all("<Control-z>", lambda event: self.undo())
+        self.root.bind_all("<Control-y>", lambda event: self.redo())
+
         # Data menu
         data_menu = tk.Menu(menu_bar, tearoff=0)
         data_menu.add_command(label="Clean Data", command=self.show_data_cleaning)
         data_menu.add_command(label="Visualize", command=self.show_visualization)
         data_menu.add_command(label="Statistics", command=self.show_statistics)
+        data_menu.add_separator()
+        data_menu.add_checkbutton(
+            label="Always Use Approximate Statistics",
+            variable=self.approximate_statistics,
+            command=self._on_approximate_statistics_changed,
+        )
         menu_bar.add_cascade(label="Data", menu=data_menu)
 
         # Help menu
@@ -80,40 +141,148 @@ class AppWindow:
             ],
         )
         if file_path:
-            try:
-                # Show loading indicator
-                self.status_var.set(f"Loading dataset from {file_path}...")
-                self.root.update_idletasks()  # Force UI update
-
-                # Create progress window
-                progress_window = tk.Toplevel(self.root)
-                progress_window.title("Loading Dataset")
-                progress_window.geometry("300x100")
-                progress_window.transient(self.root)
-                progress_window.grab_set()
-
-                ttk.Label(progress_window, text="Loading dataset, please wait...").pack(
-                    pady=10
-                )
-                progress = ttk.Progressbar(progress_window, mode="indeterminate")
-                progress.pack(fill=tk.X, padx=20, pady=10)
-                progress.start()
-                progress_window.update_idletasks()
-
-                # Load the dataset
-                self.data_manager.load_dataset(file_path)
-
-                # Close progress window
-                progress_window.destroy()
-
-                # Update the UI
-                self.data_view.refresh_data()
-                self.status_var.set(f"Dataset loaded: {file_path}")
-
-            except ValueError as e:
-                messagebox.showerror("Error", f"Failed to load dataset: {str(e)}")
-            except Exception as e:
-                messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}")
+            self.status_var.set(f"Loading dataset from {file_path}...")
+
+            # Parse on a worker thread so the window stays responsive
+            task = BackgroundTask(
+                self.data_manager.read_dataset,
+                file_path,
+                optimize=self.optimize_on_load.get(),
+                arrow_strings=self.arrow_strings.get(),
+                # Unchecked leaves the choice to the file size
+                out_of_core=True if self.out_of_core.get() else None,
+            ).start()
+            ProgressDialog(
+                self.root,
+                task,
+                title="Loading Dataset",
+                message="Loading dataset, please wait...",
+                on_finished=lambda t: self._on_dataset_loaded(file_path, t),
+            )
+
+    def _on_dataset_loaded(self, file_path, task):
+        """Install a dataset read by a background task"""
+        if isinstance(task.error, LoadCancelled):
+            self.status_var.set("Loading cancelled")
+            return
+        if isinstance(task.error, ValueError):
+            self.status_var.set("Ready")
+            messagebox.showerror("Error", f"Failed to load dataset: {str(task.error)}")
+            return
+        if task.error is not None:
+            self.status_var.set("Ready")
+            messagebox.showerror(
+                "Error", f"An unexpected error occurred: {str(task.error)}"
+            )
+            return
+
+        self.data_manager.set_dataset(file_path, task.result)
+
+        # Update the UI
+        self.data_view.refresh_data()
+        self.status_var.set(f"Dataset loaded: {file_path}")
+
+    def open_project(self):
+        """Open a saved project directory"""
+        file_path = filedialog.askdirectory(title="Open Project")
+        if file_path:
+            self.status_var.set(f"Opening project {file_path}...")
+
+            task = BackgroundTask(self.data_manager.read_project, file_path).start()
+            ProgressDialog(
+                self.root,
+                task,
+                title="Opening Project",
+                message="Opening project, please wait...",
+                on_finished=self._on_project_loaded,
+                unit="columns",
+            )
+
+    def _on_project_loaded(self, task):
+        """Install a project read by a background task"""
+        if isinstance(task.error, LoadCancelled):
+            self.status_var.set("Opening cancelled")
+            return
+        if task.error is not None:
+            self.status_var.set("Ready")
+            messagebox.showerror("Error", f"Failed to open project: {str(task.error)}")
+            return
+
+        self.data_manager.set_project(task.result)
+
+        self.data_view.refresh_data()
+        self.status_var.set(f"Project opened: {self.data_manager.file_name}")
+
+    def save_project(self):
+        """Save the current project to a project directory"""
+        if not self.data_manager.has_data():
+            messagebox.showwarning("Warning", "Please load a dataset first")
+            return
+
+        file_path = filedialog.asksaveasfilename(
+            title="Save Project",
+            defaultextension=".datox",
+            filetypes=[("Datox projects", "*.datox")],
+        )
+        if file_path:
+            self.status_var.set(f"Saving project to {file_path}...")
+
+            task = BackgroundTask(self.data_manager.save_project, file_path).start()
+            ProgressDialog(
+                self.root,
+                task,
+                title="Saving Project",
+                message="Saving project, please wait...",
+                on_finished=lambda t: self._on_project_saved(file_path, t),
+                unit="columns",
+            )
+
+    def _on_project_saved(self, file_path, task):
+        """Report the outcome of a background project save"""
+        if isinstance(task.error, LoadCancelled):
+            self.status_var.set("Saving cancelled")
+            return
+        if task.error is not None:
+            self.status_var.set("Ready")
+            messagebox.showerror("Error", f"Failed to save project: {str(task.error)}")
+            return
+
+        self.status_var.set(f"Project saved: {file_path}")
+
+    def undo(self):
+        """Undo the latest data operation"""
+        try:
+            operation = self.data_manager.undo()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to undo: {str(e)}")
+            return
+
+        if operation is None:
+            self.status_var.set("Nothing to undo")
+            return
+
+        self.data_view.refresh_data()
+        self.status_var.set(f"Undone: {describe_operation(operation)}")
+
+    def redo(self):
+        """Redo the latest undone data operation"""
+        try:
+            operation = self.data_manager.redo()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to redo: {str(e)}")
+            return
+
+        if operation is None:
+            self.status_var.set("Nothing to redo")
+            return
+
+        self.data_view.refresh_data()
+        self.status_var.set(f"Redone: {describe_operation(operation)}")
+
+    def exit(self):
+        """Remove temporary files and close the application"""
+        self.data_manager.close()
+        self.root.destroy()
 
     def show_data_cleaning(self):
         """Show data cleaning panel"""
@@ -127,12 +296,36 @@ class AppWindow:
         """Show statistics panel"""
         self.data_view.show_statistics_panel()
 
+    def show_diagnostics(self):
+        """Show startup timings and event-loop stalls"""
+        DiagnosticsDialog(self.root, self.instrumentation, self.data_manager.profiler)
+
     def show_about(self):
         """Show about dialog"""
         messagebox.showinfo(
             "About", "Datox - No-Code Data Science Platform\nVersion 1.0"
         )
 
+    def _on_approximate_statistics_changed(self):
+        """Use sketches for all datasets, or only for large ones (the default)"""
+        self.data_manager.approximate_statistics = (
+            True if self.approximate_statistics.get() else None
+        )
+
+    def _show_operation_records(self):
+        """Show the latest operation that took STATUS_MIN_MS or more"""
+        shown = None
+        while True:
+            try:
+                record = self._operation_records.get_nowait()
+            except queue.Empty:
+                break
+            if record["wall_s"] * 1000 >= STATUS_MIN_MS:
+                shown = record
+        if shown is not None:
+            self.status_var.set(format_record(shown))
+        self.root.after(STATUS_POLL_MS, self._show_operation_records)
+
     def _on_tab_changed(self, event):
         """Handle tab change events to ensure panels are updated"""
         current_tab = self.data_view.notebook.select()
@@ -2,17 +2,32 @@
 DataView - Main data display area
 """
 
+import importlib
 import tkinter as tk
 from tkinter import ttk
-import pandas as pd
 from ui.panels.data_table import DataTable
-from ui.panels.cleaning_panel import CleaningPanel
-from ui.panels.visualization_panel import VisualizationPanel
-from ui.panels.statistics_panel import StatisticsPanel
+
+
+# Tab text, module and class of each panel. A panel module, and the
+# matplotlib, seaborn or scipy modules it imports, is only loaded when its
+# tab is first shown, so none of them slow down startup.
+PANELS = {
+    "cleaning_panel": ("Data Cleaning", "ui.panels.cleaning_panel", "CleaningPanel"),
+    "visualization_panel": (
+        "Visualization",
+        "ui.panels.visualization_panel",
+        "VisualizationPanel",
+    ),
+    "statistics_panel": ("Statistics", "ui.panels.statistics_panel", "StatisticsPanel"),
+}
 
 
 class DataView(ttk.Frame):
-    """Main data display area"""
+    """Main data display area
+
+    The data table is built with the window; the other panels are built the
+    first time they are shown.
+    """
 
     def __init__(self, parent, app):
         super().__init__(parent)
@@ -27,9 +42,31 @@ class DataView(ttk.Frame):
         self.data_table = DataTable(self.notebook, self.app)
         self.notebook.add(self.data_table, text="Data Table")
 
-        self.cleaning_panel = CleaningPanel(self.notebook, self.app)
-        self.visualization_panel = VisualizationPanel(self.notebook, self.app)
-        self.statistics_panel = StatisticsPanel(self.notebook, self.app)
+        self._panels = {}
+
+    @property
+    def cleaning_panel(self):
+        """Data cleaning panel, built on first use"""
+        return self._panel("cleaning_panel")
+
+    @property
+    def visualization_panel(self):
+        """Visualization panel, built on first use"""
+        return self._panel("visualization_panel")
+
+    @property
+    def statistics_panel(self):
+        """Statistics panel, built on first use"""
+        return self._panel("statistics_panel")
+
+    def _panel(self, name):
+        """The named panel, importing its module and building it on first use"""
+        if name not in self._panels:
+            _, module_name, class_name = PANELS[name]
+            with self.app.instrumentation.phase(f"build {class_name}"):
+                panel_class = getattr(importlib.import_module(module_name), class_name)
+                self._panels[name] = panel_class(self.notebook, self.app)
+        return self._panels[name]
 
     def refresh_data(self):
         """Refresh the data display"""
@@ -45,43 +82,38 @@ class DataView(ttk.Frame):
         self.notebook.select(self.notebook.tabs()[0])  
         self.data_table.show_info()
 
-    def show_cleaning_panel(self):
-        """Show the data cleaning panel"""
-        for i in range(self.notebook.index("end")):
-            if self.notebook.tab(i, "text") == "Data Cleaning":
-                self.notebook.select(i)
+    def show_rows(self, positions):
+        """Show only the rows at positions in the data table"""
+        if "Data Table" not in [
+            self.notebook.tab(i, "text") for i in self.notebook.tabs()
+        ]:
+            self.notebook.add(self.data_table, text="Data Table")
 
-                self.cleaning_panel.on_show()
-                return
+        self.notebook.select(self.data_table)
+        self.data_table.show_rows(positions)
 
-        self.notebook.add(self.cleaning_panel, text="Data Cleaning")
-        self.notebook.select(self.notebook.index("end") - 1)
-        self.cleaning_panel.on_show()
+    def show_cleaning_panel(self):
+        """Show the data cleaning panel"""
+        self._show_panel("cleaning_panel")
 
     def show_visualization_panel(self):
         """Show the visualization panel"""
-
-        for i in range(self.notebook.index("end")):
-            if self.notebook.tab(i, "text") == "Visualization":
-                self.notebook.select(i)
-               
-                self.visualization_panel.on_show()
-                return
-
-        self.notebook.add(self.visualization_panel, text="Visualization")
-        self.notebook.select(self.notebook.index("end") - 1)
-        
-        self.visualization_panel.on_show()
+        self._show_panel("visualization_panel")
 
     def show_statistics_panel(self):
         """Show the statistics panel"""
-        
+        self._show_panel("statistics_panel")
+
+    def _show_panel(self, name):
+        """Select a panel's tab, adding the tab the first time"""
+        text = PANELS[name][0]
+        panel = self._panel(name)
         for i in range(self.notebook.index("end")):
-            if self.notebook.tab(i, "text") == "Statistics":
+            if self.notebook.tab(i, "text") == text:
                 self.notebook.select(i)
-                self.statistics_panel.on_show()
+                panel.on_show()
                 return
 
-        self.notebook.add(self.statistics_panel, text="Statistics")
+        self.notebook.add(panel, text=text)
         self.notebook.select(self.notebook.index("end") - 1)
-        self.statistics_panel.on_show()
+        panel.on_show()
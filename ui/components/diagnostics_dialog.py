@@ -0,0 +1,110 @@
+"""
+DiagnosticsDialog - Startup timings, event-loop stalls and operation profiles
+"""
+
+import time
+import tkinter as tk
+from tkinter import ttk
+from core.operation_profiler import format_record
+
+
+class DiagnosticsDialog(tk.Toplevel):
+    """Shows what the Instrumentation and OperationProfiler recorded
+
+    Opened with Ctrl+Shift+D. The checkboxes switch cProfile and memory
+    tracing of DataManager operations on or off at runtime.
+    """
+
+    def __init__(self, parent, instrumentation, profiler):
+        super().__init__(parent)
+        self.instrumentation = instrumentation
+        self.profiler = profiler
+        self.title("Diagnostics")
+        self.geometry("700x450")
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.text = tk.Text(self, wrap=tk.NONE, font="TkFixedFont")
+        self.text.grid(row=0, column=0, sticky="nsew", padx=(10, 0), pady=10)
+        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.text.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns", padx=(0, 10), pady=10)
+        self.text.configure(yscrollcommand=scrollbar.set)
+
+        options = ttk.Frame(self)
+        options.grid(row=1, column=0, sticky="w", padx=10, pady=(0, 10))
+        self.cprofile_var = tk.BooleanVar(value=profiler.cprofile)
+        ttk.Checkbutton(
+            options,
+            text="Profile operations (cProfile)",
+            variable=self.cprofile_var,
+            command=self._on_options_changed,
+        ).pack(side=tk.LEFT, padx=2)
+        self.trace_memory_var = tk.BooleanVar(value=profiler.trace_memory)
+        ttk.Checkbutton(
+            options,
+            text="Trace peak memory",
+            variable=self.trace_memory_var,
+            command=self._on_options_changed,
+        ).pack(side=tk.LEFT, padx=2)
+
+        buttons = ttk.Frame(self)
+        buttons.grid(row=1, column=0, columnspan=2, sticky="e", padx=10, pady=(0, 10))
+        ttk.Button(buttons, text="Refresh", command=self.refresh).pack(
+            side=tk.LEFT, padx=2
+        )
+        ttk.Button(buttons, text="Copy", command=self._copy).pack(side=tk.LEFT, padx=2)
+        ttk.Button(buttons, text="Close", command=self.destroy).pack(
+            side=tk.LEFT, padx=2
+        )
+
+        self.refresh()
+
+    def refresh(self):
+        """Show the latest phases and stalls"""
+        self.text.configure(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.insert(tk.END, format_report(self.instrumentation, self.profiler))
+        self.text.configure(state="disabled")
+
+    def _on_options_changed(self):
+        """Apply the profiling checkboxes to the next operations"""
+        self.profiler.cprofile = self.cprofile_var.get()
+        self.profiler.trace_memory = self.trace_memory_var.get()
+
+    def _copy(self):
+        """Copy the report to the clipboard"""
+        self.clipboard_clear()
+        self.clipboard_append(self.text.get("1.0", tk.END))
+
+
+def format_report(instrumentation, profiler):
+    """Text of the startup phases, stalls and operations, latest first"""
+    log_file = instrumentation.log_file or "not written"
+    lines = [f"Log file: {log_file}", "", "Startup phases:"]
+    for phase in instrumentation.phases:
+        lines.append(
+            f"  {phase['name']:<40}{phase['duration_ms']:>10.1f} ms"
+            f"  at {phase['start_ms']:>8.1f} ms"
+        )
+
+    stalls = list(instrumentation.stalls)
+    lines += ["", f"Event-loop stalls: {len(stalls)}"]
+    for stall in reversed(stalls):
+        when = time.strftime("%H:%M:%S", time.localtime(stall["time"]))
+        lines.append(
+            f"  {when}{stall['duration_ms']:>8.0f} ms  {stall['operation']}"
+            f"  ({stall['location']})"
+        )
+
+    records = list(profiler.recent)
+    lines += ["", f"Operations: {len(records)}"]
+    for record in reversed(records):
+        when = time.strftime("%H:%M:%S", time.localtime(record["time"]))
+        lines.append(f"  {when}  {format_record(record)}")
+
+    profiles = [r for r in records if r["profile"] is not None]
+    if profiles:
+        lines += ["", f"cProfile of the latest profiled {profiles[-1]['operation']}:"]
+        lines.append(profiles[-1]["profile"])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,164 @@
+"""
+ProfileWindow - Dataset information window filled in as columns are profiled
+"""
+
+import queue
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import pandas as pd
+from core.profiler import (
+    export_html,
+    export_json,
+    profile_dataset,
+    store_profiled_stats,
+)
+from core.tasks import BackgroundTask
+
+
+class ProfileWindow(tk.Toplevel):
+    """Shows the statistics of every column while a BackgroundTask computes them
+
+    The data is read on the Tk thread before the task starts. The worker
+    queues each finished column, and on every poll the window caches the
+    queued columns' statistics and appends them to its text, so the UI
+    stays responsive however many columns there are. Closing the window
+    cancels the run; the finished report can be exported as JSON or HTML.
+    """
+
+    POLL_INTERVAL_MS = 100
+
+    def __init__(self, parent, data_manager):
+        super().__init__(parent)
+        self.title("Dataset Information")
+        self.geometry("600x400")
+        self.protocol("WM_DELETE_WINDOW", self._close)
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        self.status_var = tk.StringVar(value="Profiling columns...")
+        ttk.Label(self, textvariable=self.status_var, anchor=tk.W).grid(
+            row=0, column=0, columnspan=2, sticky="ew", padx=10, pady=(10, 0)
+        )
+
+        self.text = tk.Text(self, wrap=tk.WORD)
+        self.text.grid(row=1, column=0, sticky="nsew", padx=(10, 0), pady=10)
+        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.text.yview)
+        scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, 10), pady=10)
+        self.text.configure(yscrollcommand=scrollbar.set)
+
+        buttons = ttk.Frame(self)
+        buttons.grid(row=2, column=0, columnspan=2, sticky="e", padx=10, pady=(0, 10))
+        self.json_btn = ttk.Button(
+            buttons, text="Export JSON...", state="disabled", command=self._export_json
+        )
+        self.json_btn.pack(side=tk.LEFT, padx=2)
+        self.html_btn = ttk.Button(
+            buttons, text="Export HTML...", state="disabled", command=self._export_html
+        )
+        self.html_btn.pack(side=tk.LEFT, padx=2)
+        close_btn = ttk.Button(buttons, text="Close", command=self._close)
+        close_btn.pack(side=tk.LEFT, padx=2)
+
+        rows, cols = data_manager.get_shape()
+        self.text.insert(tk.END, f"Dataset shape: {rows} rows, {cols} columns\n\n")
+        self.text.insert(tk.END, "Column information:\n")
+        self.text.configure(state="disabled")
+
+        self.data_manager = data_manager
+        self.report = None
+        self._source = data_manager.get_profile_source()
+        self._finished = queue.Queue()
+        self.task = BackgroundTask(
+            profile_dataset,
+            self._source,
+            on_result=lambda column, stats: self._finished.put((column, stats)),
+        ).start()
+        self._after_id = self.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        """Store and append finished columns and update the status until done"""
+        # Read before draining, so columns queued just before the end are kept
+        done = self.task.done
+        lines = []
+        while True:
+            try:
+                column, stats = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            store_profiled_stats(self.data_manager, self._source, column, stats)
+            lines.append(format_column(column, stats))
+
+        if lines:
+            self.text.configure(state="normal")
+            self.text.insert(tk.END, "".join(lines))
+            self.text.configure(state="disabled")
+
+        if not done:
+            completed, total = self.task.progress
+            if total:
+                self.status_var.set(f"Profiling columns... {completed} of {total}")
+            self._after_id = self.after(self.POLL_INTERVAL_MS, self._poll)
+            return
+
+        if self.task.error is not None:
+            self.status_var.set(f"Profiling failed: {self.task.error}")
+            return
+
+        self.report = self.task.result
+        approximate = " (approximate statistics)" if self.report["approximate"] else ""
+        self.status_var.set(
+            f"Profiled {len(self.report['columns'])} columns{approximate}"
+        )
+        self.json_btn.configure(state="normal")
+        self.html_btn.configure(state="normal")
+
+    def _export_json(self):
+        """Save the report as JSON"""
+        self._export(export_json, ".json", [("JSON files", "*.json")])
+
+    def _export_html(self):
+        """Save the report as an HTML table"""
+        self._export(export_html, ".html", [("HTML files", "*.html")])
+
+    def _export(self, write, extension, filetypes):
+        """Ask for a file name and write the report with write(report, path)"""
+        file_path = filedialog.asksaveasfilename(
+            parent=self,
+            title="Export Profile",
+            defaultextension=extension,
+            filetypes=filetypes + [("All files", "*.*")],
+        )
+        if not file_path:
+            return
+        try:
+            write(self.report, file_path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to export profile: {e}", parent=self)
+            return
+        self.status_var.set(f"Profile exported to {file_path}")
+
+    def _close(self):
+        """Stop profiling and close the window"""
+        self.after_cancel(self._after_id)
+        if not self.task.done:
+            self.task.cancel()
+        self.destroy()
+
+
+def format_column(column, stats):
+    """Text block of one column in the information window"""
+    lines = [f"\n- {column}", f"  Type: {stats['dtype']}"]
+    lines.append(f"  Missing values: {stats['missing']}")
+    if pd.api.types.is_numeric_dtype(stats["dtype"]) and "mean" in stats:
+        lines.append(f"  Min: {stats['min']}")
+        lines.append(f"  Max: {stats['max']}")
+        lines.append(f"  Mean: {stats['mean']}")
+        lines.append(f"  Median: {stats.get('50%')}")
+    else:
+        lines.append(f"  Unique values: {stats['unique']}")
+        top_values = stats.get("top_values")
+        if top_values:
+            value, share = next(iter(top_values.items()))
+            lines.append(f"  Most frequent: {value} ({share:.1%})")
+    return "\n".join(lines) + "\n"
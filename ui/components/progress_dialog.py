@@ -0,0 +1,82 @@
+"""
+ProgressDialog - Modal progress window for background tasks
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+
+class ProgressDialog(tk.Toplevel):
+    """Modal window that polls a BackgroundTask and offers cancellation
+
+    Progress is shown as a byte count unless a unit name such as "columns"
+    is given.
+    """
+
+    POLL_INTERVAL_MS = 100
+
+    def __init__(self, parent, task, title, message, on_finished, unit=None):
+        super().__init__(parent)
+        self.task = task
+        self.on_finished = on_finished
+        self.unit = unit
+
+        self.title(title)
+        self.geometry("360x130")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.grab_set()
+        self.protocol("WM_DELETE_WINDOW", self._cancel)
+
+        ttk.Label(self, text=message).pack(pady=(10, 5))
+
+        self.progress = ttk.Progressbar(self, mode="indeterminate", maximum=100)
+        self.progress.pack(fill=tk.X, padx=20, pady=5)
+        self.progress.start()
+
+        self.detail_var = tk.StringVar(value="Starting...")
+        ttk.Label(self, textvariable=self.detail_var).pack()
+
+        self.cancel_btn = ttk.Button(self, text="Cancel", command=self._cancel)
+        self.cancel_btn.pack(pady=5)
+
+        self.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        """Copy the task progress into the widgets until the task finishes"""
+        if self.task.done:
+            self.progress.stop()
+            self.grab_release()
+            self.destroy()
+            self.on_finished(self.task)
+            return
+
+        completed, total = self.task.progress
+        if total > 0:
+            if str(self.progress["mode"]) != "determinate":
+                self.progress.stop()
+                self.progress.configure(mode="determinate")
+            percent = 100.0 * completed / total
+            self.progress["value"] = percent
+            if not self.task.cancelled:
+                if self.unit is None:
+                    done_text = f"{format_bytes(completed)} of {format_bytes(total)}"
+                else:
+                    done_text = f"{completed} of {total} {self.unit}"
+                self.detail_var.set(f"{done_text} ({percent:.0f}%)")
+
+        self.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _cancel(self):
+        """Request cancellation; the dialog closes once the worker stops"""
+        self.task.cancel()
+        self.cancel_btn.configure(state="disabled")
+        self.detail_var.set("Cancelling...")
+
+
+def format_bytes(size):
+    """Format a byte count for display"""
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024.0
@@ -23,6 +23,15 @@ class Toolbar(ttk.Frame):
         separator = ttk.Separator(self, orient=tk.VERTICAL)
         separator.pack(side=tk.LEFT, padx=5, pady=2, fill=tk.Y)
 
+        undo_btn = ttk.Button(self, text="Undo", command=self.app.undo)
+        undo_btn.pack(side=tk.LEFT, padx=2, pady=2)
+
+        redo_btn = ttk.Button(self, text="Redo", command=self.app.redo)
+        redo_btn.pack(side=tk.LEFT, padx=2, pady=2)
+
+        separator = ttk.Separator(self, orient=tk.VERTICAL)
+        separator.pack(side=tk.LEFT, padx=5, pady=2, fill=tk.Y)
+
         clean_btn = ttk.Button(
             self, text="Clean Data", command=self.app.show_data_cleaning
         )
@@ -0,0 +1,301 @@
+"""
+VirtualGrid - Table widget that draws only the visible cells of a large frame
+"""
+
+import tkinter as tk
+import tkinter.font as tkfont
+from collections import OrderedDict
+from tkinter import ttk
+import pandas as pd
+
+
+PAGE_SIZE = 200
+MAX_CACHED_PAGES = 32
+# Leading values a column's width is measured from
+MEASURE_ROWS = 50
+MIN_COLUMN_WIDTH = 60
+MAX_COLUMN_WIDTH = 300
+CELL_PADDING = 6
+WHEEL_ROWS = 3
+
+
+class VirtualGrid(ttk.Frame):
+    """Scrollable read-only table that renders only the rows and columns on screen
+
+    Rows come from fetch_rows(start, stop), called for one page of PAGE_SIZE
+    rows at a time. The MAX_CACHED_PAGES most recently used pages are kept,
+    and cell text is formatted the first time a column of a page is drawn.
+    A column's width is measured from its first MEASURE_ROWS values when it
+    first comes into view, so wide frames cost no more than narrow ones.
+    Scrolling only moves the first visible row and column, so it costs the
+    same whatever the number of rows.
+    """
+
+    def __init__(self, parent):
+        super().__init__(parent)
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.canvas = tk.Canvas(
+            self, background="white", highlightthickness=0, takefocus=True
+        )
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+
+        self.vbar = ttk.Scrollbar(
+            self, orient=tk.VERTICAL, command=self._on_vertical_scroll
+        )
+        self.vbar.grid(row=0, column=1, sticky="ns")
+        self.hbar = ttk.Scrollbar(
+            self, orient=tk.HORIZONTAL, command=self._on_horizontal_scroll
+        )
+        self.hbar.grid(row=1, column=0, sticky="ew")
+
+        self.font = tkfont.nametofont("TkDefaultFont")
+        self.heading_font = self.font.copy()
+        self.heading_font.configure(weight="bold")
+        self.row_height = self.font.metrics("linespace") + CELL_PADDING
+        self.char_width = max(self.font.measure("0"), 1)
+
+        self._fetch_rows = None
+        self.row_count = 0
+        self.columns = []
+        self.column_widths = []
+        self.index_width = MIN_COLUMN_WIDTH
+        self.first_row = 0
+        self.first_column = 0
+        self._visible_columns = 1
+        self._pages = OrderedDict()
+
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+        self.canvas.bind("<Button-1>", lambda event: self.canvas.focus_set())
+        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind("<Shift-MouseWheel>", self._on_shift_mousewheel)
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_rows(-WHEEL_ROWS))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_rows(WHEEL_ROWS))
+        self.canvas.bind("<Up>", lambda event: self.scroll_rows(-1))
+        self.canvas.bind("<Down>", lambda event: self.scroll_rows(1))
+        self.canvas.bind("<Prior>", lambda event: self.scroll_rows(-self.visible_rows))
+        self.canvas.bind("<Next>", lambda event: self.scroll_rows(self.visible_rows))
+        self.canvas.bind("<Home>", lambda event: self.scroll_to_row(0))
+        self.canvas.bind("<End>", lambda event: self.scroll_to_row(self.row_count))
+        self.canvas.bind("<Left>", lambda event: self.scroll_columns(-1))
+        self.canvas.bind("<Right>", lambda event: self.scroll_columns(1))
+
+    def set_source(self, row_count, columns, fetch_rows):
+        """Show row_count rows with the given column labels, read through fetch_rows
+
+        The page cache is cleared; the scroll position is kept when it is
+        still inside the data.
+        """
+        self._fetch_rows = fetch_rows
+        self.row_count = row_count
+        self.columns = list(columns)
+        self._pages.clear()
+
+        self.first_row = min(self.first_row, max(row_count - 1, 0))
+        self.first_column = min(self.first_column, max(len(self.columns) - 1, 0))
+        self.column_widths = [None] * len(self.columns)
+        self._measure_index()
+        self.redraw()
+
+    def clear(self):
+        """Show an empty grid"""
+        self.set_source(0, [], None)
+
+    @property
+    def visible_rows(self):
+        """Number of rows that fit below the header"""
+        height = self.canvas.winfo_height()
+        return max(height // self.row_height - 1, 1)
+
+    def scroll_rows(self, count):
+        """Move the view down by count rows (up if negative)"""
+        self.scroll_to_row(self.first_row + count)
+
+    def scroll_to_row(self, row):
+        """Make row the first visible row, as far as the data allows"""
+        last_start = max(self.row_count - self.visible_rows, 0)
+        self.first_row = min(max(int(row), 0), last_start)
+        self.redraw()
+
+    def scroll_columns(self, count):
+        """Move the view right by count columns (left if negative)"""
+        last_start = max(len(self.columns) - 1, 0)
+        self.first_column = min(max(self.first_column + count, 0), last_start)
+        self.redraw()
+
+    def redraw(self):
+        """Draw the header and the visible cells"""
+        canvas = self.canvas
+        canvas.delete("all")
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+
+        visible = self._column_positions(width)
+        self._visible_columns = max(len(visible), 1)
+        rows = range(
+            self.first_row, min(self.first_row + self.visible_rows + 1, self.row_count)
+        )
+
+        for line, row in enumerate(rows):
+            if row % 2:
+                y = (line + 1) * self.row_height
+                canvas.create_rectangle(
+                    0, y, width, y + self.row_height, fill="#f6f6f6", outline=""
+                )
+
+        canvas.create_rectangle(
+            0, 0, width, self.row_height, fill="#e8e8e8", outline="#c0c0c0"
+        )
+        index_right = self.index_width
+        canvas.create_line(index_right, 0, index_right, height, fill="#c0c0c0")
+        for position, x, column_width in visible:
+            right = x + column_width
+            canvas.create_line(right, 0, right, height, fill="#d0d0d0")
+            self._draw_text(
+                x, 0, column_width, str(self.columns[position]), self.heading_font
+            )
+
+        for line, row in enumerate(rows):
+            y = (line + 1) * self.row_height
+            page = self._page(row // PAGE_SIZE)
+            offset = row % PAGE_SIZE
+            index_text = self._texts(page, None)[offset]
+            self._draw_text(0, y, self.index_width, index_text, self.font, "#606060")
+            for position, x, column_width in visible:
+                text = self._texts(page, position)[offset]
+                self._draw_text(x, y, column_width, text, self.font)
+
+        self._update_scrollbars()
+
+    def _column_positions(self, width):
+        """(position, x, width) of the columns that fit in the canvas width"""
+        visible = []
+        x = self.index_width
+        for position in range(self.first_column, len(self.columns)):
+            if x >= width:
+                break
+            column_width = self._column_width(position)
+            visible.append((position, x, column_width))
+            x += column_width
+        return visible
+
+    def _draw_text(self, x, y, width, text, font, color="black"):
+        """Draw cell text, cut to the cell width"""
+        max_chars = max((width - CELL_PADDING) // self.char_width, 1)
+        if len(text) > max_chars:
+            text = text[: max_chars - 1] + "…"
+        self.canvas.create_text(
+            x + CELL_PADDING // 2,
+            y + self.row_height // 2,
+            text=text,
+            anchor=tk.W,
+            font=font,
+            fill=color,
+        )
+
+    def _page(self, number):
+        """Rows of one page, from the cache or from fetch_rows"""
+        page = self._pages.get(number)
+        if page is None:
+            start = number * PAGE_SIZE
+            frame = self._fetch_rows(start, min(start + PAGE_SIZE, self.row_count))
+            page = {"frame": frame, "texts": {}}
+            self._pages[number] = page
+            if len(self._pages) > MAX_CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(number)
+        return page
+
+    def _texts(self, page, position):
+        """Formatted cells of one column of a page (None for the index)"""
+        texts = page["texts"].get(position)
+        if texts is None:
+            frame = page["frame"]
+            values = frame.index if position is None else frame.iloc[:, position]
+            texts = [format_cell(value) for value in values]
+            page["texts"][position] = texts
+        return texts
+
+    def _column_width(self, position):
+        """Width of a column, measured the first time it is shown"""
+        width = self.column_widths[position]
+        if width is None:
+            texts = [str(self.columns[position])]
+            if self.row_count:
+                values = self._page(0)["frame"].iloc[:MEASURE_ROWS, position]
+                texts += [format_cell(value) for value in values]
+            width = self._text_width(texts)
+            self.column_widths[position] = width
+        return width
+
+    def _measure_index(self):
+        """Index column width from the row count and the first row labels"""
+        texts = [format_cell(self.row_count)]
+        if self.row_count:
+            labels = self._page(0)["frame"].index[:MEASURE_ROWS]
+            texts += [format_cell(label) for label in labels]
+        self.index_width = self._text_width(texts)
+
+    def _text_width(self, texts):
+        """Pixel width that fits the longest text, within the column limits"""
+        longest = max((len(text) for text in texts), default=0)
+        width = (longest + 2) * self.char_width + CELL_PADDING
+        return min(max(width, MIN_COLUMN_WIDTH), MAX_COLUMN_WIDTH)
+
+    def _update_scrollbars(self):
+        """Set the scrollbar sliders from the first visible row and column"""
+        if self.row_count:
+            top = self.first_row / self.row_count
+            self.vbar.set(top, min(top + self.visible_rows / self.row_count, 1.0))
+        else:
+            self.vbar.set(0.0, 1.0)
+
+        if self.columns:
+            left = self.first_column / len(self.columns)
+            self.hbar.set(
+                left, min(left + self._visible_columns / len(self.columns), 1.0)
+            )
+        else:
+            self.hbar.set(0.0, 1.0)
+
+    def _on_vertical_scroll(self, action, amount, unit=None):
+        """Scrollbar command for the rows"""
+        if action == "moveto":
+            self.scroll_to_row(float(amount) * self.row_count)
+        elif unit == "pages":
+            self.scroll_rows(int(amount) * self.visible_rows)
+        else:
+            self.scroll_rows(int(amount))
+
+    def _on_horizontal_scroll(self, action, amount, unit=None):
+        """Scrollbar command for the columns"""
+        if action == "moveto":
+            self.first_column = 0
+            self.scroll_columns(int(float(amount) * len(self.columns)))
+        elif unit == "pages":
+            self.scroll_columns(int(amount) * self._visible_columns)
+        else:
+            self.scroll_columns(int(amount))
+
+    def _on_mousewheel(self, event):
+        """Scroll rows with the mouse wheel (Windows and macOS)"""
+        self.scroll_rows(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS)
+
+    def _on_shift_mousewheel(self, event):
+        """Scroll columns with Shift and the mouse wheel"""
+        self.scroll_columns(-1 if event.delta > 0 else 1)
+
+
+def format_cell(value):
+    """Display text of one cell"""
+    if isinstance(value, float):
+        return "NaN" if value != value else f"{value:.10g}"
+    try:
+        if pd.isna(value):
+            return "NaN"
+    except (TypeError, ValueError):
+        pass
+    return str(value)
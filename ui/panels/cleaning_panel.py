@@ -5,6 +5,18 @@ CleaningPanel - Panel for data cleaning operations
 import tkinter as tk
 from tkinter import ttk, messagebox
 import pandas as pd
+from ui.components.progress_dialog import ProgressDialog, format_bytes
+from core.fuzzy_dedup import DEFAULT_THRESHOLD
+from core.loader import LoadCancelled
+from core.memory_optimizer import arrow_strings_available
+from core.tasks import BackgroundTask
+
+
+# Keep choices for duplicate removal and the DataManager keep argument
+KEEP_CHOICES = {"first": "first", "last": "last", "none": False}
+MAX_DUPLICATE_GROUPS = 100
+MAX_DUPLICATE_VALUES = 5
+MAX_GROUP_ROWS = 20
 
 
 class CleaningPanel(ttk.Frame):
@@ -18,6 +30,10 @@ class CleaningPanel(ttk.Frame):
         self.columnconfigure(1, weight=3)
         self.rowconfigure(0, weight=1)
 
+        # Latest find_near_duplicates result and the preview item of each group
+        self._near_duplicates = None
+        self._near_duplicate_items = {}
+
         self._create_options_panel()
         self._create_preview_panel()
 
@@ -26,21 +42,89 @@ class CleaningPanel(ttk.Frame):
         options_frame = ttk.LabelFrame(self, text="Cleaning Options")
         options_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
 
-        ttk.Label(options_frame, text="Select Column:").pack(anchor="w", padx=5, pady=5)
-        self.column_var = tk.StringVar()
-        self.column_combo = ttk.Combobox(options_frame, textvariable=self.column_var)
-        self.column_combo.pack(fill=tk.X, padx=5, pady=2)
-        self.column_combo.bind("<<ComboboxSelected>>", self._on_column_selected)
+        ttk.Label(options_frame, text="Select Columns:").pack(anchor="w", padx=5, pady=5)
+
+        list_frame = ttk.Frame(options_frame)
+        list_frame.pack(fill=tk.X, padx=5, pady=2)
+
+        self.column_list = tk.Listbox(
+            list_frame, selectmode=tk.EXTENDED, exportselection=False, height=6
+        )
+        self.column_list.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.column_list.bind("<<ListboxSelect>>", self._on_column_selected)
+
+        list_scrollbar = ttk.Scrollbar(
+            list_frame, orient=tk.VERTICAL, command=self.column_list.yview
+        )
+        list_scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        self.column_list.configure(yscrollcommand=list_scrollbar.set)
+
+        ttk.Button(
+            options_frame, text="Select All Columns", command=self._select_all_columns
+        ).pack(fill=tk.X, padx=5, pady=2)
 
         duplicates_frame = ttk.LabelFrame(options_frame, text="Remove Duplicates")
         duplicates_frame.pack(fill=tk.X, padx=5, pady=5)
 
+        self.dup_subset_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            duplicates_frame,
+            text="Compare selected columns only",
+            variable=self.dup_subset_var,
+        ).pack(anchor="w", padx=5, pady=2)
+
+        keep_frame = ttk.Frame(duplicates_frame)
+        keep_frame.pack(fill=tk.X, padx=5, pady=2)
+        ttk.Label(keep_frame, text="Keep:").pack(side=tk.LEFT)
+        self.dup_keep_var = tk.StringVar(value="first")
+        ttk.Combobox(
+            keep_frame,
+            textvariable=self.dup_keep_var,
+            values=list(KEEP_CHOICES),
+            state="readonly",
+            width=10,
+        ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            duplicates_frame,
+            text="Find Duplicates",
+            command=self._find_duplicates,
+        ).pack(fill=tk.X, padx=5, pady=2)
+
         ttk.Button(
             duplicates_frame,
             text="Remove Duplicate Rows",
             command=self._remove_duplicates,
         ).pack(fill=tk.X, padx=5, pady=5)
 
+        near_frame = ttk.LabelFrame(options_frame, text="Near Duplicates")
+        near_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        threshold_frame = ttk.Frame(near_frame)
+        threshold_frame.pack(fill=tk.X, padx=5, pady=2)
+        ttk.Label(threshold_frame, text="Similarity:").pack(side=tk.LEFT)
+        self.near_threshold_var = tk.StringVar(value=str(DEFAULT_THRESHOLD))
+        ttk.Spinbox(
+            threshold_frame,
+            textvariable=self.near_threshold_var,
+            from_=0.5,
+            to=1.0,
+            increment=0.05,
+            width=6,
+        ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            near_frame,
+            text="Find Near Duplicates",
+            command=self._find_near_duplicates,
+        ).pack(fill=tk.X, padx=5, pady=2)
+
+        ttk.Button(
+            near_frame,
+            text="Merge Near Duplicates",
+            command=self._merge_near_duplicates,
+        ).pack(fill=tk.X, padx=5, pady=5)
+
         missing_frame = ttk.LabelFrame(options_frame, text="Handle Missing Values")
         missing_frame.pack(fill=tk.X, padx=5, pady=5)
 
@@ -102,6 +186,21 @@ class CleaningPanel(ttk.Frame):
             value="remove",
         ).pack(anchor="w", padx=5, pady=2)
 
+        memory_frame = ttk.LabelFrame(options_frame, text="Memory")
+        memory_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        self.arrow_strings_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            memory_frame,
+            text="Use Arrow strings",
+            variable=self.arrow_strings_var,
+            state=tk.NORMAL if arrow_strings_available() else tk.DISABLED,
+        ).pack(anchor="w", padx=5, pady=2)
+
+        ttk.Button(
+            memory_frame, text="Optimize Memory Usage", command=self._optimize_memory
+        ).pack(fill=tk.X, padx=5, pady=5)
+
         # Buttons
         ttk.Button(
             options_frame, text="Apply Cleaning", command=self._apply_cleaning
@@ -148,15 +247,32 @@ class CleaningPanel(ttk.Frame):
         )
 
     def _update_column_list(self):
-        """Update the column dropdown with available columns"""
-        if (
-            hasattr(self.app.data_manager, "dataframe")
-            and self.app.data_manager.dataframe is not None
-        ):
-            columns = list(self.app.data_manager.dataframe.columns)
-            self.column_combo["values"] = columns
-            if columns:
-                self.column_combo.current(0)
+        """Update the column list with available columns
+
+        The list is only rebuilt when the columns change, so switching tabs
+        keeps the selection. Selected columns that still exist stay selected.
+        """
+        columns = [str(c) for c in self.app.data_manager.get_columns()]
+        if columns == list(self.column_list.get(0, tk.END)):
+            return
+
+        selected = set(self._selected_columns())
+        self.column_list.delete(0, tk.END)
+        for position, column in enumerate(columns):
+            self.column_list.insert(tk.END, column)
+            if column in selected:
+                self.column_list.selection_set(position)
+        if columns and not self.column_list.curselection():
+            self.column_list.selection_set(0)
+
+    def _selected_columns(self):
+        """Names of the selected columns, in list order"""
+        return [self.column_list.get(i) for i in self.column_list.curselection()]
+
+    def _select_all_columns(self):
+        """Select every column in the list"""
+        self.column_list.selection_set(0, tk.END)
+        self._preview_cleaning()
 
     def _on_column_selected(self, event):
         """Handle column selection change"""
@@ -165,19 +281,18 @@ class CleaningPanel(ttk.Frame):
 
     def _preview_cleaning(self):
         """Preview the selected cleaning operations"""
-        if (
-            not hasattr(self.app.data_manager, "dataframe")
-            or self.app.data_manager.dataframe is None
-        ):
+        if not self.app.data_manager.has_data():
             return
 
-        column = self.column_var.get()
-        if not column:
+        columns = self._selected_columns()
+        if not columns:
             return
+        # The preview shows the first selected column
+        column = columns[0]
 
-        df = self.app.data_manager.dataframe.copy()
-        sample_size = min(10, len(df))
-        sample_df = df.sample(sample_size) if sample_size > 0 else df
+        series = self.app.data_manager.get_column(column)
+        sample_size = min(10, len(series))
+        sample = series.sample(sample_size) if sample_size > 0 else series
 
         self.preview_tree.delete(*self.preview_tree.get_children())
 
@@ -192,17 +307,16 @@ class CleaningPanel(ttk.Frame):
         self.preview_tree.heading("original", text="Original Value")
         self.preview_tree.heading("cleaned", text="Cleaned Value")
 
-        cleaned_series = self._apply_cleaning_options(sample_df[column])
+        cleaned_series = self._apply_cleaning_options(sample)
 
-        for idx, (orig_val, clean_val) in enumerate(
-            zip(sample_df[column], cleaned_series)
-        ):
-            row_idx = sample_df.index[idx]
+        for idx, (orig_val, clean_val) in enumerate(zip(sample, cleaned_series)):
+            row_idx = sample.index[idx]
             self.preview_tree.insert("", tk.END, values=(row_idx, orig_val, clean_val))
 
-        missing_count = df[column].isna().sum()
+        missing_count = series.isna().sum()
+        selected_text = f" (1 of {len(columns)} selected)" if len(columns) > 1 else ""
         self.preview_info.config(
-            text=f"Column: {column} | Missing values: {missing_count} | Total rows: {len(df)}"
+            text=f"Column: {column}{selected_text} | Missing values: {missing_count} | Total rows: {len(series)}"
         )
 
     def _apply_cleaning_options(self, series):
@@ -233,36 +347,31 @@ class CleaningPanel(ttk.Frame):
             elif missing_option == "value":
                 result = result.fillna(self.custom_value.get())
 
-        if pd.api.types.is_numeric_dtype(series):
-            if self.outlier_var.get() == "cap":
-                q1 = result.quantile(0.25)
-                q3 = result.quantile(0.75)
-                iqr = q3 - q1
-                lower_bound = q1 - 1.5 * iqr
-                upper_bound = q3 + 1.5 * iqr
+        if pd.api.types.is_numeric_dtype(series) and self.outlier_var.get() in (
+            "cap",
+            "remove",
+        ):
+            # Bounds come from the whole column, not the preview sample;
+            # DataManager caches them and uses a sketch for large datasets
+            q1, q3 = self.app.data_manager.column_quantiles(series.name, [0.25, 0.75])
+            iqr = q3 - q1
+            lower_bound = q1 - 1.5 * iqr
+            upper_bound = q3 + 1.5 * iqr
 
+            if self.outlier_var.get() == "cap":
                 result = result.clip(lower=lower_bound, upper=upper_bound)
-            elif self.outlier_var.get() == "remove":
-                q1 = result.quantile(0.25)
-                q3 = result.quantile(0.75)
-                iqr = q3 - q1
-                lower_bound = q1 - 1.5 * iqr
-                upper_bound = q3 + 1.5 * iqr
-
+            else:
                 result = result.mask((result < lower_bound) | (result > upper_bound))
 
         return result
 
     def _apply_cleaning(self):
         """Apply the cleaning operations to the actual dataset"""
-        if (
-            not hasattr(self.app.data_manager, "dataframe")
-            or self.app.data_manager.dataframe is None
-        ):
+        if not self.app.data_manager.has_data():
             return
 
-        column = self.column_var.get()
-        if not column:
+        columns = self._selected_columns()
+        if not columns:
             messagebox.showwarning("Warning", "Please select a column first")
             return
 
@@ -270,15 +379,8 @@ class CleaningPanel(ttk.Frame):
             missing_option = self.missing_var.get()
             outlier_option = self.outlier_var.get()
 
-            if missing_option == "drop":
-                self.app.data_manager.clean_missing_values(column, "drop")
-            elif missing_option == "mean":
-                self.app.data_manager.clean_missing_values(column, "mean")
-            elif missing_option == "median":
-                self.app.data_manager.clean_missing_values(column, "median")
-            elif missing_option == "mode":
-                self.app.data_manager.clean_missing_values(column, "mode")
-            elif missing_option == "value":
+            value = None
+            if missing_option == "value":
                 value = self.custom_value.get()
                 if not value:
                     messagebox.showwarning(
@@ -286,40 +388,147 @@ class CleaningPanel(ttk.Frame):
                     )
                     return
 
-                if pd.api.types.is_numeric_dtype(
-                    self.app.data_manager.dataframe[column]
+            plan = []
+            for column in columns:
+                step = {"column": column, "missing": missing_option, "value": value}
+
+                if missing_option == "value" and pd.api.types.is_numeric_dtype(
+                    self.app.data_manager.get_dtype(column)
                 ):
                     try:
-                        value = float(value)
+                        step["value"] = float(value)
                     except ValueError:
                         messagebox.showwarning("Warning", "Please enter a valid number")
                         return
 
-                self.app.data_manager.clean_missing_values(column, "value", value)
+                if outlier_option != "none":
+                    step["outliers"] = outlier_option
 
-            if outlier_option != "none":
-                self.app.data_manager.handle_outliers(column, outlier_option)
+                plan.append(step)
+
+            # All columns are cleaned in one pass and refreshed once
+            self.app.data_manager.apply_cleaning_plan(plan)
 
             self.app.data_view.refresh_data()
 
-            self.preview_info.config(text=f"Cleaning applied to column: {column}")
-            messagebox.showinfo(
-                "Success", f"Cleaning operations applied to column: {column}"
-            )
+            if len(columns) == 1:
+                applied_to = f"column: {columns[0]}"
+            else:
+                applied_to = f"{len(columns)} columns"
+            self.preview_info.config(text=f"Cleaning applied to {applied_to}")
+            messagebox.showinfo("Success", f"Cleaning operations applied to {applied_to}")
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to apply cleaning: {str(e)}")
 
+    def _optimize_memory(self):
+        """Convert the selected columns (or all) to smaller dtypes and show the savings"""
+        if not self.app.data_manager.has_data():
+            return
+
+        try:
+            columns = self._selected_columns() or None
+            report = self.app.data_manager.optimize_memory(
+                columns=columns, arrow_strings=self.arrow_strings_var.get()
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to optimize memory: {str(e)}")
+            return
+
+        self.preview_tree.delete(*self.preview_tree.get_children())
+        self.preview_tree["columns"] = ["column", "old", "new", "saved"]
+        self.preview_tree.column("#0", width=0, stretch=tk.NO)
+        for name, heading, width in [
+            ("column", "Column", 150),
+            ("old", "Old Type", 100),
+            ("new", "New Type", 100),
+            ("saved", "Memory Saved", 150),
+        ]:
+            self.preview_tree.column(name, width=width, anchor=tk.W)
+            self.preview_tree.heading(name, text=heading)
+
+        total_saved = 0
+        for entry in report:
+            saved = entry["old_bytes"] - entry["new_bytes"]
+            total_saved += saved
+            self.preview_tree.insert(
+                "",
+                tk.END,
+                values=(
+                    entry["column"],
+                    entry["old_dtype"],
+                    entry["new_dtype"],
+                    f"{format_bytes(saved)} "
+                    f"({format_bytes(entry['old_bytes'])} -> {format_bytes(entry['new_bytes'])})",
+                ),
+            )
+
+        if report:
+            self.app.data_view.refresh_data()
+        message = f"Optimized {len(report)} column(s), saved {format_bytes(total_saved)}"
+        self.preview_info.config(text=message)
+        messagebox.showinfo("Optimize Memory", message)
+
+    def _duplicate_key_columns(self):
+        """Columns rows are compared on: the selection if asked for, else all (None)"""
+        if self.dup_subset_var.get():
+            return self._selected_columns() or None
+        return None
+
+    def _find_duplicates(self):
+        """List the largest groups of duplicate rows in the preview"""
+        data_manager = self.app.data_manager
+        if not data_manager.has_data():
+            return
+
+        columns = self._duplicate_key_columns()
+        try:
+            clusters = data_manager.find_duplicates(columns)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to find duplicates: {str(e)}")
+            return
+
+        shown_columns = columns or data_manager.get_columns()[:MAX_DUPLICATE_VALUES]
+        self.preview_tree.delete(*self.preview_tree.get_children())
+        self.preview_tree["columns"] = ["rows", "first", "last", "values"]
+        self.preview_tree.column("#0", width=0, stretch=tk.NO)
+        for name, heading, width in [
+            ("rows", "Rows", 60),
+            ("first", "First Row", 80),
+            ("last", "Last Row", 80),
+            ("values", "Values", 300),
+        ]:
+            self.preview_tree.column(name, width=width, anchor=tk.W)
+            self.preview_tree.heading(name, text=heading)
+
+        for cluster in clusters.head(MAX_DUPLICATE_GROUPS).itertuples():
+            row = data_manager.get_rows(cluster.first_row, cluster.first_row + 1)
+            last = data_manager.get_rows(cluster.last_row, cluster.last_row + 1)
+            values = ", ".join(
+                f"{column}={row[column].iloc[0]}" for column in shown_columns
+            )
+            self.preview_tree.insert(
+                "",
+                tk.END,
+                values=(cluster.count, row.index[0], last.index[0], values),
+            )
+
+        extra = int(clusters["count"].sum() - len(clusters))
+        compared = f" by {', '.join(columns)}" if columns else ""
+        self.preview_info.config(
+            text=f"{len(clusters)} groups of duplicate rows{compared}, "
+            f"{extra} rows beyond the first of each group"
+        )
+
     def _remove_duplicates(self):
         """Remove duplicate rows from the dataset"""
-        if (
-            not hasattr(self.app.data_manager, "dataframe")
-            or self.app.data_manager.dataframe is None
-        ):
+        if not self.app.data_manager.has_data():
             return
 
         try:
-            removed_count = self.app.data_manager.remove_duplicates()
+            removed_count = self.app.data_manager.remove_duplicates(
+                self._duplicate_key_columns(), KEEP_CHOICES[self.dup_keep_var.get()]
+            )
 
             self.app.data_view.refresh_data()
 
@@ -329,16 +538,138 @@ class CleaningPanel(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to remove duplicates: {str(e)}")
 
+    def _find_near_duplicates(self):
+        """Search the selected text columns for near duplicates on a worker thread"""
+        data_manager = self.app.data_manager
+        if not data_manager.has_data():
+            return
+
+        columns = self._selected_columns()
+        if not columns:
+            messagebox.showwarning(
+                "Near Duplicates", "Select the text columns to compare first"
+            )
+            return
+        try:
+            threshold = float(self.near_threshold_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Similarity must be a number")
+            return
+        if not 0 < threshold <= 1:
+            messagebox.showerror("Error", "Similarity must be between 0 and 1")
+            return
+
+        task = BackgroundTask(
+            data_manager.find_near_duplicates, columns, threshold
+        ).start()
+        ProgressDialog(
+            self.winfo_toplevel(),
+            task,
+            title="Near Duplicates",
+            message="Finding near duplicates, please wait...",
+            on_finished=self._show_near_duplicates,
+            unit="rows read",
+        )
+
+    def _show_near_duplicates(self, task):
+        """List the largest groups of near duplicates in the preview for review"""
+        if isinstance(task.error, LoadCancelled):
+            self.preview_info.config(text="Near duplicate search cancelled")
+            return
+        if task.error is not None:
+            messagebox.showerror(
+                "Error", f"Failed to find near duplicates: {str(task.error)}"
+            )
+            return
+
+        data_manager = self.app.data_manager
+        clusters = task.result
+        columns = clusters.attrs["columns"]
+        self._near_duplicates = clusters
+        self._near_duplicate_items = {}
+
+        self.preview_tree.delete(*self.preview_tree.get_children())
+        self.preview_tree["columns"] = ["row", "similarity", "values"]
+        self.preview_tree.column("#0", width=140, stretch=tk.NO)
+        self.preview_tree.heading("#0", text="Group")
+        for name, heading, width in [
+            ("row", "Row", 80),
+            ("similarity", "Similarity", 80),
+            ("values", "Values", 300),
+        ]:
+            self.preview_tree.column(name, width=width, anchor=tk.W)
+            self.preview_tree.heading(name, text=heading)
+
+        groups = clusters.groupby("cluster", sort=True)
+        for number, group in groups:
+            if number >= MAX_DUPLICATE_GROUPS:
+                break
+            item = self.preview_tree.insert(
+                "", tk.END, text=f"Group {number + 1} ({len(group)} rows)", open=True
+            )
+            self._near_duplicate_items[item] = number
+            for member in group.head(MAX_GROUP_ROWS).itertuples():
+                row = data_manager.get_rows(member.row, member.row + 1)
+                values = ", ".join(str(row[column].iloc[0]) for column in columns)
+                self.preview_tree.insert(
+                    item,
+                    tk.END,
+                    values=(row.index[0], f"{member.similarity:.0%}", values),
+                )
+
+        self.preview_info.config(
+            text=f"{groups.ngroups} groups of near duplicates in "
+            f"{', '.join(columns)}, {len(clusters) - groups.ngroups} rows beyond "
+            "the first of each group. Select groups to merge, or none for all."
+        )
+
+    def _merge_near_duplicates(self):
+        """Merge the selected groups of near duplicates, or all of them"""
+        clusters = self._near_duplicates
+        if clusters is None or clusters.empty:
+            messagebox.showinfo("Near Duplicates", "Find near duplicates first")
+            return
+
+        selected = set()
+        for item in self.preview_tree.selection():
+            item = self.preview_tree.parent(item) or item
+            if item in self._near_duplicate_items:
+                selected.add(self._near_duplicate_items[item])
+        if selected:
+            clusters = clusters[clusters["cluster"].isin(selected)]
+        elif not messagebox.askyesno(
+            "Near Duplicates",
+            f"Merge all {clusters['cluster'].nunique()} groups of near duplicates? "
+            "Each group keeps its first row, with missing values filled from "
+            "the others.",
+        ):
+            return
+
+        try:
+            removed = self.app.data_manager.merge_near_duplicates(clusters)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to merge near duplicates: {str(e)}")
+            return
+
+        self._near_duplicates = None
+        self._near_duplicate_items = {}
+        self.preview_tree.delete(*self.preview_tree.get_children())
+        self.app.data_view.refresh_data()
+
+        message = (
+            f"Merged {clusters['cluster'].nunique()} groups, removed {removed} rows"
+        )
+        self.preview_info.config(text=message)
+        messagebox.showinfo("Near Duplicates", message)
+
     def _reset_data(self):
         """Reset the data to its original state"""
-        if (
-            not hasattr(self.app.data_manager, "original_dataframe")
-            or self.app.data_manager.original_dataframe is None
-        ):
+        if not self.app.data_manager.has_data():
             return
 
         if messagebox.askyesno(
-            "Reset Data", "Reset data to original state? All changes will be lost."
+            "Reset Data",
+            "Reset data to original state? Changes can be redone from the Edit menu.",
         ):
             try:
                 self.app.data_manager.reset_to_original()
@@ -354,20 +685,12 @@ class CleaningPanel(ttk.Frame):
 
     def on_show(self):
         """Called when the panel is shown"""
-        if (
-            hasattr(self.app.data_manager, "dataframe")
-            and self.app.data_manager.dataframe is not None
-        ):
-            columns = list(self.app.data_manager.dataframe.columns)
-
-            self.column_combo["values"] = columns
-
-            if columns:
-                self.column_combo.set(columns[0])  
+        self._update_column_list()
 
+        if self.app.data_manager.has_data():
+            if self.app.data_manager.get_columns():
                 self._preview_cleaning()
         else:
-            self.column_combo["values"] = []
             self.preview_info.config(
                 text="No dataset loaded. Please load a dataset first."
             )
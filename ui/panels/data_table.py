@@ -4,8 +4,8 @@ DataTable - Panel for displaying tabular data
 
 import tkinter as tk
 from tkinter import ttk
-import pandas as pd
-from pandastable import Table
+from ui.components.profile_window import ProfileWindow
+from ui.components.virtual_grid import VirtualGrid
 
 
 class DataTable(ttk.Frame):
@@ -23,63 +23,55 @@ class DataTable(ttk.Frame):
         info_bar = ttk.Label(self, textvariable=self.info_var, anchor=tk.W)
         info_bar.grid(row=0, column=0, sticky="ew", padx=5, pady=2)
 
-        self.table_frame = ttk.Frame(self)
-        self.table_frame.grid(row=1, column=0, sticky="nsew")
-
-        self.create_empty_table()
-
-    def create_empty_table(self):
-        """Create an empty table"""
-        empty_df = pd.DataFrame()
-        self.table = Table(
-            self.table_frame, dataframe=empty_df, showtoolbar=True, showstatusbar=True
+        # Shown while the table is limited to selected rows
+        self.show_all_button = ttk.Button(
+            self, text="Show All Rows", command=self.refresh
         )
-        self.table.show()
+
+        # Only the rows on screen are read, so refreshing costs the same for any size
+        self.table = VirtualGrid(self)
+        self.table.grid(row=1, column=0, sticky="nsew")
 
     def refresh(self):
         """Refresh the data table with current data"""
-        if (
-            hasattr(self.app.data_manager, "dataframe")
-            and self.app.data_manager.dataframe is not None
-        ):
-            self.table.model.df = self.app.data_manager.dataframe
-            self.table.redraw()
+        data_manager = self.app.data_manager
+        self.show_all_button.grid_remove()
+        if data_manager.has_data():
+            rows, cols = data_manager.get_shape()
+            self.table.set_source(
+                rows, data_manager.get_columns(), data_manager.get_rows
+            )
 
-            rows, cols = self.app.data_manager.dataframe.shape
-            self.info_var.set(f"Dataset: {rows} rows, {cols} columns")
+            if data_manager.is_lazy():
+                self.info_var.set(
+                    f"Dataset: {rows} rows, {cols} columns (loading on demand)"
+                )
+            else:
+                self.info_var.set(f"Dataset: {rows} rows, {cols} columns")
         else:
+            self.table.clear()
             self.info_var.set("No dataset loaded")
 
+    def show_rows(self, positions):
+        """Show only the rows at positions, as in get_rows, until refreshed
+
+        Used for the points selected on a scatter plot. Rows are read a
+        page at a time, like the full table.
+        """
+        data_manager = self.app.data_manager
+        rows, cols = data_manager.get_shape()
+        self.table.set_source(
+            len(positions),
+            data_manager.get_columns(),
+            lambda start, stop: data_manager.take_rows(positions[start:stop]),
+        )
+        self.info_var.set(f"Selection: {len(positions)} of {rows} rows, {cols} columns")
+        self.show_all_button.grid(row=0, column=1, padx=5, pady=2)
+
     def show_info(self):
         """Show detailed information about the dataset"""
-        if (
-            hasattr(self.app.data_manager, "dataframe")
-            and self.app.data_manager.dataframe is not None
-        ):
-            info_window = tk.Toplevel(self)
-            info_window.title("Dataset Information")
-            info_window.geometry("600x400")
-
-            text = tk.Text(info_window, wrap=tk.WORD)
-            text.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
-
-            df = self.app.data_manager.dataframe
-            text.insert(
-                tk.END, f"Dataset shape: {df.shape[0]} rows, {df.shape[1]} columns\n\n"
-            )
-            text.insert(tk.END, "Column information:\n")
-
-            for col in df.columns:
-                text.insert(tk.END, f"\n- {col}\n")
-                text.insert(tk.END, f"  Type: {df[col].dtype}\n")
-                text.insert(tk.END, f"  Missing values: {df[col].isna().sum()}\n")
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    text.insert(tk.END, f"  Min: {df[col].min()}\n")
-                    text.insert(tk.END, f"  Max: {df[col].max()}\n")
-                    text.insert(tk.END, f"  Mean: {df[col].mean()}\n")
-                elif pd.api.types.is_string_dtype(df[col]):
-                    text.insert(tk.END, f"  Unique values: {df[col].nunique()}\n")
-
-            text.configure(state="disabled")
+        if self.app.data_manager.has_data():
+            # Columns are profiled in worker processes and shown as they finish
+            ProfileWindow(self, self.app.data_manager)
         else:
             self.info_var.set("No dataset loaded")
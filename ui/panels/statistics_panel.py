@@ -4,9 +4,7 @@ StatisticsPanel - Panel for displaying data statistics
 
 import tkinter as tk
 from tkinter import ttk
-import pandas as pd
-import numpy as np
-from scipy import stats
+from core.statistics import correlation_report, describe_column, hypothesis_test
 
 
 class StatisticsPanel(ttk.Frame):
@@ -107,12 +105,8 @@ class StatisticsPanel(ttk.Frame):
 
     def _update_column_list(self):
         """Update the column dropdowns with available columns"""
-        if (
-            hasattr(self.app.data_manager, "dataframe")
-            and self.app.data_manager.dataframe is not None
-        ):
-            df = self.app.data_manager.dataframe
-            columns = list(df.columns)
+        if self.app.data_manager.has_data():
+            columns = self.app.data_manager.get_columns()
 
             self.column_combo["values"] = columns
             self.column2_combo["values"] = columns
@@ -126,16 +120,13 @@ class StatisticsPanel(ttk.Frame):
 
     def _calculate_statistics(self):
         """Calculate and display the selected statistics"""
-        if (
-            not hasattr(self.app.data_manager, "dataframe")
-            or self.app.data_manager.dataframe is None
-        ):
+        if not self.app.data_manager.has_data():
             return
 
         self.stats_text.delete(1.0, tk.END)
 
         stats_type = self.stats_var.get()
-        df = self.app.data_manager.dataframe
+        data_manager = self.app.data_manager
 
         try:
             if stats_type == "descriptive":
@@ -143,140 +134,20 @@ class StatisticsPanel(ttk.Frame):
                 if not column:
                     self._append_text("Please select a column.")
                     return
-
-                self._append_text(f"Descriptive Statistics for '{column}':\n\n")
-
-                if pd.api.types.is_numeric_dtype(df[column]):
-                    stats_data = df[column].describe()
-                    self._append_text(f"Count: {stats_data['count']}\n")
-                    self._append_text(f"Mean: {stats_data['mean']:.4f}\n")
-                    self._append_text(f"Std Dev: {stats_data['std']:.4f}\n")
-                    self._append_text(f"Min: {stats_data['min']:.4f}\n")
-                    self._append_text(f"25%: {stats_data['25%']:.4f}\n")
-                    self._append_text(f"Median: {stats_data['50%']:.4f}\n")
-                    self._append_text(f"75%: {stats_data['75%']:.4f}\n")
-                    self._append_text(f"Max: {stats_data['max']:.4f}\n")
-
-                    self._append_text(f"\nSkewness: {df[column].skew():.4f}\n")
-                    self._append_text(f"Kurtosis: {df[column].kurtosis():.4f}\n")
-                    self._append_text(f"Missing values: {df[column].isna().sum()}\n")
-                else:
-                    value_counts = df[column].value_counts()
-                    self._append_text(f"Total count: {len(df[column])}\n")
-                    self._append_text(f"Unique values: {df[column].nunique()}\n")
-                    self._append_text(f"Missing values: {df[column].isna().sum()}\n\n")
-                    self._append_text("Value Counts:\n")
-
-                    for val, count in value_counts.items():
-                        percent = 100 * count / value_counts.sum()
-                        self._append_text(f"{val}: {count} ({percent:.2f}%)\n")
+                self._append_text(describe_column(data_manager, column))
 
             elif stats_type == "correlation":
-                numeric_df = df.select_dtypes(include=["number"])
-                if numeric_df.empty:
-                    self._append_text(
-                        "No numeric columns found for correlation analysis."
-                    )
-                    return
-
-                corr_matrix = numeric_df.corr()
-
-                self._append_text("Correlation Matrix:\n\n")
-                header = "           "
-                for col in corr_matrix.columns:
-                    header += f"{col[:10]:>10} "
-                self._append_text(header + "\n")
-
-                for i, row in enumerate(corr_matrix.index):
-                    line = f"{row[:10]:<10} "
-                    for j, col in enumerate(corr_matrix.columns):
-                        line += f"{corr_matrix.iloc[i, j]:>10.4f} "
-                    self._append_text(line + "\n")
+                self._append_text(correlation_report(data_manager))
 
             elif stats_type == "hypothesis":
                 col1 = self.column_var.get()
                 col2 = self.column2_var.get()
-                test_type = self.test_var.get()
-
                 if not col1 or not col2:
                     self._append_text("Please select columns for hypothesis testing.")
                     return
-
-                self._append_text(f"Hypothesis Test: {test_type}\n")
-                self._append_text(f"Between '{col1}' and '{col2}'\n\n")
-
-                if test_type == "ttest":
-                    if not pd.api.types.is_numeric_dtype(
-                        df[col1]
-                    ) or not pd.api.types.is_numeric_dtype(df[col2]):
-                        self._append_text(
-                            "T-test requires numeric data for both columns."
-                        )
-                        return
-
-                    data1 = df[col1].dropna()
-                    data2 = df[col2].dropna()
-
-                    result = stats.ttest_ind(data1, data2, nan_policy="omit")
-
-                    self._append_text(f"t-statistic: {result.statistic:.4f}\n")
-                    self._append_text(f"p-value: {result.pvalue:.4f}\n\n")
-
-                    alpha = 0.05
-                    self._append_text(f"At significance level {alpha}:\n")
-                    if result.pvalue < alpha:
-                        self._append_text(
-                            "Reject null hypothesis. There is a significant difference between the means.\n"
-                        )
-                    else:
-                        self._append_text(
-                            "Fail to reject null hypothesis. There is not a significant difference between the means.\n"
-                        )
-
-                elif test_type == "chi2":
-                    contingency = pd.crosstab(df[col1], df[col2])
-
-                    chi2, p, dof, expected = stats.chi2_contingency(contingency)
-
-                    self._append_text(f"Chi-square statistic: {chi2:.4f}\n")
-                    self._append_text(f"p-value: {p:.4f}\n")
-                    self._append_text(f"Degrees of freedom: {dof}\n\n")
-
-                    alpha = 0.05
-                    self._append_text(f"At significance level {alpha}:\n")
-                    if p < alpha:
-                        self._append_text(
-                            "Reject null hypothesis. There is a significant relationship between the variables.\n"
-                        )
-                    else:
-                        self._append_text(
-                            "Fail to reject null hypothesis. There is not a significant relationship between the variables.\n"
-                        )
-
-                elif test_type == "anova":
-                    if not pd.api.types.is_numeric_dtype(df[col1]):
-                        self._append_text(
-                            "ANOVA requires a numeric column for the first selection."
-                        )
-                        return
-
-                    groups = df.groupby(col2)[col1].apply(list).values
-
-                    result = stats.f_oneway(*groups)
-
-                    self._append_text(f"F-statistic: {result.statistic:.4f}\n")
-                    self._append_text(f"p-value: {result.pvalue:.4f}\n\n")
-
-                    alpha = 0.05
-                    self._append_text(f"At significance level {alpha}:\n")
-                    if result.pvalue < alpha:
-                        self._append_text(
-                            "Reject null hypothesis. There are significant differences between group means.\n"
-                        )
-                    else:
-                        self._append_text(
-                            "Fail to reject null hypothesis. There are not significant differences between group means.\n"
-                        )
+                self._append_text(
+                    hypothesis_test(data_manager, col1, col2, self.test_var.get())
+                )
 
         except Exception as e:
             self._append_text(f"Error calculating statistics: {str(e)}")
@@ -4,13 +4,25 @@ VisualizationPanel - Panel for data visualization
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
-import numpy as np
 import seaborn as sns
 from matplotlib.ticker import FuncFormatter
+from core import charts
+from core.data_manager import build_point_index
+from core.tasks import BackgroundTask
+from ui.components.virtual_grid import format_cell
+
+
+# How often a scatter plot checks whether its point index is built
+POINT_INDEX_POLL_MS = 100
+# Distance in screen pixels within which a point is hovered or clicked
+PICK_PIXELS = 5
+# Columns listed in a point's tooltip, starting with the plotted ones
+TOOLTIP_COLUMNS = 6
 
 
 class VisualizationPanel(ttk.Frame):
@@ -31,6 +43,11 @@ class VisualizationPanel(ttk.Frame):
 
         self.color_palette = sns.color_palette("tab10")
 
+        # Point lookups of the scatter plot on screen, and the clicked points
+        self._scatter = None
+        self._selection_index = None
+        self.selected_points = []
+
         self._create_options_panel()
         self._create_plot_panel()
 
@@ -122,6 +139,18 @@ class VisualizationPanel(ttk.Frame):
         size_entry = ttk.Entry(size_frame, textvariable=self.marker_size_var, width=5)
         size_entry.pack(side=tk.LEFT, padx=5)
 
+        mode_frame = ttk.Frame(self.scatter_frame)
+        mode_frame.pack(fill=tk.X, padx=5, pady=2)
+        ttk.Label(mode_frame, text="Point Display:").pack(side=tk.LEFT)
+        self.scatter_mode_var = tk.StringVar(value="auto")
+        mode_combo = ttk.Combobox(
+            mode_frame,
+            textvariable=self.scatter_mode_var,
+            values=charts.SCATTER_MODES,
+            width=10,
+        )
+        mode_combo.pack(side=tk.LEFT, padx=5)
+
         self.show_stats_var = tk.BooleanVar(value=True)
         stats_check = ttk.Checkbutton(
             self.scatter_frame,
@@ -130,6 +159,17 @@ class VisualizationPanel(ttk.Frame):
         )
         stats_check.pack(anchor="w", padx=5, pady=2)
 
+        selection_frame = ttk.Frame(self.scatter_frame)
+        selection_frame.pack(fill=tk.X, padx=5, pady=2)
+        ttk.Button(
+            selection_frame,
+            text="Show Selected Rows",
+            command=self._show_selected_rows,
+        ).pack(side=tk.LEFT)
+        ttk.Button(
+            selection_frame, text="Clear Selection", command=self._clear_selection
+        ).pack(side=tk.LEFT, padx=5)
+
     def _create_histogram_options(self):
         """Create options specific to histograms"""
         self.histogram_frame = ttk.LabelFrame(
@@ -390,19 +430,13 @@ class VisualizationPanel(ttk.Frame):
 
     def _update_column_suggestions(self):
         """Update the column dropdowns with appropriate columns based on the selected chart type"""
-        if (
-            not hasattr(self.app.data_manager, "dataframe")
-            or self.app.data_manager.dataframe is None
-        ):
+        if not self.app.data_manager.has_data():
             return
 
-        df = self.app.data_manager.dataframe
         chart_type = self.chart_var.get()
 
-        numeric_cols = df.select_dtypes(include=["number"]).columns.tolist()
-        categorical_cols = df.select_dtypes(
-            include=["object", "category"]
-        ).columns.tolist()
+        numeric_cols = self.app.data_manager.get_numeric_columns()
+        categorical_cols = self.app.data_manager.get_categorical_columns()
 
         current_x = self.x_var.get()
         current_y = self.y_var.get()
@@ -472,28 +506,28 @@ class VisualizationPanel(ttk.Frame):
         self.toolbar = NavigationToolbar2Tk(self.canvas, toolbar_frame)
         self.toolbar.update()
 
+        # Scatter plots show a tooltip on hover and select points on click
+        self.canvas.mpl_connect("motion_notify_event", self._on_plot_motion)
+        self.canvas.mpl_connect("button_press_event", self._on_plot_click)
+
     def _update_column_list(self):
         """Update the column dropdowns with available columns"""
-        if (
-            hasattr(self.app.data_manager, "dataframe")
-            and self.app.data_manager.dataframe is not None
-        ):
+        if self.app.data_manager.has_data():
             self._update_column_suggestions()
 
     def _generate_plot(self):
         """Generate the selected plot type"""
-        if (
-            not hasattr(self.app.data_manager, "dataframe")
-            or self.app.data_manager.dataframe is None
-        ):
+        if not self.app.data_manager.has_data():
             messagebox.showwarning("Warning", "Please load a dataset first")
             return
 
         chart_type = self.chart_var.get()
         title = self.title_var.get()
-        df = self.app.data_manager.dataframe
+        columns = self._plot_columns(chart_type)
+        df = None if columns is None else self.app.data_manager.get_frame(columns)
 
         self.figure.clear()
+        self._scatter = None
 
         try:
             sns.set_style("whitegrid")
@@ -524,6 +558,7 @@ class VisualizationPanel(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Plot Error", f"Error generating plot: {str(e)}")
             self.figure.clear()
+            self._scatter = None
             ax = self.figure.add_subplot(111)
             ax.text(
                 0.5,
@@ -537,6 +572,26 @@ class VisualizationPanel(ttk.Frame):
             )
             self.canvas.draw()
 
+    def _plot_columns(self, chart_type):
+        """Columns a chart needs, so only those are loaded
+
+        None means the chart is drawn from aggregates computed by the
+        DataManager, which stream over out-of-core data.
+        """
+        if chart_type in ("bar", "heatmap"):
+            return None
+        if chart_type == "histogram" and self.app.data_manager.is_out_of_core():
+            return None
+        if chart_type == "box" and self.app.data_manager.use_approximate_statistics():
+            return None
+
+        columns = self.app.data_manager.get_columns()
+        if chart_type == "histogram":
+            wanted = [self.x_var.get()]
+        else:
+            wanted = [self.x_var.get(), self.y_var.get()]
+        return [c for c in dict.fromkeys(wanted) if c in columns]
+
     def _create_scatter_plot(self, df, ax):
         """Create a scatter plot with enhanced visual insights"""
         x_col = self.x_var.get()
@@ -551,115 +606,232 @@ class VisualizationPanel(ttk.Frame):
         except ValueError:
             marker_size = 50
 
-        valid_data = df[[x_col, y_col]].dropna()
+        regression = self.reg_type_var.get() if self.regression_var.get() else None
+        try:
+            degree = int(self.poly_degree_var.get())
+            if degree < 1:
+                degree = 2
+        except ValueError:
+            degree = 2
 
-        if len(valid_data) < 2:
-            messagebox.showwarning(
-                "Warning", "Not enough valid data points to create scatter plot"
-            )
+        try:
+            data = charts.scatter_data(df, x_col, y_col, regression, degree)
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
             return
 
-        scatter = ax.scatter(
-            valid_data[x_col],
-            valid_data[y_col],
-            s=marker_size,
-            alpha=0.7,
-            edgecolor="w",
-            linewidth=0.5,
-            c=self.color_palette[0],
+        charts.draw_scatter(
+            ax,
+            data,
+            marker_size=marker_size,
+            color=self.color_palette[0],
+            show_stats=self.show_stats_var.get(),
+            mode=self.scatter_mode_var.get(),
         )
+        self._start_point_lookup(ax, x_col, y_col, marker_size)
+
+    def _start_point_lookup(self, ax, x_col, y_col, marker_size):
+        """Build the plotted points' index on a worker thread, then enable hover
+
+        The DataManager keeps the index until one of the columns changes, so
+        redrawing the same pair, for example with a regression line, finds
+        it built. The columns are read here and the index is handed to the
+        DataManager in _check_point_index, both on the Tk thread.
+        """
+        data_manager = self.app.data_manager
+        self._scatter = {
+            "ax": ax,
+            "columns": [x_col, y_col],
+            "marker_size": marker_size,
+            "task": None,
+            "index": None,
+            "hovered": None,
+            "tooltip": None,
+            "highlight": None,
+        }
+        index = data_manager.cached_point_index(x_col, y_col)
+        if index is not None:
+            self._enable_point_lookup(self._scatter, index)
+            return
 
-        correlation = valid_data[x_col].corr(valid_data[y_col])
-
-        if self.regression_var.get():
-            x_data = valid_data[x_col]
-            y_data = valid_data[y_col]
+        source = data_manager.get_point_source(x_col, y_col)
+        self._scatter["task"] = BackgroundTask(build_point_index, source).start()
+        self.after(POINT_INDEX_POLL_MS, self._check_point_index, self._scatter)
 
-            regression_type = self.reg_type_var.get()
+    def _check_point_index(self, scatter):
+        """Enable point lookups once the index is built, unless the plot is gone"""
+        if scatter is not self._scatter:
+            return
+        task = scatter["task"]
+        if not task.done:
+            self.after(POINT_INDEX_POLL_MS, self._check_point_index, scatter)
+            return
+        if task.error is not None:
+            self.app.status_var.set(f"Point lookup unavailable: {task.error}")
+            return
 
-            if regression_type == "linear":
-                z = np.polyfit(x_data, y_data, 1)
-                p = np.poly1d(z)
+        self.app.data_manager.store_point_index(task.result)
+        self._enable_point_lookup(scatter, task.result)
+
+    def _enable_point_lookup(self, scatter, index):
+        """Use index for hover and picking on the scatter plot"""
+        scatter["index"] = index
+        if index is not self._selection_index:
+            self._selection_index = index
+            self.selected_points = []
+        self._draw_selection()
+        self.canvas.draw_idle()
+        self.app.status_var.set(
+            "Hover over a point for its row; click to select, shift-click to add"
+        )
 
-                x_range = np.linspace(x_data.min(), x_data.max(), 100)
-                ax.plot(
-                    x_range,
-                    p(x_range),
-                    "r--",
-                    linewidth=2,
-                    label=f"y = {z[0]:.4f}x + {z[1]:.4f}",
-                )
+    def _point_at(self, event):
+        """Point of the scatter plot under the mouse, or None
+
+        Points not drawn at the current zoom, or merged into the density
+        image, are found too.
+        """
+        scatter = self._scatter
+        if event.inaxes is not scatter["ax"] or event.xdata is None:
+            return None
+
+        # PICK_PIXELS in data units along each axis
+        inverse = event.inaxes.transData.inverted()
+        x0, y0 = inverse.transform((event.x, event.y))
+        x1, y1 = inverse.transform((event.x + PICK_PIXELS, event.y + PICK_PIXELS))
+        return scatter["index"].nearest(
+            event.xdata, event.ydata, abs(x1 - x0), abs(y1 - y0)
+        )
 
+    def _lookup_ready(self):
+        """Whether hover and clicks should look up points now
 
-                if len(x_data) > 2:  
-                    y_pred = p(x_data)
-                    x_sorted = np.sort(x_data)
-                    y_pred_sorted = p(x_sorted)
+        Not while the navigation toolbar is zooming or panning.
+        """
+        return (
+            self._scatter is not None
+            and self._scatter["index"] is not None
+            and not self.toolbar.mode
+        )
 
-                    residual_std = np.std(y_data - y_pred)
-                    ax.fill_between(
-                        x_sorted,
-                        y_pred_sorted - residual_std,
-                        y_pred_sorted + residual_std,
-                        alpha=0.2,
-                        color="red",
-                    )
+    def _on_plot_motion(self, event):
+        """Show the tooltip of the point under the mouse"""
+        if not self._lookup_ready():
+            return
+        scatter = self._scatter
+        point = self._point_at(event)
+        if point == scatter["hovered"]:
+            return
+        scatter["hovered"] = point
 
-            elif regression_type == "polynomial":
-                try:
-                    degree = int(self.poly_degree_var.get())
-                    if degree < 1:
-                        degree = 2
-                except ValueError:
-                    degree = 2
-
-                z = np.polyfit(x_data, y_data, degree)
-                p = np.poly1d(z)
-
-                x_range = np.linspace(x_data.min(), x_data.max(), 100)
-                ax.plot(
-                    x_range,
-                    p(x_range),
-                    "r-",
-                    linewidth=2,
-                    label=f"Polynomial (degree {degree})",
-                )
-
-        if self.show_stats_var.get():
-            stats_text = (
-                f"Correlation: {correlation:.4f}\n"
-                f"Number of points: {len(valid_data)}\n"
+        tooltip = self._tooltip()
+        text = None if point is None else self._point_text(point)
+        if text is None:
+            tooltip.set_visible(False)
+        else:
+            index = scatter["index"]
+            tooltip.xy = (index.x[point], index.y[point])
+            tooltip.set_text(text)
+            tooltip.set_visible(True)
+        self.canvas.draw_idle()
+
+    def _tooltip(self):
+        """The scatter plot's tooltip annotation, created on first hover"""
+        scatter = self._scatter
+        if scatter["tooltip"] is None:
+            scatter["tooltip"] = scatter["ax"].annotate(
+                "",
+                xy=(0, 0),
+                xytext=(12, 12),
+                textcoords="offset points",
+                bbox=charts.TEXT_BOX,
+                fontsize=9,
+                zorder=5,
+                visible=False,
             )
+        return scatter["tooltip"]
 
-            if self.regression_var.get() and "p" in locals():
-                y_pred = p(x_data)
-                ss_total = np.sum((y_data - np.mean(y_data)) ** 2)
-                ss_residual = np.sum((y_data - y_pred) ** 2)
-                r_squared = 1 - (ss_residual / ss_total)
-
-                stats_text += f"R²: {r_squared:.4f}\n"
+    def _point_text(self, point):
+        """Row label and first values of a point's row, or None if it is gone"""
+        data_manager = self.app.data_manager
+        try:
+            (row,) = data_manager.point_rows(self._scatter["index"], [point])
+        except ValueError as e:
+            self.app.status_var.set(str(e))
+            return None
+
+        frame = data_manager.get_rows(row, row + 1)
+        columns = self._scatter["columns"] + list(frame.columns)
+        lines = [f"Row {format_cell(frame.index[0])}"]
+        for column in list(dict.fromkeys(columns))[:TOOLTIP_COLUMNS]:
+            lines.append(f"{column}: {format_cell(frame[column].iloc[0])}")
+        return "\n".join(lines)
+
+    def _on_plot_click(self, event):
+        """Select the clicked point; with shift, add or remove it"""
+        if not self._lookup_ready() or event.button != 1:
+            return
+        point = self._point_at(event)
+        if event.key == "shift":
+            if point in self.selected_points:
+                self.selected_points.remove(point)
+            elif point is not None:
+                self.selected_points.append(point)
+        else:
+            self.selected_points = [] if point is None else [point]
 
-            props = dict(boxstyle="round", facecolor="white", alpha=0.8)
-            ax.text(
-                0.05,
-                0.95,
-                stats_text,
-                transform=ax.transAxes,
-                fontsize=10,
-                verticalalignment="top",
-                bbox=props,
-            )
+        self._draw_selection()
+        self.canvas.draw_idle()
+        self.app.status_var.set(f"{len(self.selected_points)} points selected")
 
-        if self.regression_var.get():
-            ax.legend(loc="best", frameon=True, framealpha=0.8)
+    def _draw_selection(self):
+        """Ring the selected points on the scatter plot"""
+        scatter = self._scatter
+        if scatter is None or scatter["index"] is None:
+            return
+        if scatter["highlight"] is not None:
+            scatter["highlight"].remove()
+            scatter["highlight"] = None
+        if not self.selected_points:
+            return
 
-        ax.set_xlabel(f"{x_col}", fontsize=12)
-        ax.set_ylabel(f"{y_col}", fontsize=12)
+        index = scatter["index"]
+        # Not scaled, so a zoomed view stays where it is
+        (scatter["highlight"],) = scatter["ax"].plot(
+            index.x[self.selected_points],
+            index.y[self.selected_points],
+            "o",
+            markersize=np.sqrt(scatter["marker_size"]) + 4,
+            markerfacecolor="none",
+            markeredgecolor="red",
+            markeredgewidth=1.5,
+            zorder=4,
+            scalex=False,
+            scaley=False,
+        )
 
-        ax.grid(True, linestyle="--", alpha=0.7)
+    def _show_selected_rows(self):
+        """Show the rows of the selected points in the data table"""
+        if not self.selected_points:
+            messagebox.showinfo(
+                "Selection", "Click points on a scatter plot to select them first"
+            )
+            return
+        try:
+            rows = self.app.data_manager.point_rows(
+                self._selection_index, self.selected_points
+            )
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
+            return
+        self.app.data_view.show_rows(np.sort(rows))
 
-        ax.xaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{x:,.2f}"))
-        ax.yaxis.set_major_formatter(FuncFormatter(lambda y, _: f"{y:,.2f}"))
+    def _clear_selection(self):
+        """Deselect all points"""
+        self.selected_points = []
+        if self._scatter is not None:
+            self._draw_selection()
+            self.canvas.draw_idle()
 
     def _create_bar_plot(self, df, ax):
         """Create an enhanced bar chart with insights"""
@@ -670,7 +842,10 @@ class VisualizationPanel(ttk.Frame):
             messagebox.showwarning("Warning", "Please select X and Y columns")
             return
         # Only keep top 20 values to avoid overcrowded plots
-        grouped_data = df.groupby(x_col)[y_col].mean().reset_index()
+        grouped_data = self.app.data_manager.group_mean(x_col, y_col)
+        if isinstance(grouped_data[x_col].dtype, pd.CategoricalDtype):
+            # Plot in row order, as for object columns, not in category order
+            grouped_data[x_col] = grouped_data[x_col].astype(object)
 
         if self.sort_bars_var.get():
             grouped_data = grouped_data.sort_values(by=y_col, ascending=False)
@@ -760,29 +935,52 @@ class VisualizationPanel(ttk.Frame):
 
         color = self.hist_color_var.get()
 
-        data = df[x_col].dropna()
+        if df is None:
+            # Out-of-core data: bin counts are accumulated chunk by chunk, and
+            # the density curve, which needs every value, is not drawn
+            counts, edges = self.app.data_manager.histogram(x_col, bins)
+            if counts.sum() == 0:
+                messagebox.showwarning("Warning", "No valid data points for histogram")
+                return
 
-        if len(data) == 0:
-            messagebox.showwarning("Warning", "No valid data points for histogram")
-            return
+            ax.hist(
+                edges[:-1], bins=edges, weights=counts, color=color, edgecolor="white"
+            )
+            stats = self.app.data_manager.get_column_stats(x_col)
+            count = stats["count"] - stats["missing"]
+        else:
+            data = df[x_col].dropna()
 
-        sns.histplot(
-            data,
-            bins=bins,
-            kde=self.kde_var.get(),
-            ax=ax,
-            color=color,
-            edgecolor="white",
-            line_kws={"linewidth": 2},
-        )
+            if len(data) == 0:
+                messagebox.showwarning("Warning", "No valid data points for histogram")
+                return
+
+            sns.histplot(
+                data,
+                bins=bins,
+                kde=self.kde_var.get(),
+                ax=ax,
+                color=color,
+                edgecolor="white",
+                line_kws={"linewidth": 2},
+            )
+            stats = None
+            count = len(data)
 
         if self.hist_stats_var.get():
 
-            mean = data.mean()
-            median = data.median()
-            std = data.std()
-            min_val = data.min()
-            max_val = data.max()
+            if stats is not None:
+                mean = stats["mean"]
+                median = stats["median"]
+                std = stats["std"]
+                min_val = stats["min"]
+                max_val = stats["max"]
+            else:
+                mean = data.mean()
+                median = data.median()
+                std = data.std()
+                min_val = data.min()
+                max_val = data.max()
 
             stats_text = (
                 f"Mean: {mean:.4f}\n"
@@ -790,7 +988,7 @@ class VisualizationPanel(ttk.Frame):
                 f"Std Dev: {std:.4f}\n"
                 f"Min: {min_val:.4f}\n"
                 f"Max: {max_val:.4f}\n"
-                f"Count: {len(data)}"
+                f"Count: {count}"
             )
             
             ax.text(
@@ -822,251 +1020,104 @@ class VisualizationPanel(ttk.Frame):
             messagebox.showwarning("Warning", "Please select X and Y columns")
             return
 
-        valid_data = df[[x_col, y_col]].dropna()
+        if df is None:
+            self._create_approximate_box_plot(ax, x_col, y_col)
+            return
 
-        if len(valid_data) == 0:
-            messagebox.showwarning("Warning", "No valid data points for box plot")
+        try:
+            data = charts.box_data(
+                df,
+                x_col,
+                y_col,
+                sort_by_median=self.box_sort_var.get(),
+                max_categories=self._box_category_limit(),
+            )
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
             return
 
-        notch = self.notch_var.get()
-        showmeans = self.mean_var.get()
-        palette = self.box_palette_var.get()
-        orientation = self.box_orient_var.get()
-        
-        # Parse box width
+        charts.draw_box(
+            ax,
+            data,
+            horizontal=self.box_orient_var.get() == "horizontal",
+            notch=self.notch_var.get(),
+            show_means=self.mean_var.get(),
+            show_points=self.points_var.get(),
+            palette=self.box_palette_var.get(),
+            width=self._box_width(),
+        )
+
+    def _box_width(self):
+        """Box width option, 0.8 if it is not a number in (0, 1]"""
         try:
             box_width = float(self.box_width_var.get())
             if box_width <= 0 or box_width > 1:
                 box_width = 0.8
         except ValueError:
             box_width = 0.8
-        
-        # Parse category limit
+        return box_width
+
+    def _box_category_limit(self):
+        """Maximum number of box plot categories, 10 if the option is invalid"""
         try:
             max_categories = int(self.box_limit_var.get())
             if max_categories <= 0:
                 max_categories = 10
         except ValueError:
             max_categories = 10
-        
-        # Get categories and potentially sort or limit them
-        categories = valid_data[x_col].unique()
-        
-        if self.box_sort_var.get():
-            # Sort categories by their median values
-            category_medians = {}
-            for cat in categories:
-                category_medians[cat] = valid_data[valid_data[x_col] == cat][y_col].median()
-            
-            # Sort categories by their median values
-            sorted_categories = sorted(category_medians.items(), key=lambda x: x[1])
-            categories = [item[0] for item in sorted_categories]
-        
-        # Limit the number of categories if there are too many
-        if len(categories) > max_categories:
-            message = f"Limiting display to {max_categories} categories (out of {len(categories)})"
-            ax.set_title(message, fontsize=10, color='gray')
-            
-            if self.box_sort_var.get():
-                # Take the categories with the highest median values
-                categories = categories[-max_categories:]
-            else:
-                # Take the first max_categories
-                categories = categories[:max_categories]
-        
-        # Filter data to only include selected categories
-        valid_data = valid_data[valid_data[x_col].isin(categories)]
-        
-        # Determine plot orientation
-        if orientation == "horizontal":
-            # For horizontal orientation, x and y are flipped
-            sns.boxplot(
-                y=x_col,  # x becomes y
-                x=y_col,  # y becomes x
-                data=valid_data,
-                notch=notch,
-                showmeans=showmeans,
-                meanprops={
-                    "marker": "o",
-                    "markerfacecolor": "white",
-                    "markeredgecolor": "black",
-                },
-                palette=palette,
-                ax=ax,
-                width=box_width,
-                fliersize=3 if self.points_var.get() else 0
-            )
-            
-            if self.points_var.get():
-                sns.stripplot(
-                    y=x_col,  # x becomes y
-                    x=y_col,  # y becomes x
-                    data=valid_data,
-                    color="black",
-                    alpha=0.3,
-                    size=3,
-                    ax=ax,
-                    jitter=True
-                )
-                
-            ax.set_xlabel(f"{y_col}", fontsize=12)
-            ax.set_ylabel(f"{x_col}", fontsize=12)
-            
-        else:  # vertical orientation
-            sns.boxplot(
-                x=x_col,
-                y=y_col,
-                data=valid_data,
-                notch=notch,
-                showmeans=showmeans,
-                meanprops={
-                    "marker": "o",
-                    "markerfacecolor": "white",
-                    "markeredgecolor": "black",
-                },
-                palette=palette,
-                ax=ax,
-                width=box_width,
-                fliersize=3 if self.points_var.get() else 0
+        return max_categories
+
+    def _create_approximate_box_plot(self, ax, x_col, y_col):
+        """Box plot drawn from a quantile sketch of each category
+
+        Used for large datasets: DataManager.group_sketches streams over the
+        data once, so no category's values are collected in memory. Boxes
+        and whiskers are approximate and individual points are not drawn.
+        """
+        try:
+            data = charts.sketch_box_data(
+                self.app.data_manager.group_sketches(x_col, y_col),
+                sort_by_median=self.box_sort_var.get(),
+                max_categories=self._box_category_limit(),
             )
-            
-            if self.points_var.get():
-                sns.stripplot(
-                    x=x_col,
-                    y=y_col,
-                    data=valid_data,
-                    color="black",
-                    alpha=0.3,
-                    size=3,
-                    ax=ax,
-                    jitter=True
-                )
-                
-            ax.set_xlabel(f"{x_col}", fontsize=12)
-            ax.set_ylabel(f"{y_col}", fontsize=12)
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
+            return
 
-        # Display statistics in a more compact way - only show for up to 5 categories to avoid clutter
-        displayed_categories = valid_data[x_col].unique()
-        if len(displayed_categories) <= 5:
-            stats_rows = []
-            for cat in displayed_categories:
-                cat_data = valid_data[valid_data[x_col] == cat][y_col]
-                stats_rows.append(f"{cat}: n={len(cat_data)}, mean={cat_data.mean():.2f}, median={cat_data.median():.2f}")
-            
-            stats_text = "\n".join(stats_rows)
-            
-            # Place the stats box in the appropriate location based on orientation
-            if orientation == "horizontal":
-                ax.text(
-                    0.98, 0.02, stats_text,
-                    transform=ax.transAxes, fontsize=9,
-                    verticalalignment='bottom', horizontalalignment='right',
-                    bbox=dict(boxstyle="round,pad=0.5", facecolor="white", alpha=0.8)
-                )
-            else:
-                ax.text(
-                    0.02, 0.98, stats_text,
-                    transform=ax.transAxes, fontsize=9,
-                    verticalalignment='top', horizontalalignment='left',
-                    bbox=dict(boxstyle="round,pad=0.5", facecolor="white", alpha=0.8)
-                )
-        
-        # Adjust tick labels for better readability
-        if orientation == "vertical" and len(displayed_categories) > 3:
-            plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
-        
-        # Set formatter for numeric axis
-        if orientation == "horizontal":
-            ax.xaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{x:,.2f}"))
-        else:
-            ax.yaxis.set_major_formatter(FuncFormatter(lambda y, _: f"{y:,.2f}"))
-            
-        # Adjust figure layout if needed
-        if len(displayed_categories) <= 5 and orientation == "vertical":
-            self.figure.tight_layout(rect=[0, 0, 0.85, 1])  # Make space for stats on the right
-        else:
-            self.figure.tight_layout()
+        charts.draw_sketch_box(
+            ax,
+            data,
+            x_col,
+            y_col,
+            self.app.data_manager.quantile_error,
+            horizontal=self.box_orient_var.get() == "horizontal",
+            notch=self.notch_var.get(),
+            show_means=self.mean_var.get(),
+            palette=self.box_palette_var.get(),
+            width=self._box_width(),
+        )
 
     def _create_heatmap_plot(self, df, ax):
         """Create an enhanced heatmap for correlation analysis"""
-        numeric_df = df.select_dtypes(include=["number"])
-
-        if numeric_df.empty or numeric_df.shape[1] < 2:
+        if len(self.app.data_manager.get_numeric_columns()) < 2:
             messagebox.showwarning(
                 "Warning", "Need at least two numeric columns for correlation analysis"
             )
             return
 
-        corr_matrix = numeric_df.corr()
-
-        mask = None
-        if self.mask_var.get():
-            mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
-
-        if self.cluster_var.get():
-            import scipy.cluster.hierarchy as sch
-
-            linkage = sch.linkage(corr_matrix, method="ward")
-
-            dendro = sch.dendrogram(linkage, no_plot=True)
-            reordered_idx = dendro["leaves"]
-
-            corr_matrix = corr_matrix.iloc[reordered_idx, reordered_idx]
-
-        self.figure.clear()
-
-        ax = self.figure.add_subplot(111)
-
-        hm = sns.heatmap(
-            corr_matrix,
-            annot=self.annot_var.get(),
+        data = charts.heatmap_data(
+            self.app.data_manager.correlation(),
+            cluster=self.cluster_var.get(),
+            upper_triangle=self.mask_var.get(),
+        )
+        charts.draw_heatmap(
+            self.figure,
+            data,
+            self.title_var.get(),
+            annotate=self.annot_var.get(),
             cmap=self.cmap_var.get(),
-            mask=mask,
-            linewidths=0.5,
-            ax=ax,
-            fmt=".2f",
-            square=True,
-            cbar_kws={"shrink": 0.8, "label": "Correlation Coefficient"},
         )
 
-        plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
-        plt.setp(ax.get_yticklabels(), rotation=0)
-
-        ax.set_title(self.title_var.get(), fontsize=14, pad=20)
-
-        if len(corr_matrix) > 1:  
-            strong_corrs = []
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i + 1, len(corr_matrix.columns)): 
-                    if abs(corr_matrix.iloc[i, j]) > 0.7:
-                        strong_corrs.append(
-                            (
-                                corr_matrix.columns[i],
-                                corr_matrix.columns[j],
-                                corr_matrix.iloc[i, j],
-                            )
-                        )
-
-            if strong_corrs:
-                text = "Strong correlations:\n\n"
-                for var1, var2, corr in sorted(
-                    strong_corrs, key=lambda x: abs(x[2]), reverse=True
-                ):
-                    text += f"{var1} ↔ {var2}: {corr:.2f}\n"
-
-                ax_text = self.figure.add_axes([0.7, 0.1, 0.25, 0.2])
-                ax_text.axis("off")
-                ax_text.text(
-                    0,
-                    1,
-                    text,
-                    verticalalignment="top",
-                    fontsize=10,
-                    bbox=dict(boxstyle="round", facecolor="white", alpha=0.8),
-                )
-
-        self.figure.tight_layout()
-
     def _export_plot(self):
         """Export the current plot as an image file"""
         from tkinter import filedialog